@@ -0,0 +1,12 @@
+"""
+Benchmarks of the pylabtools hot paths, with JSON reports that can be compared across commits.
+
+Run from the repository root:
+
+    python -m benchmarks run --output before.json
+    python -m benchmarks run path log --scale full --output after.json
+    python -m benchmarks compare before.json after.json
+
+The minio suite runs against moto's in-process S3 server, or against the server named by
+PYLABTOOLS_BENCH_S3_ENDPOINT (with PYLABTOOLS_BENCH_S3_ACCESS_KEY and PYLABTOOLS_BENCH_S3_SECRET_KEY).
+"""
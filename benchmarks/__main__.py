@@ -0,0 +1,61 @@
+import argparse
+import json
+import sys
+import tempfile
+
+from benchmarks import bench_file, bench_log, bench_minio, bench_path
+from benchmarks.harness import SCALES, compare, format_result, run, write_report
+
+SUITES = {"file": bench_file, "path": bench_path, "log": bench_log, "minio": bench_minio}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks of the pylabtools hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write a JSON report.")
+    run_parser.add_argument("suites", nargs="*", metavar="suite",
+                            help=f"Suites to run, among {', '.join(SUITES)}. Defaults to all of them.")
+    run_parser.add_argument("--scale", choices=list(SCALES), default="quick", help="Input sizes. Defaults to quick.")
+    run_parser.add_argument("--repeat", type=int, help="Timed calls per case. Defaults to the scale's.")
+    run_parser.add_argument("--filter", help="Only run the cases whose name contains this string.")
+    run_parser.add_argument("--output", default="benchmark.json", help="Report path. Defaults to benchmark.json.")
+    run_parser.add_argument("--workdir", help="Directory for the inputs. Defaults to a temporary directory.")
+
+    compare_parser = commands.add_parser("compare", help="Compare two reports.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="Relative change counted as a regression or an improvement. Defaults to 0.1.")
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+        changes = compare(baseline, current, args.threshold)
+        for change in changes:
+            print(f"{change['name']:<55} {change['baseline'] * 1000:10.2f} ms -> {change['current'] * 1000:10.2f} ms"
+                  f"  x{change['ratio']:.2f}  {change['status']}")
+        # A non-zero exit lets CI fail on regressions
+        return 1 if any(change["status"] == "regression" for change in changes) else 0
+
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    scale = SCALES[args.scale]
+    repeat = args.repeat or scale["repeat"]
+    suites = [SUITES[name] for name in (args.suites or SUITES)]
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.workdir) as workdir:
+        for suite in suites:
+            results.extend(run(suite.cases(scale, workdir), repeat, args.filter,
+                               progress=lambda result: print(format_result(result), flush=True)))
+    write_report(args.output, args.scale, results)
+    print(f"report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
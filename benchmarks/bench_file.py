@@ -0,0 +1,56 @@
+import os
+from collections import deque
+from typing import Dict, Iterator
+
+from benchmarks.harness import Case
+from pylabtools import file_wrapper as fw
+
+RECORD = {"id": 0, "user": "user-000000", "event": "click", "tags": ["a", "b", "c"], "value": 0.5, "ok": True}
+
+
+def _size_label(size: int) -> str:
+    return f"{size >> 20}MiB" if size >= 1 << 20 else f"{size >> 10}KiB"
+
+
+def _records(size: int) -> Iterator[Dict]:
+    """Yields synthetic records, about `size` bytes once written as JSON lines."""
+    line_size = len(fw.json_dumps(RECORD)) + 1
+    for i in range(max(1, size // line_size)):
+        yield dict(RECORD, id=i, user=f"user-{i % 1000000:06d}", value=i / 7)
+
+
+def _consume(iterator) -> None:
+    deque(iterator, maxlen=0)
+
+
+def cases(scale: Dict, workdir: str) -> Iterator[Case]:
+    """Reads and writes of text, line and JSONL files, at every size of the scale."""
+    for size in scale["file_sizes"]:
+        label = _size_label(size)
+        path = os.path.join(workdir, f"input-{label}.jsonl")
+        fw.write_jsonl(path, _records(size))
+        nbytes = os.path.getsize(path)
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        params = {"size": nbytes}
+
+        yield Case(f"file.read_file_all_text[{label}]", lambda: fw.read_file_all_text(path), nbytes, "bytes", params)
+        yield Case(f"file.stream_file_by_line[{label}]", lambda: _consume(fw.stream_file_by_line(path)),
+                   nbytes, "bytes", params)
+        yield Case(f"file.read_file_chunks[{label}]", lambda: _consume(fw.read_file_chunks(path, reuse_buffer=True)),
+                   nbytes, "bytes", params)
+        yield Case(f"file.iter_line_batches[{label}]", lambda: _consume(fw.iter_line_batches(path)),
+                   nbytes, "bytes", params)
+        yield Case(f"file.iter_jsonl[{label}]", lambda: _consume(fw.iter_jsonl(path)), nbytes, "bytes", params)
+
+        output = os.path.join(workdir, f"output-{label}.jsonl")
+        remove_output = lambda: os.remove(output)
+        yield Case(f"file.write_text_to_file[{label}]", lambda: fw.write_text_to_file(output, text),
+                   nbytes, "bytes", params, remove_output)
+        yield Case(f"file.write_text_to_file_atomic[{label}]",
+                   lambda: fw.write_text_to_file(output, text, atomic=True, fsync="file"),
+                   nbytes, "bytes", params, remove_output)
+        records = list(fw.iter_jsonl(path))
+        yield Case(f"file.write_jsonl[{label}]", lambda: fw.write_jsonl(output, records), nbytes, "bytes", params,
+                   remove_output)
+        os.remove(path)
@@ -0,0 +1,60 @@
+import logging
+import os
+from typing import Dict, Iterator
+
+from benchmarks.harness import Case
+from pylabtools import log_wrapper as lw
+
+
+def _record(i: int) -> logging.LogRecord:
+    record = logging.LogRecord("bench", logging.INFO, __file__, 10, "request %s served in %.2f ms", (i, i / 3), None)
+    record.request_id = f"req-{i}"
+    return record
+
+
+def _format_all(formatter: logging.Formatter, records) -> None:
+    for record in records:
+        formatter.format(record)
+
+
+def _log_all(logger: logging.Logger, count: int) -> None:
+    for i in range(count):
+        logger.info("request %s served in %.2f ms", i, i / 3, extra={"request_id": f"req-{i}"})
+
+
+def _logger_case(name: str, count: int, workdir: str, configure) -> Case:
+    """
+    A case logging `count` records through a fresh LoggerSetup, configured by `configure(setup, path)`.
+
+    The setup is shut down inside the timing, so queued and buffered records count as written.
+    """
+    path = os.path.join(workdir, f"{name}.log")
+    logger_name = f"bench.{name}"
+
+    def _run():
+        setup = lw.LoggerSetup(log_level=logging.INFO, name=logger_name,
+                               async_mode=name.startswith("async"))
+        configure(setup, path)
+        _log_all(setup.get_logger(), count)
+        setup.shutdown()
+        for handler in list(setup.logger.handlers):
+            handler.close()
+            setup.logger.removeHandler(handler)
+
+    return Case(f"log.LoggerSetup_{name}", _run, count, "records", {"records": count}, lambda: os.remove(path))
+
+
+def cases(scale: Dict, workdir: str) -> Iterator[Case]:
+    """Formatting and writing of log records."""
+    count = scale["log_records"]
+    records = [_record(i) for i in range(count)]
+    params = {"records": count}
+    yield Case("log.logging_Formatter", lambda: _format_all(logging.Formatter(), records), count, "records", params)
+    yield Case("log.JSONFormatter", lambda: _format_all(lw.JSONFormatter(), records), count, "records", params)
+    yield Case("log.JSONFormatter_json", lambda: _format_all(lw.JSONFormatter(backend="json"), records),
+               count, "records", params)
+
+    add_file = lambda setup, path: setup.add_file_handler(path)
+    yield _logger_case("file", count, workdir, add_file)
+    yield _logger_case("async_file", count, workdir, add_file)
+    yield _logger_case("batched_file", count, workdir, lambda setup, path: setup.add_batched_file_handler(path))
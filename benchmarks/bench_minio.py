@@ -0,0 +1,107 @@
+import contextlib
+import logging
+import os
+import shutil
+import socket
+from collections import deque
+from typing import Dict, Iterator, Optional, Tuple
+
+from benchmarks.harness import Case
+
+BUCKET = "pylabtools-bench"
+
+# Point the benchmarks at a real server, e.g. a local `minio server` binary, instead of the in-process stand-in
+ENDPOINT_VARIABLE = "PYLABTOOLS_BENCH_S3_ENDPOINT"
+ACCESS_KEY_VARIABLE = "PYLABTOOLS_BENCH_S3_ACCESS_KEY"
+SECRET_KEY_VARIABLE = "PYLABTOOLS_BENCH_S3_SECRET_KEY"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def s3_server() -> Iterator[Optional[Tuple[str, str, str, str]]]:
+    """
+    Yields the (endpoint, access key, secret key, server name) of the S3 server to benchmark against.
+
+    Uses the server named by PYLABTOOLS_BENCH_S3_ENDPOINT if set, otherwise starts moto's threaded server
+    in this process. Yields None when neither is available. Numbers from the stand-in include its own CPU
+    time, so only compare them with other runs against the stand-in.
+    """
+    endpoint = os.environ.get(ENDPOINT_VARIABLE)
+    if endpoint:
+        yield (endpoint, os.environ.get(ACCESS_KEY_VARIABLE, "minioadmin"),
+               os.environ.get(SECRET_KEY_VARIABLE, "minioadmin"), "external")
+        return
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        yield None
+        return
+    # The stand-in's request log would drown the results
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    port = _free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    try:
+        yield f"127.0.0.1:{port}", "bench", "bench", "moto"
+    finally:
+        server.stop()
+
+
+def cases(scale: Dict, workdir: str) -> Iterator[Case]:
+    """Upload and download throughput of batches of small objects and of one large object."""
+    with s3_server() as server:
+        if server is None:
+            print(f"minio benchmarks skipped: set {ENDPOINT_VARIABLE} or install moto")
+            return
+        from pylabtools.minio_wrapper import MinioWrapper
+
+        endpoint, access_key, secret_key, server_name = server
+        wrapper = MinioWrapper(endpoint, access_key, secret_key, secure=False, region="us-east-1",
+                               multipart_threshold=16 << 20)
+        if not wrapper.minio_client.bucket_exists(BUCKET):
+            wrapper.minio_client.make_bucket(BUCKET)
+
+        object_size = scale["object_size"]
+        payload = os.urandom(object_size)
+        for count in scale["object_counts"]:
+            source = os.path.join(workdir, f"objects-{count}")
+            os.makedirs(source)
+            for i in range(count):
+                with open(os.path.join(source, f"object-{i:06d}.bin"), "wb") as f:
+                    f.write(payload)
+            destination = os.path.join(workdir, f"downloads-{count}")
+            params = {"objects": count, "object_size": object_size, "server": server_name}
+            label = f"{count}x{object_size >> 10}KiB"
+
+            yield Case(f"minio.upload[{label}]",
+                       lambda: wrapper.upload(BUCKET, source, prefix="bench", mode="thread"),
+                       count * object_size, "bytes", params)
+            yield Case(f"minio.download_files[{label}]",
+                       lambda: wrapper.download_files(BUCKET, prefix=f"bench/objects-{count}/", recursive=True,
+                                                      destination_path=destination, mode="thread"),
+                       count * object_size, "bytes", params, lambda: shutil.rmtree(destination))
+            shutil.rmtree(source)
+
+        large_size = scale["large_object_size"]
+        large_path = os.path.join(workdir, "large.bin")
+        with open(large_path, "wb") as f:
+            for _ in range(large_size // (1 << 20)):
+                f.write(os.urandom(1 << 20))
+        large_output = os.path.join(workdir, "large-download.bin")
+        params = {"size": large_size, "part_size": wrapper.part_size, "server": server_name}
+        label = f"{large_size >> 20}MiB"
+
+        yield Case(f"minio.upload_large_file[{label}]",
+                   lambda: wrapper.upload_large_file(BUCKET, large_path, "bench/large.bin"), large_size, "bytes", params)
+        yield Case(f"minio.download_file_ranged[{label}]",
+                   lambda: wrapper.download_file(BUCKET, "bench/large.bin", large_output), large_size, "bytes", params,
+                   lambda: os.remove(large_output))
+        yield Case(f"minio.iter_object_chunks[{label}]",
+                   lambda: deque(wrapper.iter_object_chunks(BUCKET, "bench/large.bin"), maxlen=0),
+                   large_size, "bytes", params)
+        os.remove(large_path)
@@ -0,0 +1,51 @@
+import os
+import shutil
+from collections import deque
+from typing import Dict, Iterator
+
+from benchmarks.harness import Case
+from pylabtools import path_wrapper as pw
+
+FILES_PER_DIRECTORY = 100
+DIRECTORIES_PER_PARENT = 100
+
+
+def _size_label(entries: int) -> str:
+    return f"{entries // 1000000}M" if entries >= 1000000 else f"{entries // 1000}k"
+
+
+def build_tree(root: str, entries: int) -> None:
+    """Creates `entries` empty files, FILES_PER_DIRECTORY per leaf directory, under two directory levels."""
+    for directory in range(max(1, entries // FILES_PER_DIRECTORY)):
+        path = os.path.join(root, f"p{directory // DIRECTORIES_PER_PARENT:04d}", f"d{directory:06d}")
+        os.makedirs(path)
+        for file in range(FILES_PER_DIRECTORY):
+            extension = ".jsonl" if file % 2 else ".txt"
+            open(os.path.join(path, f"f{file:03d}{extension}"), "w").close()
+
+
+def _os_walk(root: str) -> None:
+    deque((os.path.join(directory, name) for directory, _, files in os.walk(root) for name in files), maxlen=0)
+
+
+def cases(scale: Dict, workdir: str) -> Iterator[Case]:
+    """Listings of synthetic trees, at every tree size of the scale, with os.walk as the baseline."""
+    for entries in scale["tree_sizes"]:
+        label = _size_label(entries)
+        root = os.path.join(workdir, f"tree-{label}")
+        build_tree(root, entries)
+        params = {"entries": entries}
+
+        yield Case(f"path.os_walk[{label}]", lambda: _os_walk(root), entries, "files", params)
+        yield Case(f"path.get_all_files[{label}]", lambda: pw.get_all_files(root), entries, "files", params)
+        yield Case(f"path.get_all_files_endswith[{label}]", lambda: pw.get_all_files(root, endswith=".jsonl"),
+                   entries, "files", params)
+        yield Case(f"path.scan_files_threads[{label}]", lambda: deque(pw.scan_files(root, workers=8), maxlen=0),
+                   entries, "files", params)
+
+        index_path = os.path.join(workdir, f"tree-{label}.idx")
+        with pw.DirectoryIndex(index_path) as index:
+            # Built once by the warmup call, every timed call only checks the directory mtimes
+            yield Case(f"path.get_all_files_index_warm[{label}]", lambda: pw.get_all_files(root, index=index),
+                       entries, "files", params)
+        shutil.rmtree(root)
@@ -0,0 +1,174 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+# Sizes each benchmark module builds its inputs from, by scale
+SCALES = {
+    "quick": {"file_sizes": [1 << 20, 16 << 20], "tree_sizes": [10000], "log_records": 20000,
+              "object_counts": [100], "object_size": 64 << 10, "large_object_size": 32 << 20, "repeat": 3},
+    "full": {"file_sizes": [1 << 20, 16 << 20, 256 << 20], "tree_sizes": [10000, 100000, 1000000],
+             "log_records": 200000, "object_counts": [100, 1000], "object_size": 64 << 10,
+             "large_object_size": 256 << 20, "repeat": 5},
+}
+
+
+class Case(NamedTuple):
+    """
+    One measured operation.
+
+    Attributes:
+    - name (str): Unique name of the case, stable across runs so reports can be compared.
+    - fn (Callable[[], object]): The operation. Runs once per repetition.
+    - amount (int): Work done by one call, in `unit`, from which the throughput is computed.
+    - unit (str): Unit of `amount`, e.g. "bytes", "files" or "records".
+    - params (Dict): Parameters of the case, recorded in the report.
+    - teardown (Callable[[], object], optional): Runs after every repetition, outside the timing.
+    """
+    name: str
+    fn: Callable[[], object]
+    amount: int
+    unit: str
+    params: Dict = {}
+    teardown: Optional[Callable[[], object]] = None
+
+
+def measure(case: Case, repeat: int, warmup: int = 1) -> Dict:
+    """
+    Times a case and returns its result entry.
+
+    The garbage collector is disabled while timing, as `timeit` does, so collections triggered by earlier
+    cases do not land in this one.
+
+    Args:
+    - case (Case): The case to time.
+    - repeat (int): Number of timed calls.
+    - warmup (int, optional): Number of untimed calls first, to warm caches. Defaults to 1.
+
+    Returns:
+    - Dict: The case name, params and timings in seconds, with the throughput of the median call.
+    """
+    for _ in range(warmup):
+        case.fn()
+        if case.teardown:
+            case.teardown()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            case.fn()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+        if case.teardown:
+            case.teardown()
+    median = statistics.median(timings)
+    return {
+        "name": case.name,
+        "params": case.params,
+        "repeat": repeat,
+        "min": min(timings),
+        "median": median,
+        "mean": statistics.mean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "amount": case.amount,
+        "unit": case.unit,
+        "throughput": case.amount / median if median else 0.0,
+    }
+
+
+def environment() -> Dict:
+    """Returns what a report's numbers depend on, to tell apart reports from different machines or commits."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(cases: Iterable[Case], repeat: int, name_filter: Optional[str] = None,
+        progress: Callable[[Dict], None] = None) -> List[Dict]:
+    """
+    Measures every case whose name contains `name_filter`, one after the other.
+
+    Args:
+    - cases (Iterable[Case]): The cases. Generated lazily, so inputs are built just before they are timed.
+    - repeat (int): Number of timed calls per case.
+    - name_filter (str, optional): Keep only the cases whose name contains it. Defaults to all cases.
+    - progress (Callable[[Dict], None], optional): Called with every result as soon as it is measured.
+
+    Returns:
+    - List[Dict]: The result entries.
+    """
+    results = []
+    for case in cases:
+        if name_filter and name_filter not in case.name:
+            continue
+        result = measure(case, repeat)
+        results.append(result)
+        if progress:
+            progress(result)
+    return results
+
+
+def write_report(path: str, scale: str, results: List[Dict]) -> Dict:
+    """Writes a JSON report of the results and returns it."""
+    report = {"environment": environment(), "scale": scale, "results": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    return report
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.1) -> List[Dict]:
+    """
+    Compares the median times of the cases found in both reports.
+
+    Args:
+    - baseline (Dict): The reference report.
+    - current (Dict): The report to judge.
+    - threshold (float, optional): Relative change of the median above which a case counts as a regression
+      or an improvement. Defaults to 0.1.
+
+    Returns:
+    - List[Dict]: One entry per common case, with `ratio` (current median / baseline median) and `status`,
+      "regression", "improvement" or "same".
+    """
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    changes = []
+    for result in current["results"]:
+        reference = baseline_results.get(result["name"])
+        if reference is None or not reference["median"]:
+            continue
+        ratio = result["median"] / reference["median"]
+        status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 - threshold else "same"
+        changes.append({"name": result["name"], "baseline": reference["median"], "current": result["median"],
+                        "ratio": ratio, "status": status})
+    return changes
+
+
+def format_result(result: Dict) -> str:
+    """Formats a result entry as one line of the console summary."""
+    throughput = result["throughput"]
+    if result["unit"] == "bytes":
+        rate = f"{throughput / (1 << 20):10.1f} MiB/s"
+    else:
+        rate = f"{throughput:10.0f} {result['unit']}/s"
+    return f"{result['name']:<55} {result['median'] * 1000:10.2f} ms  {rate}"
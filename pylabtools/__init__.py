@@ -1,8 +1,47 @@
-import os
-
-files = os.listdir(__path__[0])
-modules = (
-    x.replace(".py", "") for x in files if x.endswith(".py") and not x.startswith("__")
-)
-for module in modules:
-    __import__("pylabtools." + module)
\ No newline at end of file
+import importlib
+
+# Submodules are imported on first attribute access, so `import pylabtools` stays cheap and
+# only the wrappers in use pay for their dependencies (minio, tqdm, urllib3, multiprocessing).
+_SUBMODULES = ("file_wrapper", "log_wrapper", "minio_wrapper", "path_wrapper")
+
+# Public names available from the package itself, mapped to the submodule defining them
+_EXPORTS = {
+    "JSONLWriter": "file_wrapper",
+    "iter_jsonl": "file_wrapper",
+    "map_lines": "file_wrapper",
+    "process_files": "file_wrapper",
+    "reduce_lines": "file_wrapper",
+    "write_jsonl": "file_wrapper",
+    "BatchingFileHandler": "log_wrapper",
+    "DeduplicateFilter": "log_wrapper",
+    "JSONFormatter": "log_wrapper",
+    "LoggerSetup": "log_wrapper",
+    "SamplingFilter": "log_wrapper",
+    "AsyncMinioWrapper": "minio_wrapper",
+    "ContentCache": "minio_wrapper",
+    "MinioWrapper": "minio_wrapper",
+    "ObjectCache": "minio_wrapper",
+    "RetryPolicy": "minio_wrapper",
+    "TransferReport": "minio_wrapper",
+    "TransferScheduler": "minio_wrapper",
+    "DirectoryIndex": "path_wrapper",
+    "get_all_files": "path_wrapper",
+    "scan_files": "path_wrapper",
+}
+
+__all__ = list(_SUBMODULES) + list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+        # Cache it, later lookups skip __getattr__
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
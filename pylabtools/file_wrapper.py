@@ -1,62 +1,708 @@
+import functools
+import io
 import json
+import mmap
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator
+from typing import IO, Any, Callable, Generator, Iterable, Iterator, List, Optional, Tuple, Union
 
-def read_file_all_text(path: str, encoding: str = "utf-8") -> str:
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# A path, or an open file-like object such as `MinioWrapper.open_object` returns
+Source = Union[str, IO]
+
+FSYNC_POLICIES = ("none", "file", "full")
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Fastest JSON library installed: orjson, then ujson, then the standard library
+JSON_BACKEND = "orjson" if orjson is not None else "ujson" if ujson is not None else "json"
+
+if orjson is not None:
+    json_loads = orjson.loads
+
+    def json_dumps(obj: Any) -> bytes:
+        """Serializes an object to compact UTF-8 JSON bytes with the fastest JSON library installed."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+elif ujson is not None:
+    json_loads = ujson.loads
+
+    def json_dumps(obj: Any) -> bytes:
+        """Serializes an object to compact UTF-8 JSON bytes with the fastest JSON library installed."""
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+else:
+    json_loads = json.loads
+    _json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def json_dumps(obj: Any) -> bytes:
+        """Serializes an object to compact UTF-8 JSON bytes with the fastest JSON library installed."""
+        return _json_encoder.encode(obj).encode("utf-8")
+
+
+@contextmanager
+def _open_text(source: Source, encoding: str = "utf-8") -> Iterator[IO[str]]:
+    """Opens a path as text, or decodes an open stream as text without closing it."""
+    if not hasattr(source, "read"):
+        with open(source, "r", encoding=encoding) as f:
+            yield f
+    elif isinstance(source, io.TextIOBase):
+        yield source
+    else:
+        # Raw streams need a buffer for TextIOWrapper
+        buffered = None if isinstance(source, io.BufferedIOBase) else io.BufferedReader(source)
+        wrapper = io.TextIOWrapper(buffered or source, encoding=encoding)
+        try:
+            yield wrapper
+        finally:
+            # Leave the caller's stream open: the wrappers would close it when collected
+            wrapper.detach()
+            if buffered is not None:
+                buffered.detach()
+
+
+def read_file_all_text(path: Source, encoding: str = "utf-8") -> str:
     """
     Reads the entire content of a file and returns it as a single string.
 
     Args:
-        path (str): The path to the file.
+        path (str | IO): The path to the file, or an open binary or text stream.
         encoding (str, optional): The encoding of the file. Defaults to "utf-8".
 
     Returns:
         str: The entire content of the file.
     """
-    with open(path, "r", encoding=encoding) as f:
+    with _open_text(path, encoding) as f:
         return f.read()
 
-def stream_file_by_line(path: str, encoding: str = "utf-8") -> Generator[str, None, None]:
+def stream_file_by_line(path: Source, encoding: str = "utf-8") -> Generator[str, None, None]:
     """
     Streams the content of a file line by line.
 
     Args:
-        path (str): The path to the file.
+        path (str | IO): The path to the file, or an open binary or text stream
+            (e.g. `MinioWrapper.open_object`), which is left open.
         encoding (str, optional): The encoding of the file. Defaults to "utf-8".
 
     Yields:
         Generator[str, None, None]: Each line from the file.
     """
-    with open(path, "r", encoding=encoding) as f:
+    with _open_text(path, encoding) as f:
         for line in f:
             yield line.rstrip('\r\n')
 
 
-def write_text_to_file(path: str, content: str, encoding: str = "utf-8") -> None:
+def read_file_chunks(path: str, chunk_size: int = 1024 * 1024, start: int = 0, end: Optional[int] = None,
+                     reuse_buffer: bool = False) -> Generator[Union[bytes, memoryview], None, None]:
+    """
+    Reads a file, or a byte range of it, in fixed-size binary chunks.
+
+    Args:
+        path (str): The path to the file.
+        chunk_size (int, optional): Bytes per chunk. Defaults to 1 MiB.
+        start (int, optional): Offset of the first byte to read. Defaults to 0.
+        end (int, optional): Offset after the last byte to read. Defaults to the end of the file.
+        reuse_buffer (bool, optional): Read every chunk into the same buffer and yield a memoryview of it,
+            valid until the next chunk, instead of allocating a new bytes object per chunk. Defaults to False.
+
+    Yields:
+        Generator[bytes | memoryview, None, None]: Consecutive chunks of the file.
+    """
+    buffer = memoryview(bytearray(chunk_size)) if reuse_buffer else None
+    with open(path, "rb", buffering=0) as f:
+        end = os.fstat(f.fileno()).st_size if end is None else end
+        position = f.seek(start)
+        while position < end:
+            length = min(chunk_size, end - position)
+            if buffer is not None:
+                count = f.readinto(buffer[:length])
+                chunk = buffer[:count]
+            else:
+                chunk = f.read(length)
+                count = len(chunk)
+            if not count:
+                return
+            position += count
+            yield chunk
+
+
+@contextmanager
+def mmap_file(path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Maps a file into memory read-only, so its bytes are paged in on demand instead of being read up front.
+
+    Args:
+        path (str): The path to the file.
+
+    Yields:
+        mmap.mmap | bytes: The mapped file, or b"" for an empty file, which cannot be mapped.
+
+    Examples:
+    >>> with mmap_file("corpus.txt") as data:
+    ...     count = data.count(b"\n")
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            try:
+                mapped.close()
+            except BufferError:
+                # Views of the mapping are still alive; it is unmapped once they are released
+                pass
+
+
+def _line_start(data: Union[mmap.mmap, bytes], offset: int) -> int:
+    """Returns the offset of the first line starting at or after `offset`."""
+    if offset <= 0:
+        return 0
+    if data[offset - 1:offset] == b"\n":
+        return offset
+    newline = data.find(b"\n", offset)
+    return len(data) if newline < 0 else newline + 1
+
+
+def split_file_ranges(path: str, parts: int) -> List[Tuple[int, int]]:
+    """
+    Splits a file into byte ranges of about equal size whose boundaries fall on line starts.
+
+    Every line belongs to exactly one range, so the ranges can be handed to separate workers
+    reading them with `iter_line_batches` or `iter_line_views`.
+
+    Args:
+        path (str): The path to the file.
+        parts (int): The number of ranges wanted. Fewer are returned when the file has fewer lines.
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) byte offsets of every range.
+    """
+    with mmap_file(path) as data:
+        size = len(data)
+        boundaries = [0]
+        for i in range(1, parts):
+            boundary = _line_start(data, size * i // parts)
+            if boundaries[-1] < boundary < size:
+                boundaries.append(boundary)
+        boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+
+def iter_line_batches(path: str, encoding: Optional[str] = "utf-8", batch_bytes: int = 4 * 1024 * 1024,
+                      start: int = 0, end: Optional[int] = None) -> Generator[List, None, None]:
+    """
+    Streams the lines of a file in batches, decoding about `batch_bytes` of the mapped file at a time.
+
+    Lines are split on "\n" and a trailing "\r" is removed. With a byte range, the lines starting
+    within [start, end) are read, so ranges that split a line still read it exactly once.
+
+    Args:
+        path (str): The path to the file.
+        encoding (str, optional): The encoding of the file, or None for lines as bytes. Defaults to "utf-8".
+        batch_bytes (int, optional): Approximate number of bytes per batch. Defaults to 4 MiB.
+        start (int, optional): Offset of the range to read. Defaults to 0.
+        end (int, optional): Offset after the range to read. Defaults to the end of the file.
+
+    Yields:
+        Generator[List[str] | List[bytes], None, None]: Consecutive batches of lines.
+    """
+    with mmap_file(path) as data:
+        end = len(data) if end is None else min(end, len(data))
+        position = _line_start(data, start)
+        while position < end:
+            stop = _line_start(data, min(position + batch_bytes, end))
+            if stop <= position:
+                stop = _line_start(data, position + 1)
+            chunk = data[position:stop]
+            position = stop
+            if encoding:
+                chunk = chunk.decode(encoding)
+                newline, carriage_return = "\n", "\r\n"
+            else:
+                newline, carriage_return = b"\n", b"\r\n"
+            if carriage_return in chunk:
+                chunk = chunk.replace(carriage_return, newline)
+            lines = chunk.split(newline)
+            if not lines[-1]:
+                lines.pop()
+            yield lines
+
+
+def iter_line_views(path: str, start: int = 0, end: Optional[int] = None) -> Generator[memoryview, None, None]:
+    """
+    Streams the lines of a file as zero-copy memoryview slices of the mapped file, without their line endings.
+
+    The views are only valid while the generator runs; copy a line with `bytes(view)` to keep it.
+    With a byte range, the lines starting within [start, end) are read.
+
+    Args:
+        path (str): The path to the file.
+        start (int, optional): Offset of the range to read. Defaults to 0.
+        end (int, optional): Offset after the range to read. Defaults to the end of the file.
+
+    Yields:
+        Generator[memoryview, None, None]: Each line of the file.
+    """
+    with mmap_file(path) as data:
+        view = memoryview(data)
+        try:
+            end = len(data) if end is None else min(end, len(data))
+            position = _line_start(data, start)
+            while position < end:
+                newline = data.find(b"\n", position)
+                stop = len(data) if newline < 0 else newline
+                line_end = stop - 1 if stop > position and data[stop - 1] == 13 else stop
+                yield view[position:line_end]
+                position = stop + 1
+        finally:
+            view.release()
+
+
+def _file_shards(paths: Iterable[str], shard_bytes: int) -> Iterator[Tuple[str, int, Optional[int]]]:
+    """Yields (path, start, end) of every shard, splitting files larger than `shard_bytes` on line starts."""
+    for path in paths:
+        size = os.path.getsize(path)
+        if size <= shard_bytes:
+            yield path, 0, None
+        else:
+            for start, end in split_file_ranges(path, -(-size // shard_bytes)):
+                yield path, start, end
+
+
+class _NoResult:
+    """Initial value of a shard reduction, skipped by `_reduce_skipping_empty`."""
+
+    def __reduce__(self):
+        return "_NO_RESULT"
+
+
+_NO_RESULT = _NoResult()
+
+
+def _reduce_skipping_empty(reduce_fn: Callable[[Any, Any], Any], left: Any, right: Any) -> Any:
+    if left is _NO_RESULT:
+        return right
+    if right is _NO_RESULT:
+        return left
+    return reduce_fn(left, right)
+
+
+def _process_shard(fn: Callable[[List], Any], path: str, start: int, end: Optional[int], encoding: Optional[str],
+                   batch_bytes: int, reduce_fn: Optional[Callable[[Any, Any], Any]]) -> Any:
+    """Applies `fn` to every line batch of a shard; returns the list of results, or their reduction."""
+    results = (fn(batch) for batch in iter_line_batches(path, encoding=encoding, batch_bytes=batch_bytes,
+                                                        start=start, end=end))
+    if reduce_fn is None:
+        return list(results)
+    return functools.reduce(reduce_fn, results, _NO_RESULT)
+
+
+def _apply_per_line(fn: Callable[[str], Any], batch: List) -> List:
+    return [fn(line) for line in batch]
+
+
+def process_files(fn: Callable[[List], Any], paths: Union[str, Iterable[str]], workers: Optional[int] = None,
+                  encoding: Optional[str] = "utf-8", batch_bytes: int = 1024 * 1024, shard_bytes: int = 16 * 1024 * 1024,
+                  ordered: bool = True, max_pending: Optional[int] = None,
+                  reduce_fn: Optional[Callable[[Any, Any], Any]] = None) -> Generator[Any, None, None]:
+    """
+    Applies a function to every batch of lines of many files on a process pool.
+
+    Files are cut into shards of about `shard_bytes`, on line boundaries, and every worker reads its
+    shards itself with `iter_line_batches`, so lines are never sent between processes. At most
+    `max_pending` shards are in flight; the next one is only submitted once a result has been consumed.
+
+    Args:
+        fn (Callable[[List], Any]): Called with each batch of lines. Must be picklable, i.e. defined at module level.
+        paths (str | Iterable[str]): A file path, or the paths of the files (e.g. from `path_wrapper.get_all_files`).
+        workers (int, optional): Number of worker processes, 0 to run in this process. Defaults to the number of CPUs.
+        encoding (str, optional): The encoding of the files, or None for lines as bytes. Defaults to "utf-8".
+        batch_bytes (int, optional): Approximate number of bytes per batch of lines. Defaults to 1 MiB.
+        shard_bytes (int, optional): Approximate number of bytes per shard sent to a worker. Defaults to 16 MiB.
+        ordered (bool, optional): Yield results in file and line order, else as shards complete. Defaults to True.
+        max_pending (int, optional): Maximum number of shards in flight. Defaults to twice the number of workers.
+        reduce_fn (Callable[[Any, Any], Any], optional): Combines the results of a shard in the worker, so one
+            result per shard is yielded instead of one per batch.
+
+    Yields:
+        Generator[Any, None, None]: The result of `fn` for every batch, or the reduced result of every shard.
+
+    Examples:
+    >>> for counts in process_files(count_words, get_all_files("corpus", endswith=".txt")):
+    ...     total.update(counts)
+    """
+    paths = [paths] if isinstance(paths, (str, os.PathLike)) else paths
+    if reduce_fn is not None:
+        reduce_fn = functools.partial(_reduce_skipping_empty, reduce_fn)
+    shard_args = ((fn, path, start, end, encoding, batch_bytes, reduce_fn)
+                  for path, start, end in _file_shards(paths, shard_bytes))
+
+    def _results(shard_result):
+        if reduce_fn is None:
+            yield from shard_result
+        elif shard_result is not _NO_RESULT:
+            yield shard_result
+
+    if workers == 0:
+        for args in shard_args:
+            yield from _results(_process_shard(*args))
+        return
+
+    # Imported here, concurrent.futures.process pulls in multiprocessing which most callers never need
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard_result in _run_bounded(executor, _process_shard, shard_args, max_pending, ordered):
+            yield from _results(shard_result)
+
+
+def _run_bounded(executor: Executor, fn: Callable, args_iterable: Iterator[Tuple], max_pending: int,
+                 ordered: bool) -> Iterator[Any]:
+    """Runs `fn` on every argument tuple with at most `max_pending` calls submitted and not yet yielded."""
+    pending = deque()
+    args_iterable = iter(args_iterable)
+    while True:
+        while len(pending) < max_pending:
+            args = next(args_iterable, None)
+            if args is None:
+                break
+            pending.append(executor.submit(fn, *args))
+        if not pending:
+            return
+        if ordered:
+            yield pending.popleft().result()
+        else:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                yield future.result()
+
+
+def map_lines(fn: Callable[[str], Any], paths: Union[str, Iterable[str]], **kwargs) -> Generator[Any, None, None]:
+    """
+    Applies a function to every line of many files on a process pool.
+
+    Args:
+        fn (Callable[[str], Any]): Called with each line. Must be picklable, i.e. defined at module level.
+        paths (str | Iterable[str]): A file path, or the paths of the files.
+        **kwargs: Options of `process_files`, other than `reduce_fn`.
+
+    Yields:
+        Generator[Any, None, None]: The result of `fn` for every line, in order unless `ordered=False`.
+    """
+    for results in process_files(functools.partial(_apply_per_line, fn), paths, **kwargs):
+        yield from results
+
+
+def reduce_lines(fn: Callable[[List], Any], reduce_fn: Callable[[Any, Any], Any], paths: Union[str, Iterable[str]],
+                 initial: Any = None, **kwargs) -> Any:
+    """
+    Maps every batch of lines of many files with `fn` on a process pool and reduces the results with `reduce_fn`.
+
+    The results of every shard are reduced in its worker, so only one value per shard is sent back.
+
+    Args:
+        fn (Callable[[List], Any]): Called with each batch of lines. Must be picklable.
+        reduce_fn (Callable[[Any, Any], Any]): Associative function combining two results. Must be picklable.
+        paths (str | Iterable[str]): A file path, or the paths of the files.
+        initial (Any, optional): Value the results are reduced onto. Defaults to None to start from the first result.
+        **kwargs: Options of `process_files`.
+
+    Returns:
+        Any: The reduced result, or `initial` when there are no lines.
+
+    Examples:
+    >>> total_lines = reduce_lines(len, operator.add, get_all_files("corpus"), initial=0)
+    """
+    reduced = _NO_RESULT if initial is None else initial
+    for result in process_files(fn, paths, reduce_fn=reduce_fn, ordered=kwargs.pop("ordered", False), **kwargs):
+        reduced = _reduce_skipping_empty(reduce_fn, reduced, result)
+    return None if reduced is _NO_RESULT else reduced
+
+
+def _fsync_directory(path: str) -> None:
+    """Makes the latest rename in the directory of `path` durable, where the OS supports it."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_text_to_file(path: str, content: Union[str, Iterable[str]], encoding: str = "utf-8", atomic: bool = False,
+                       fsync: str = "none") -> None:
     """Write text to file
 
+    In atomic mode the text is written to a temporary file next to `path`, which then replaces `path`
+    with `os.replace`, so readers and crashes only ever see the old or the new content.
+
     Args:
         path (str): Path to the output file.
-        content (str): Content to write.
+        content (str | Iterable[str]): Content to write, or chunks written with a single buffered `writelines`.
         encoding (str, optional): Encoding of the file. Defaults to "utf-8".
+        atomic (bool, optional): Replace the file atomically. Defaults to False.
+        fsync (str, optional): "none", "file" to fsync the file before closing it, or "full" to also fsync
+            the directory after an atomic replace. Defaults to "none".
     """
-    with open(path, "w", encoding=encoding) as f:
-        f.write(content)
+    if fsync not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {fsync}")
+    target = path
+    if atomic:
+        target = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if isinstance(content, str):
+            f = open(target, "w", encoding=encoding)
+        else:
+            # Chunks are gathered in one large buffer before reaching the file
+            f = open(target, "w", encoding=encoding, buffering=WRITE_BUFFER_SIZE)
+        with f:
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                f.writelines(content)
+            if fsync != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        if atomic:
+            os.replace(target, path)
+    except BaseException:
+        if atomic and os.path.exists(target):
+            os.remove(target)
+        raise
+    if atomic and fsync == "full":
+        _fsync_directory(path)
 
 
-def read_json_config(path: str) -> dict:
+def write_many_files(items: Iterable[Tuple[str, Union[str, Iterable[str]]]], encoding: str = "utf-8",
+                     atomic: bool = False, fsync: str = "none", workers: int = 4, makedirs: bool = False) -> int:
+    """Write many files on a small thread pool
+
+    Writes overlap their open, write and close system calls on `workers` threads. At most twice as
+    many files as workers are pending, so `items` can be a generator of any length.
+
+    Args:
+        items (Iterable[Tuple[str, str | Iterable[str]]]): (path, content) of every file, as for `write_text_to_file`.
+        encoding (str, optional): Encoding of the files. Defaults to "utf-8".
+        atomic (bool, optional): Replace every file atomically. Defaults to False.
+        fsync (str, optional): fsync policy of every file, see `write_text_to_file`. Defaults to "none".
+        workers (int, optional): Number of writer threads. Defaults to 4.
+        makedirs (bool, optional): Create missing parent directories. Defaults to False.
+
+    Returns:
+        int: The number of files written.
+
+    Examples:
+    >>> write_many_files(((f"out/{name}.txt", text) for name, text in results.items()), atomic=True)
+    """
+    def _write(path, content):
+        if makedirs:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        write_text_to_file(path, content, encoding=encoding, atomic=atomic, fsync=fsync)
+
+    count = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="file-writer") as executor:
+        for _ in _run_bounded(executor, _write, iter(items), workers * 2, ordered=False):
+            count += 1
+    return count
+
+
+def read_json_config(path: Source) -> dict:
     """Read JSON config file
 
     Args:
-        path (str): Path to the config file.
+        path (str | IO): Path to the config file, or an open binary or text stream.
 
     Returns:
         dict: Configuration as a dictionary.
     """
-    with open(path, "r", encoding="utf-8") as f:
+    with _open_text(path) as f:
         return json.load(f)
 
 
+def read_json(path: str) -> Any:
+    """Read a JSON file with the fastest JSON library installed
+
+    Args:
+        path (str): Path to the JSON file.
+
+    Returns:
+        Any: The parsed content.
+    """
+    with open(path, "rb") as f:
+        return json_loads(f.read())
+
+
+def write_json(path: str, obj: Any) -> None:
+    """Write an object to a compact JSON file with the fastest JSON library installed
+
+    Args:
+        path (str): Path to the output file.
+        obj (Any): The object to serialize.
+    """
+    with open(path, "wb") as f:
+        f.write(json_dumps(obj))
+
+
+def _parse_jsonl_batch(lines: List[bytes]) -> List[Any]:
+    return [json_loads(line) for line in lines if line and not line.isspace()]
+
+
+def _apply_jsonl(fn: Callable[[List[Any]], Any], lines: List[bytes]) -> Any:
+    return fn(_parse_jsonl_batch(lines))
+
+
+def iter_jsonl_batches(path: str, batch_bytes: int = 4 * 1024 * 1024, start: int = 0,
+                       end: Optional[int] = None) -> Generator[List[Any], None, None]:
+    """Stream the records of a JSONL file in batches, parsing about `batch_bytes` of the file at a time
+
+    Blank lines are skipped. A byte range reads the records whose line starts within [start, end).
+
+    Args:
+        path (str): Path to the JSONL file.
+        batch_bytes (int, optional): Approximate number of bytes per batch. Defaults to 4 MiB.
+        start (int, optional): Offset of the range to read. Defaults to 0.
+        end (int, optional): Offset after the range to read. Defaults to the end of the file.
+
+    Yields:
+        Generator[List[Any], None, None]: Consecutive batches of records.
+    """
+    for lines in iter_line_batches(path, encoding=None, batch_bytes=batch_bytes, start=start, end=end):
+        yield _parse_jsonl_batch(lines)
+
+
+def iter_jsonl(path: str, **kwargs) -> Generator[Any, None, None]:
+    """Stream the records of a JSONL file one by one
+
+    Args:
+        path (str): Path to the JSONL file.
+        **kwargs: Options of `iter_jsonl_batches`.
+
+    Yields:
+        Generator[Any, None, None]: Each record.
+    """
+    for records in iter_jsonl_batches(path, **kwargs):
+        yield from records
+
+
+def process_jsonl(fn: Optional[Callable[[List[Any]], Any]], paths: Union[str, Iterable[str]],
+                  **kwargs) -> Generator[Any, None, None]:
+    """Parse JSONL files on a process pool and apply a function to every batch of records in the workers
+
+    Files are sharded across workers as in `process_files`, and every worker parses its own shards, so
+    only the results of `fn` are sent back. Reduce them in the workers with `reduce_fn` when possible.
+
+    Args:
+        fn (Callable[[List[Any]], Any], optional): Called with each batch of records. Must be picklable.
+            None sends the parsed records back.
+        paths (str | Iterable[str]): A file path, or the paths of the JSONL files.
+        **kwargs: Options of `process_files` (workers, batch_bytes, shard_bytes, ordered, max_pending, reduce_fn).
+
+    Yields:
+        Generator[Any, None, None]: The result of `fn` for every batch, or the reduced result of every shard.
+
+    Examples:
+    >>> errors = sum(process_jsonl(count_errors, "events.jsonl", reduce_fn=operator.add))
+    """
+    batch_fn = _parse_jsonl_batch if fn is None else functools.partial(_apply_jsonl, fn)
+    yield from process_files(batch_fn, paths, encoding=None, **kwargs)
+
+
+class JSONLWriter:
+    """
+    A buffered JSONL writer serializing records in batches.
+
+    Records are serialized once `buffer_records` have been buffered, and each batch is written with a
+    single write call.
+
+    Examples:
+    >>> with JSONLWriter("events.jsonl") as writer:
+    ...     for event in events:
+    ...         writer.write(event)
+    """
+
+    def __init__(self, path: str, mode: str = "w", buffer_records: int = 1000):
+        """
+        Open the file.
+
+        Args:
+            path (str): Path to the JSONL file.
+            mode (str, optional): "w" to overwrite or "a" to append. Defaults to "w".
+            buffer_records (int, optional): Number of records buffered before a write. Defaults to 1000.
+        """
+        self.path = path
+        self.buffer_records = buffer_records
+        self.count = 0
+        self._buffer = []
+        self._file = open(path, mode + "b")
+
+    def write(self, record: Any) -> None:
+        """Buffer a record, writing the buffer once it is full."""
+        self._buffer.append(record)
+        if len(self._buffer) >= self.buffer_records:
+            self.flush()
+
+    def write_many(self, records: Iterable[Any]) -> None:
+        """Buffer many records."""
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        """Serialize and write the buffered records."""
+        if self._buffer:
+            self._file.write(b"".join(json_dumps(record) + b"\n" for record in self._buffer))
+            self.count += len(self._buffer)
+            self._buffer = []
+        self._file.flush()
+
+    def close(self) -> None:
+        """Write the buffered records and close the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> "JSONLWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_jsonl(path: str, records: Iterable[Any], mode: str = "w") -> int:
+    """Write records to a JSONL file in batches
+
+    Args:
+        path (str): Path to the JSONL file.
+        records (Iterable[Any]): The records to write.
+        mode (str, optional): "w" to overwrite or "a" to append. Defaults to "w".
+
+    Returns:
+        int: The number of records written.
+    """
+    with JSONLWriter(path, mode=mode) as writer:
+        writer.write_many(records)
+    return writer.count
+
+
 def get_file_name_without_extension(path: str) -> str:
     """Get file name without extension
 
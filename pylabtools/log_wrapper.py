@@ -1,42 +1,528 @@
 import logging
-from typing import Optional, Union
+import logging.handlers
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Union
 from pathlib import Path
+from collections import OrderedDict
+import atexit
+import copy
+from datetime import datetime
+import glob
+import gzip
 import json
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from operator import attrgetter, methodcaller
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop")
+
+# Output key -> LogRecord attribute of the fields written by default
+DEFAULT_FIELDS = {
+    'timestamp': 'created',
+    'level': 'levelname',
+    'message': 'message',
+    'module': 'module',
+    'line': 'lineno',
+    'funcName': 'funcName',
+    'pathname': 'pathname',
+}
+
+# Attributes every LogRecord has, anything else on a record came from `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {'message', 'asctime'}
+
+def _dumps_orjson(data: Dict) -> str:
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+_json_encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+
+def _dumps_json(data: Dict) -> str:
+    return _json_encoder.encode(data)
+
 
 class JSONFormatter(logging.Formatter):
     """
     A custom formatter for logging messages as JSON.
+
+    The fields to write are resolved once at construction, and records are serialized with orjson when
+    it is installed, falling back to the standard json module.
     
     Methods:
         format: Returns the log message formatted as a JSON string.
     """
+
+    def __init__(self, fields: Optional[Union[Sequence[str], Dict[str, str]]] = None, extra: bool = True,
+                 backend: str = 'auto'):
+        """
+        Initialize the formatter.
+
+        Args:
+            fields (Sequence[str] | Dict[str, str], optional): LogRecord attributes to write, or a mapping of
+                output key to LogRecord attribute. Defaults to DEFAULT_FIELDS.
+            extra (bool): Also write the fields passed with `extra=` to the logging call. Defaults to True.
+            backend (str): 'orjson', 'json' or 'auto' to use orjson when installed. Defaults to 'auto'.
+        """
+        super().__init__()
+        if fields is None:
+            fields = DEFAULT_FIELDS
+        elif not isinstance(fields, dict):
+            fields = {field: field for field in fields}
+        if backend == 'auto':
+            backend = 'orjson' if orjson is not None else 'json'
+        if backend == 'orjson' and orjson is None:
+            raise ImportError("orjson is not installed")
+        if backend not in ('orjson', 'json'):
+            raise ValueError(f"Unknown JSON backend: {backend}")
+        self.fields = dict(fields)
+        self.extra = extra
+        self.backend = backend
+        self._dumps: Callable[[Dict], str] = _dumps_orjson if backend == 'orjson' else _dumps_json
+        self._plan = [(key, methodcaller('getMessage') if attribute == 'message' else attrgetter(attribute))
+                      for key, attribute in self.fields.items()]
+        self._skip = _RECORD_ATTRIBUTES | set(self.fields)
     
     def format(self, record: logging.LogRecord) -> str:
         """Return the log message formatted as JSON."""
-        log_data = {
-            'timestamp': record.created,
-            'level': record.levelname,
-            'message': record.getMessage(),
-            'module': record.module,
-            'line': record.lineno,
-            'funcName': record.funcName,
-            'pathname': record.pathname
-        }
-        return json.dumps(log_data, ensure_ascii=False)
+        log_data = {key: getter(record) for key, getter in self._plan}
+        if self.extra:
+            extra_keys = record.__dict__.keys() - self._skip
+            if extra_keys:
+                log_data.update((key, record.__dict__[key]) for key in extra_keys)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_data['exc_info'] = record.exc_text
+        if record.stack_info:
+            log_data['stack_info'] = self.formatStack(record.stack_info)
+        return self._dumps(log_data)
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    A queue handler that leaves formatting to the listener and applies an overflow policy when the queue is full.
+
+    Overflow policies:
+        block: Wait for room in the queue.
+        drop_oldest: Discard the oldest queued record to make room for the new one.
+        drop: Discard the new record.
+
+    Attributes:
+        overflow (str): The overflow policy.
+        dropped (int): Number of records discarded because the queue was full.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "block"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the arguments into the message, which may change after the call, and defer formatting."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a record on the queue according to the overflow policy."""
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        with self._drop_lock:
+            self.dropped += 1
+            if self.overflow == "drop_oldest":
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    self.queue.put_nowait(record)
+                except queue.Full:
+                    pass
+
+
+class ProcessQueueHandler(BoundedQueueHandler):
+    """
+    A bounded queue handler sending records to another process.
+
+    Tracebacks are rendered to text before the record is pickled, as traceback objects cannot cross processes.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """A queue listener whose stop waits for room in a full queue instead of failing."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+class BatchingFileHandler(logging.Handler):
+    """
+    A file handler that buffers formatted records in memory and writes them in batches, with rotation.
+
+    The buffer is written with a single write call once it holds `buffer_size` bytes, every
+    `flush_interval` seconds, and at once for records of `flush_level` or above. Before a write, the file
+    is rotated when the batch would take it past `max_bytes` or when `rotate_interval` seconds have passed:
+    it is renamed to `<filename>.<YYYYmmdd-HHMMSS-ffffff>` and, with `compress`, gzipped in a background thread.
+
+    Attributes:
+        filename (str): Absolute path of the active log file.
+        backup_count (int): Number of rotated segments kept, 0 to keep all.
+    """
+
+    def __init__(self, filename: Union[str, Path], mode: str = 'a', encoding: str = 'utf-8',
+                 buffer_size: int = 64 * 1024, flush_interval: float = 1.0, flush_level: int = logging.ERROR,
+                 max_bytes: int = 0, rotate_interval: Optional[float] = None, backup_count: int = 0,
+                 compress: bool = False):
+        """
+        Initialize the handler and open the file.
+
+        Args:
+            filename (str | Path): Path to the log file.
+            mode (str): File mode, 'a' or 'w'. Defaults to 'a'.
+            encoding (str): File encoding. Defaults to 'utf-8'.
+            buffer_size (int): Bytes buffered before a write. Defaults to 64 KiB.
+            flush_interval (float): Maximum seconds a record waits in the buffer, 0 for no timer. Defaults to 1.0.
+            flush_level (int): Records of this level or above are written at once. Defaults to logging.ERROR.
+            max_bytes (int): Rotate before the file exceeds this size, 0 for no size rotation. Defaults to 0.
+            rotate_interval (float, optional): Rotate after this many seconds. Defaults to None.
+            backup_count (int): Number of rotated segments kept, 0 to keep all. Defaults to 0.
+            compress (bool): Gzip rotated segments in the background. Defaults to False.
+        """
+        super().__init__()
+        self.filename = os.path.abspath(filename)
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.flush_level = flush_level
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.compress = compress
+        self._buffer = []
+        self._buffered = 0
+        self._compressions = []
+        self._stream = open(self.filename, mode + 'b')
+        self._size = self._stream.seek(0, os.SEEK_END)
+        self._rollover_at = time.time() + rotate_interval if rotate_interval else None
+        self._stopping = threading.Event()
+        self._timer = None
+        if flush_interval:
+            self._timer = threading.Thread(target=self._flush_periodically, args=(flush_interval,), daemon=True,
+                                           name="log-flush")
+            self._timer.start()
+
+    def _flush_periodically(self, interval: float) -> None:
+        while not self._stopping.wait(interval):
+            self.flush()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Add a formatted record to the buffer, writing the buffer when it is full."""
+        try:
+            data = (self.format(record) + '\n').encode(self.encoding)
+            self._buffer.append(data)
+            self._buffered += len(data)
+            if self._buffered >= self.buffer_size or record.levelno >= self.flush_level:
+                self._write()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Write the buffered records to the file."""
+        self.acquire()
+        try:
+            if self._buffer:
+                self._write()
+            if self._stream:
+                self._stream.flush()
+        finally:
+            self.release()
+
+    def _write(self) -> None:
+        if self._stream is None:
+            return
+        data = b''.join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        if self._should_rotate(len(data)):
+            self._rotate()
+        self._stream.write(data)
+        self._stream.flush()
+        self._size += len(data)
+
+    def _should_rotate(self, size: int) -> bool:
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size + size > self.max_bytes:
+            return True
+        return self._rollover_at is not None and time.time() >= self._rollover_at
+
+    def _rotate(self) -> None:
+        """Rename the active file to a timestamped segment and start a new one."""
+        self._stream.close()
+        rotated = f"{self.filename}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        os.replace(self.filename, rotated)
+        self._stream = open(self.filename, 'wb')
+        self._size = 0
+        if self.rotate_interval:
+            self._rollover_at = time.time() + self.rotate_interval
+        self._compressions = [thread for thread in self._compressions if thread.is_alive()]
+        if self.compress:
+            thread = threading.Thread(target=self._compress, args=(rotated,), daemon=True, name="log-gzip")
+            thread.start()
+            self._compressions.append(thread)
+        else:
+            self._remove_old_segments()
+
+    def _compress(self, path: str) -> None:
+        with open(path, 'rb') as source, gzip.open(path + '.gz.tmp', 'wb') as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.replace(path + '.gz.tmp', path + '.gz')
+        os.remove(path)
+        self._remove_old_segments()
+
+    def rotated_segments(self) -> list:
+        """Return the paths of the rotated segments, oldest first."""
+        segments = glob.glob(glob.escape(self.filename) + '.*')
+        return sorted(segment for segment in segments if not segment.endswith('.tmp'))
+
+    def _remove_old_segments(self) -> None:
+        if not self.backup_count:
+            return
+        segments = self.rotated_segments()
+        for segment in segments[:max(0, len(segments) - self.backup_count)]:
+            try:
+                os.remove(segment)
+            except FileNotFoundError:
+                pass
+
+    def close(self) -> None:
+        """Write the buffered records, wait for pending compressions and close the file."""
+        self._stopping.set()
+        if self._timer and self._timer is not threading.current_thread():
+            self._timer.join()
+        self.acquire()
+        try:
+            if self._stream:
+                self.flush()
+                self._stream.close()
+                self._stream = None
+        finally:
+            self.release()
+        for thread in self._compressions:
+            thread.join()
+        super().close()
+
+
+def _template_key(record: logging.LogRecord) -> Hashable:
+    """Key of the call site of a record: its logger and unformatted message."""
+    return record.name, record.msg
+
+
+class LazyArg:
+    """
+    A log argument computed only if the record is actually formatted.
+
+    Examples:
+    >>> logger.debug("state: %s", LazyArg(lambda: json.dumps(big_state)))
+    """
+    __slots__ = ('fn',)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self.fn = fn
+
+    def __str__(self) -> str:
+        return str(self.fn())
+
+    def __repr__(self) -> str:
+        return repr(self.fn())
+
+
+class SamplingFilter(logging.Filter):
+    """
+    A filter keeping 1 in `rate` records and at most `per_second` records per second for each message key.
+
+    Keys default to the logger and unformatted message, so a filter never formats the records it drops.
+    Records above `max_level` always pass.
+
+    Attributes:
+        dropped (int): Number of records dropped.
+    """
+
+    def __init__(self, rate: int = 1, per_second: Optional[float] = None,
+                 key: Callable[[logging.LogRecord], Hashable] = _template_key, max_level: int = logging.INFO):
+        """
+        Initialize the filter.
+
+        Args:
+            rate (int): Keep 1 in `rate` records of each key. Defaults to 1.
+            per_second (float, optional): Keep at most this many records per second of each key, with bursts of
+                up to one second's worth. Defaults to None for no limit.
+            key (Callable[[LogRecord], Hashable]): Key of the records sampled together. Defaults to logger and message template.
+            max_level (int): Records above this level are never dropped. Defaults to logging.INFO.
+        """
+        super().__init__()
+        self.rate = rate
+        self.per_second = per_second
+        self.key = key
+        self.max_level = max_level
+        self.dropped = 0
+        self._counts = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        key = self.key(record)
+        with self._lock:
+            if self.rate > 1:
+                count = self._counts.get(key, 0)
+                self._counts[key] = count + 1
+                if count % self.rate:
+                    self.dropped += 1
+                    return False
+            if self.per_second is not None:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(key, (self.per_second, now))
+                tokens = min(self.per_second, tokens + (now - last) * self.per_second)
+                if tokens < 1:
+                    self._buckets[key] = (tokens, now)
+                    self.dropped += 1
+                    return False
+                self._buckets[key] = (tokens - 1, now)
+        return True
+
+
+class DeduplicateFilter(logging.Filter):
+    """
+    A filter collapsing bursts of identical records into one record and a "repeated N times" summary.
+
+    The first record of a burst passes. Identical records (same logger, level, message template and
+    arguments) within `window` seconds of it are dropped. Every record seen by the filter ends the bursts
+    older than `window` and logs their summaries with the number of records dropped, as does `flush`.
+    At most `max_keys` bursts are tracked; beyond that the oldest one is ended early.
+    """
+
+    def __init__(self, window: float = 1.0, max_keys: int = 10000):
+        """
+        Initialize the filter.
+
+        Args:
+            window (float): Seconds during which identical records are collapsed. Defaults to 1.0.
+            max_keys (int): Maximum number of bursts tracked at once. Defaults to 10000.
+        """
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        # Bursts in the order they started: [start, dropped, last dropped record]
+        self._bursts = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(record: logging.LogRecord) -> Hashable:
+        key = (record.name, record.levelno, record.msg, record.args)
+        try:
+            hash(key)
+        except TypeError:
+            key = (record.name, record.levelno, record.getMessage())
+        return key
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, 'repeated', None):
+            return True
+        key = self._key(record)
+        now = time.monotonic()
+        ended = []
+        with self._lock:
+            while self._bursts and now - next(iter(self._bursts.values()))[0] >= self.window:
+                ended.append(self._bursts.popitem(last=False)[1])
+            burst = self._bursts.get(key)
+            if burst:
+                burst[1] += 1
+                burst[2] = record
+            else:
+                if len(self._bursts) >= self.max_keys:
+                    ended.append(self._bursts.popitem(last=False)[1])
+                self._bursts[key] = [now, 0, None]
+        for _, count, dropped in ended:
+            if count:
+                self._log_summary(dropped, count)
+        return burst is None
+
+    @staticmethod
+    def _log_summary(record: logging.LogRecord, count: int) -> None:
+        summary = copy.copy(record)
+        summary.msg = f"{record.getMessage()} (repeated {count} times)"
+        summary.args = None
+        summary.repeated = count
+        logging.getLogger(record.name).handle(summary)
+
+    def flush(self) -> None:
+        """Log the summaries of the bursts still collapsing."""
+        with self._lock:
+            bursts = [burst for burst in self._bursts.values() if burst[1]]
+            self._bursts = OrderedDict()
+        for _, count, record in bursts:
+            self._log_summary(record, count)
+
 
 class LoggerSetup:
     """
     A class to configure a logger with options for JSON formatted logging to file and console.
+
+    Configuring the same logger again is idempotent: a handler writing to the same file or stream, or the
+    queue of an earlier async setup, is reused instead of being added twice.
+
+    In async mode the logger only puts records on a bounded queue; a background listener thread formats
+    them and writes them to the file and console handlers, so a slow disk never blocks the caller. With
+    `multiprocess`, the queue is a multiprocessing queue: worker processes set up with `configure_worker`
+    send their records to it, and the listener of this process is the single writer of every handler.
     
     Methods:
         add_file_handler: Adds a file handler to the logger.
         add_console_handler: Adds a console handler to the logger.
         set_custom_format: Sets a custom formatter for logging messages.
         get_logger: Returns the configured logger.
+        shutdown: Writes the queued records and stops the listener in async mode.
+        configure_worker: Sends the records of a worker process to the queue of a multiprocess setup.
     """
     
-    def __init__(self, log_level: int = logging.DEBUG):
+    def __init__(self, log_level: int = logging.DEBUG, async_mode: bool = False, queue_size: int = 10000,
+                 overflow: str = "block", name: Optional[str] = None, multiprocess: bool = False):
         """Initialize the LoggerSetup with the desired log level.
+
+        Args:
+            log_level (int): Level of the logger. Defaults to logging.DEBUG.
+            async_mode (bool): Route records through a queue to a listener thread. Defaults to False.
+            queue_size (int): Maximum number of records waiting in the queue in async mode. Defaults to 10000.
+            overflow (str): What to do when the queue is full: 'block', 'drop_oldest' or 'drop'. Defaults to 'block'.
+            name (str, optional): Name of the logger to configure. Defaults to None for the root logger.
+            multiprocess (bool): Use a queue that worker processes can write to; implies async_mode. Defaults to False.
         
         Examples:
         >>> logger_setup = LoggerSetup(log_level=logging.DEBUG)
@@ -46,10 +532,108 @@ class LoggerSetup:
         >>> logger_setup.add_console_handler()
         >>> logger = logger_setup.get_logger()
         >>> logger.debug("This is a debug message.")
+
+        >>> logger_setup = LoggerSetup(async_mode=True, overflow="drop")
+        >>> logger_setup.add_file_handler("logfile.log")
+        >>> logger_setup.get_logger().info("Written by the listener thread.")
+        >>> logger_setup.shutdown()
+
+        >>> logger_setup = LoggerSetup(multiprocess=True)
+        >>> logger_setup.add_file_handler("logfile.log")
+        >>> with ProcessPoolExecutor(initializer=LoggerSetup.configure_worker, initargs=(logger_setup.queue,)) as executor:
+        ...     list(executor.map(work, items))
+        >>> logger_setup.shutdown()
         """
-        self.logger = logging.getLogger()
+        self.logger = logging.getLogger(name)
         self.logger.setLevel(log_level)
         self.formatter = JSONFormatter()
+        # Adopt the queue of an earlier async setup of this logger, whose listener owns the handlers
+        self.queue_handler = next((handler for handler in self.logger.handlers
+                                   if isinstance(handler, BoundedQueueHandler) and hasattr(handler, 'listener')), None)
+        self.listener = self.queue_handler.listener if self.queue_handler else None
+        if self.listener is None and (async_mode or multiprocess):
+            if multiprocess:
+                # Imported here, the single-process setups never pay for it
+                import multiprocessing
+                log_queue = multiprocessing.Queue(maxsize=queue_size)
+                self.queue_handler = ProcessQueueHandler(log_queue, overflow=overflow)
+            else:
+                self.queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size), overflow=overflow)
+            self.listener = _QueueListener(self.queue_handler.queue, respect_handler_level=True)
+            self.queue_handler.listener = self.listener
+            self.listener.start()
+            self.logger.addHandler(self.queue_handler)
+            atexit.register(self.shutdown)
+
+    @property
+    def queue(self) -> Optional[Union[queue.Queue, "multiprocessing.Queue"]]:
+        """The queue records go through in async mode, to hand to `configure_worker` in multiprocess mode."""
+        return self.queue_handler.queue if self.queue_handler else None
+
+    @staticmethod
+    def configure_worker(log_queue: "multiprocessing.Queue", log_level: int = logging.DEBUG, name: Optional[str] = None,
+                         overflow: str = "block") -> logging.Logger:
+        """
+        Send every record of this worker process to the queue of a multiprocess LoggerSetup.
+
+        Handlers inherited from the parent process are removed, so workers never open or write the
+        parent's files themselves. Meant as the initializer of a `ProcessPoolExecutor` or `multiprocessing.Pool`.
+        Let the workers exit normally (`Pool.close` and `Pool.join` rather than `Pool.terminate`, which the
+        `with` block of a Pool calls), since a killed worker loses the records it has not sent yet.
+
+        Args:
+            log_queue (multiprocessing.Queue): The `queue` of the parent's LoggerSetup.
+            log_level (int): Level of the logger. Defaults to logging.DEBUG.
+            name (str, optional): Name of the logger to configure. Defaults to None for the root logger.
+            overflow (str): What to do when the queue is full: 'block', 'drop_oldest' or 'drop'. Defaults to 'block'.
+
+        Returns:
+            logging.Logger: The configured logger.
+        """
+        logger = logging.getLogger(name)
+        logger.setLevel(log_level)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(ProcessQueueHandler(log_queue, overflow=overflow))
+        return logger
+
+    @property
+    def dropped(self) -> int:
+        """Number of records discarded because the queue was full (always 0 outside async mode)."""
+        return self.queue_handler.dropped if self.queue_handler else 0
+
+    def _add_handler(self, handler: logging.Handler) -> None:
+        """Attach a handler to the logger, or to the listener in async mode."""
+        if self.listener:
+            self.listener.handlers = self.listener.handlers + (handler,)
+        else:
+            self.logger.addHandler(handler)
+
+    @staticmethod
+    def _handler_target(handler: logging.Handler) -> Optional[str]:
+        """Return the file or stream a handler writes to."""
+        if isinstance(handler, logging.FileHandler):
+            return f"file:{handler.baseFilename}"
+        if isinstance(handler, BatchingFileHandler):
+            return f"file:{handler.filename}"
+        if isinstance(handler, logging.StreamHandler):
+            return f"stream:{id(handler.stream)}"
+        return None
+
+    def _add_unique_handler(self, target: str, factory: Callable[[], logging.Handler]) -> logging.Handler:
+        """Attach the handler built by `factory`, unless a handler already writes to `target`."""
+        handler = next((handler for handler in self._output_handlers() if self._handler_target(handler) == target), None)
+        if handler is None:
+            handler = factory()
+            handler.setFormatter(self.formatter)
+            self._add_handler(handler)
+        return handler
+
+    def _output_handlers(self) -> list:
+        """Return the handlers that format and write records."""
+        if self.listener:
+            return list(self.listener.handlers)
+        return self.logger.handlers
 
     def add_file_handler(self, log_file_path: Optional[Path] = None, mode: str = 'a', encoding: str = 'utf-8') -> None:
         """
@@ -61,15 +645,75 @@ class LoggerSetup:
             encoding (str): File encoding. Defaults to 'utf-8'.
         """
         if log_file_path:
-            file_handler = logging.FileHandler(log_file_path, mode=mode, encoding=encoding)
-            file_handler.setFormatter(self.formatter)
-            self.logger.addHandler(file_handler)
+            self._add_unique_handler(f"file:{os.path.abspath(log_file_path)}",
+                                     lambda: logging.FileHandler(log_file_path, mode=mode, encoding=encoding))
+
+    def add_batched_file_handler(self, log_file_path: Union[str, Path], mode: str = 'a', encoding: str = 'utf-8',
+                                 **kwargs) -> BatchingFileHandler:
+        """
+        Add a file handler that writes records in batches and can rotate and compress the file.
+
+        Args:
+            log_file_path (str | Path): The path to the log file.
+            mode (str): File mode. Defaults to 'a'.
+            encoding (str): File encoding. Defaults to 'utf-8'.
+            **kwargs: Buffering and rotation options of BatchingFileHandler.
+
+        Returns:
+            BatchingFileHandler: The added handler, or the handler already writing to the file.
+
+        Examples:
+        >>> logger_setup.add_batched_file_handler("app.log", max_bytes=100 * 1024 * 1024, backup_count=10, compress=True)
+        """
+        return self._add_unique_handler(
+            f"file:{os.path.abspath(log_file_path)}",
+            lambda: BatchingFileHandler(log_file_path, mode=mode, encoding=encoding, **kwargs))
+
+    def add_sampling(self, logger_name: str = '', rate: int = 1, per_second: Optional[float] = None,
+                     key: Callable[[logging.LogRecord], Hashable] = _template_key,
+                     max_level: int = logging.INFO) -> SamplingFilter:
+        """
+        Sample the records of a logger, for each message key.
+
+        Filters only see the records logged on their own logger, so name the logger of the noisy code
+        (the root logger '' covers calls like `logging.debug`). Dropped records are never formatted.
+
+        Args:
+            logger_name (str): Name of the logger to sample. Defaults to the root logger.
+            rate (int): Keep 1 in `rate` records of each key. Defaults to 1.
+            per_second (float, optional): Keep at most this many records per second of each key. Defaults to None.
+            key (Callable[[LogRecord], Hashable]): Key of the records sampled together. Defaults to logger and message template.
+            max_level (int): Records above this level are never dropped. Defaults to logging.INFO.
+
+        Returns:
+            SamplingFilter: The added filter.
+
+        Examples:
+        >>> logger_setup.add_sampling("worker.loop", rate=100, per_second=10)
+        """
+        sampling_filter = SamplingFilter(rate=rate, per_second=per_second, key=key, max_level=max_level)
+        logging.getLogger(logger_name).addFilter(sampling_filter)
+        return sampling_filter
+
+    def add_deduplication(self, logger_name: str = '', window: float = 1.0, max_keys: int = 10000) -> DeduplicateFilter:
+        """
+        Collapse bursts of identical records of a logger into "repeated N times" summaries.
+
+        Args:
+            logger_name (str): Name of the logger. Defaults to the root logger.
+            window (float): Seconds during which identical records are collapsed. Defaults to 1.0.
+            max_keys (int): Maximum number of bursts tracked at once. Defaults to 10000.
+
+        Returns:
+            DeduplicateFilter: The added filter.
+        """
+        deduplicate_filter = DeduplicateFilter(window=window, max_keys=max_keys)
+        logging.getLogger(logger_name).addFilter(deduplicate_filter)
+        return deduplicate_filter
 
     def add_console_handler(self) -> None:
         """Add a console handler to the logger."""
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(self.formatter)
-        self.logger.addHandler(console_handler)
+        self._add_unique_handler(f"stream:{id(sys.stderr)}", logging.StreamHandler)
 
     def set_custom_format(self, fmt: Union[logging.Formatter, None]) -> None:
         """
@@ -78,10 +722,35 @@ class LoggerSetup:
         Args:
             fmt (logging.Formatter | None): The desired logging formatter.
         """
-        for handler in self.logger.handlers:
+        for handler in self._output_handlers():
             handler.setFormatter(fmt)
         self.formatter = fmt
 
     def get_logger(self) -> logging.Logger:
         """Return the configured logger."""
         return self.logger
+
+    def shutdown(self) -> None:
+        """
+        Write every queued record, stop the listener and flush the handlers.
+
+        Records logged afterwards go straight to the handlers on the caller thread. Called at exit in async mode.
+        """
+        if not self.listener:
+            return
+        if self.queue_handler not in self.logger.handlers:
+            # Another setup sharing this queue already shut it down
+            self.listener = None
+            atexit.unregister(self.shutdown)
+            return
+        self.listener.stop()
+        self.logger.removeHandler(self.queue_handler)
+        handlers = self.listener.handlers
+        self.listener = None
+        for handler in handlers:
+            self.logger.addHandler(handler)
+        if self.queue_handler.dropped:
+            self.logger.warning(f"{self.queue_handler.dropped} log records were dropped because the log queue was full")
+        for handler in handlers:
+            handler.flush()
+        atexit.unregister(self.shutdown)
@@ -1,10 +1,1599 @@
 from minio import Minio
+from minio.commonconfig import ComposeSource, CopySource
+from minio.datatypes import Object, Part
+from minio.error import InvalidResponseError, S3Error, ServerError
 from tqdm import tqdm
 import os
-from multiprocessing import Pool, cpu_count
-from typing import List, Tuple
+import asyncio
+import copy
+import functools
+import io
+import itertools
+import json
+import hashlib
+import inspect
+import queue
+import threading
+import certifi
+import urllib3
+from multiprocessing import cpu_count
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import math
+import multiprocessing
+import random
+import re
+import shutil
+import sqlite3
+import time
+from array import array
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pylabtools.path_wrapper import DirectoryIndex, indexed_files
+
+try:
+    import fcntl
+except ImportError:
+    # Windows locks byte ranges with msvcrt instead
+    fcntl = None
+    import msvcrt
+
+_worker_local = threading.local()
+_seek_lock = threading.Lock()
+
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_PART_CONCURRENCY = 8
+DEFAULT_READ_BUFFER_SIZE = 1024 * 1024
+DEFAULT_MULTIPART_THRESHOLD = 64 * 1024 * 1024
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+MAX_COPY_SIZE = 5 * 1024 * 1024 * 1024
+# ETag of a multipart upload computed by S3: the MD5 of the concatenated part MD5s, then the part count
+MULTIPART_ETAG = re.compile(r"[0-9a-f]{32}-\d+")
+
+
+def make_http_client(maxsize: int = 10, cert_check: bool = True) -> urllib3.PoolManager:
+    """
+    Creates a keep-alive urllib3 pool manager with the same defaults the Minio client uses, without its retries.
+
+    Error statuses are returned as they come and only a failed connection is retried, once and immediately, so that
+    `RetryPolicy` is the single retry layer and every retry is counted against its budget.
+
+    Parameters:
+    - maxsize (int, optional): Number of connections kept alive per host. Defaults to 10.
+    - cert_check (bool, optional): Whether to verify server certificates. Defaults to True.
+
+    Returns:
+    - urllib3.PoolManager: A pool manager that can be shared between Minio clients.
+    """
+    timeout = 300
+    return urllib3.PoolManager(
+        timeout=urllib3.util.Timeout(connect=timeout, read=timeout),
+        maxsize=maxsize,
+        cert_reqs="CERT_REQUIRED" if cert_check else "CERT_NONE",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=urllib3.Retry(total=1, read=0, redirect=0, status=0, status_forcelist=[],
+                              respect_retry_after_header=False),
+    )
+
+
+class WorkerClient:
+    """
+    A Minio client owned by a single worker process or thread.
+
+    The client is created once per worker and reused for every transfer the worker performs,
+    so connections in its pool stay alive between files.
+
+    Attributes:
+    - client (Minio): The Minio client object.
+    - http_client (urllib3.PoolManager): The connection pool used by the client.
+    - requests (int): Number of transfers performed through this client.
+    """
+    def __init__(self, client_config: Dict):
+        config = dict(client_config)
+        self.http_client = config.pop("http_client", None) or make_http_client()
+        self.client = Minio(config.pop("endpoint"), http_client=self.http_client, **config)
+        self.requests = 0
+
+    def stats(self) -> Dict:
+        """
+        Returns connection reuse statistics for this worker.
+
+        When several threads share one pool, `connections` counts the connections of the whole pool.
+
+        Returns:
+        - Dict: The worker name, the pool it uses, the number of requests, the number of connections
+          opened and the number of requests served by an already open connection.
+        """
+        connections = 0
+        for key in list(self.http_client.pools.keys()):
+            pool = self.http_client.pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+        return {
+            "worker": f"{os.getpid()}:{threading.current_thread().name}",
+            "pool": f"{os.getpid()}:{id(self.http_client)}",
+            "requests": self.requests,
+            "connections": connections,
+            "reused": max(self.requests - connections, 0),
+        }
+
+
+def get_worker_client(client_config: Dict) -> WorkerClient:
+    """
+    Returns the Minio client of the calling worker, creating it on first use.
+
+    Clients are cached per process and per thread, keyed by the client configuration.
+
+    Parameters:
+    - client_config (Dict): Keyword arguments for `Minio`, including `endpoint`.
+
+    Returns:
+    - WorkerClient: The cached client of the current worker.
+    """
+    clients = getattr(_worker_local, "clients", None)
+    if clients is None or getattr(_worker_local, "pid", None) != os.getpid():
+        clients = _worker_local.clients = {}
+        _worker_local.pid = os.getpid()
+    key = tuple(sorted((name, id(value) if name == "http_client" else value)
+                       for name, value in client_config.items()))
+    if key not in clients:
+        clients[key] = WorkerClient(client_config)
+    return clients[key]
+
+
+class TransferResult(NamedTuple):
+    """
+    Outcome of the transfer of one object.
+
+    Attributes:
+    - object_name (str): Name of the object in the bucket.
+    - nbytes (int): Number of bytes transferred.
+    - duration (float): Seconds spent on the transfer, retries included.
+    - retries (int): Number of attempts made after the first one.
+    - error (str): Type name of the exception that failed the transfer, None on success.
+    - message (str): Message of that exception, None on success.
+    - throttles (int): Number of throttling responses (e.g. 503 SlowDown) received.
+    - etag (str): ETag of the uploaded object, without quotes, when the server returned one.
+    """
+    object_name: str
+    nbytes: int
+    duration: float
+    retries: int = 0
+    error: Optional[str] = None
+    message: Optional[str] = None
+    throttles: int = 0
+    etag: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the transfer succeeded."""
+        return self.error is None
+
+
+class TransferReport:
+    """
+    Aggregate of the `TransferResult`s of one batch call.
+
+    Latencies are kept in a compact array, so a report over millions of objects stays small.
+
+    Attributes:
+    - succeeded (int): Number of objects transferred.
+    - skipped (int): Number of objects left out because they were already up to date.
+    - copied (int): Number of objects copied server-side from identical content instead of being sent.
+    - nbytes (int): Number of bytes transferred.
+    - retries (int): Number of retries over all transfers.
+    - throttles (int): Number of throttling responses over all transfers.
+    - failed_keys (List[str]): Names of the objects that could not be transferred.
+    - error_types (Dict[str, int]): Number of failures of every exception type.
+    - duration (float): Wall-clock seconds of the batch call.
+    """
+    def __init__(self):
+        self.succeeded = 0
+        self.skipped = 0
+        self.copied = 0
+        self.nbytes = 0
+        self.retries = 0
+        self.throttles = 0
+        self.failed_keys = []
+        self.error_types = {}
+        self.duration = 0.0
+        self._latencies = array("d")
+        self._start = time.monotonic()
+
+    def add(self, result: TransferResult) -> None:
+        """Adds the outcome of one transfer."""
+        self.retries += result.retries
+        self.throttles += result.throttles
+        self._latencies.append(result.duration)
+        if result.ok:
+            self.succeeded += 1
+            self.nbytes += result.nbytes
+        else:
+            self.failed_keys.append(result.object_name)
+            self.error_types[result.error] = self.error_types.get(result.error, 0) + 1
+
+    def finish(self) -> "TransferReport":
+        """Stops the wall clock of the batch call."""
+        self.duration = time.monotonic() - self._start
+        return self
+
+    @property
+    def failed(self) -> int:
+        """Number of objects that could not be transferred."""
+        return len(self.failed_keys)
+
+    @property
+    def mb_per_s(self) -> float:
+        """Throughput of the batch call in MB/s (2^20 bytes)."""
+        return self.nbytes / 1024 / 1024 / self.duration if self.duration else 0.0
+
+    def latency(self, quantile: float) -> float:
+        """
+        Returns a per-object latency quantile, by nearest rank.
+
+        Parameters:
+        - quantile (float): The quantile, between 0 and 1.
+
+        Returns:
+        - float: The latency in seconds, 0.0 if nothing was transferred.
+        """
+        if not self._latencies:
+            return 0.0
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, max(0, math.ceil(quantile * len(latencies)) - 1))]
+
+    def as_dict(self) -> Dict:
+        """Returns the numbers of the report as a dictionary."""
+        return {
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "copied": self.copied,
+            "bytes": self.nbytes,
+            "retries": self.retries,
+            "throttles": self.throttles,
+            "duration": self.duration,
+            "mb_per_s": self.mb_per_s,
+            "p50": self.latency(0.5),
+            "p99": self.latency(0.99),
+            "error_types": dict(self.error_types),
+            "failed_keys": list(self.failed_keys),
+        }
+
+    def to_prometheus(self, prefix: str = "pylabtools_transfer", labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Renders the report in the Prometheus text exposition format.
+
+        Parameters:
+        - prefix (str, optional): Prefix of every metric name. Defaults to "pylabtools_transfer".
+        - labels (Dict[str, str], optional): Labels added to every sample, e.g. {"direction": "upload"}.
+
+        Returns:
+        - str: One sample per line.
+        """
+        label_text = ",".join(f'{name}="{value}"' for name, value in sorted((labels or {}).items()))
+
+        def _sample(name, value, extra=""):
+            text = ",".join(part for part in (label_text, extra) if part)
+            return f"{prefix}_{name}{{{text}}} {value}" if text else f"{prefix}_{name} {value}"
+
+        lines = [
+            _sample("objects_total", self.succeeded, 'status="succeeded"'),
+            _sample("objects_total", self.failed, 'status="failed"'),
+            _sample("objects_total", self.skipped, 'status="skipped"'),
+            _sample("objects_total", self.copied, 'status="copied"'),
+            _sample("bytes_total", self.nbytes),
+            _sample("retries_total", self.retries),
+            _sample("throttles_total", self.throttles),
+            _sample("duration_seconds", self.duration),
+            _sample("throughput_mb_per_second", self.mb_per_s),
+            _sample("object_latency_seconds", self.latency(0.5), 'quantile="0.5"'),
+            _sample("object_latency_seconds", self.latency(0.99), 'quantile="0.99"'),
+        ]
+        lines += [_sample("errors_total", count, f'type="{error}"') for error, count in sorted(self.error_types.items())]
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self) -> str:
+        return (f"TransferReport(succeeded={self.succeeded}, failed={self.failed}, skipped={self.skipped}, copied={self.copied}, "
+                f"bytes={self.nbytes}, mb_per_s={self.mb_per_s:.2f}, p50={self.latency(0.5):.3f}s, "
+                f"p99={self.latency(0.99):.3f}s)")
+
+
+THROTTLE_CODES = {"SlowDown", "ServiceUnavailable", "RequestLimitExceeded", "TooManyRequests", "Throttling"}
+RETRYABLE_CODES = THROTTLE_CODES | {"InternalError", "RequestTimeout", "OperationAborted"}
+
+# Retry budget of the batch call that started this worker process, see `RetryPolicy.start_batch`
+_inherited_retry_budget = None
+
+
+def is_throttle_error(err: BaseException) -> bool:
+    """Returns True if the error means the server asks clients to slow down (429/503, SlowDown)."""
+    if isinstance(err, S3Error):
+        return err.code in THROTTLE_CODES
+    if isinstance(err, ServerError):
+        return err.status_code in (429, 503)
+    if isinstance(err, InvalidResponseError):
+        return getattr(err, "_code", None) in (429, 503)
+    return False
+
+
+def is_retryable_error(err: BaseException) -> bool:
+    """Returns True for throttling, server-side and connection errors that may succeed on a new attempt."""
+    if is_throttle_error(err):
+        return True
+    if isinstance(err, S3Error):
+        return err.code in RETRYABLE_CODES
+    if isinstance(err, ServerError):
+        return err.status_code >= 500
+    if isinstance(err, InvalidResponseError):
+        return (getattr(err, "_code", None) or 0) >= 500
+    return isinstance(err, (urllib3.exceptions.HTTPError, ConnectionError, TimeoutError))
+
+
+class RetryBudget:
+    """
+    Number of retries left for a whole batch call, shared by its threads and worker processes.
+
+    Once it is spent, failing transfers fail at once instead of piling more load on a struggling server.
+    """
+    def __init__(self, retries: int):
+        self._left = multiprocessing.Value("i", retries)
+
+    def take(self) -> bool:
+        """Takes one retry from the budget, returns False if none is left."""
+        with self._left.get_lock():
+            if self._left.value <= 0:
+                return False
+            self._left.value -= 1
+            return True
+
+    @property
+    def left(self) -> int:
+        """Number of retries left."""
+        return self._left.value
+
+
+def _set_retry_budget(budget: Optional[RetryBudget]) -> None:
+    """Initializer of worker processes, receiving the budget of the batch call by inheritance."""
+    global _inherited_retry_budget
+    _inherited_retry_budget = budget
+
+
+class RetryPolicy:
+    """
+    Per-object retry with capped exponential backoff and full jitter.
+
+    The n-th retry waits a random time between 0 and min(`max_delay`, `base_delay` * 2^n), so clients that
+    failed together do not retry together. Only errors accepted by `is_retryable_error` are retried.
+
+    Attributes:
+    - max_attempts (int): Attempts per object, the first one included.
+    - base_delay (float): Upper bound in seconds of the first backoff.
+    - max_delay (float): Upper bound in seconds of any backoff.
+    - budget (int): Retries allowed over a whole batch call, None for no limit.
+    """
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 budget: Optional[int] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self._budget = None
+
+    def __getstate__(self) -> Dict:
+        # A shared budget cannot be pickled, worker processes inherit it through `_set_retry_budget`
+        state = dict(self.__dict__)
+        state["_budget"] = None
+        return state
+
+    def start_batch(self) -> "RetryPolicy":
+        """Returns a copy of the policy whose transfers share a fresh `RetryBudget` of `budget` retries."""
+        policy = copy.copy(self)
+        policy._budget = RetryBudget(self.budget) if self.budget is not None else None
+        return policy
+
+    def delay(self, retry: int) -> float:
+        """Returns the jittered backoff in seconds before the given retry, counted from 0."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    def allow_retry(self, err: BaseException, attempt: int) -> bool:
+        """Returns True if a transfer that failed its `attempt`-th attempt with `err` may be retried."""
+        if attempt >= self.max_attempts or not is_retryable_error(err):
+            return False
+        budget = self._budget or _inherited_retry_budget
+        return budget is None or budget.take()
+
+    def call(self, fn: Callable, *args, on_retry: Optional[Callable[[BaseException], None]] = None, **kwargs):
+        """
+        Calls `fn`, retrying it with backoff while it fails with a retryable error.
+
+        Parameters:
+        - fn (Callable): The call to make.
+        - *args, **kwargs: Arguments of `fn`.
+        - on_retry (Callable[[BaseException], None], optional): Called with the error before every retry.
+
+        Returns:
+        - The return value of `fn`.
+
+        Raises:
+        - The last error of `fn` once retries are exhausted or not allowed.
+        """
+        attempt = 0
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as err:
+                attempt += 1
+                if not self.allow_retry(err, attempt):
+                    raise
+                if on_retry:
+                    on_retry(err)
+                time.sleep(self.delay(attempt - 1))
+
+
+class RetryCounter:
+    """Counts the retries and throttling errors of one transfer, from any number of threads."""
+    def __init__(self):
+        self.retries = 0
+        self.throttles = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, err: BaseException) -> None:
+        with self._lock:
+            self.retries += 1
+            self.throttles += is_throttle_error(err)
+
+    def result(self, object_name: str, nbytes: int, duration: float, err: Optional[BaseException] = None,
+               etag: Optional[str] = None) -> TransferResult:
+        """Builds the `TransferResult` of the transfer, counting a final throttling error too."""
+        if err is None:
+            return TransferResult(object_name, nbytes, duration, self.retries, throttles=self.throttles, etag=etag)
+        return TransferResult(object_name, 0, duration, self.retries, error=type(err).__name__, message=str(err),
+                              throttles=self.throttles + is_throttle_error(err))
+
+
+def _unquote_etag(etag: Optional[str]) -> Optional[str]:
+    """Returns an ETag without its quotes, or None when the server sent none."""
+    return etag.strip('"') if isinstance(etag, str) and etag else None
+
+
+def _upload_with_stats(args: Tuple) -> Tuple[TransferResult, Dict]:
+    """Uploads a single file and returns its result together with the worker's connection stats."""
+    result = MinioWrapper.upload_file(args)
+    client_config = MinioWrapper._legacy_config(args) if len(args) == 6 else args[0]
+    return result, get_worker_client(client_config).stats()
+
+
+def _download_with_stats(args: Tuple[Dict, str, str, str, RetryPolicy]) -> Tuple[TransferResult, Dict]:
+    """Downloads a single object and returns its result together with the worker's connection stats."""
+    client_config, bucket_name, local_path, remote_path, retry = args
+    worker = get_worker_client(client_config)
+    counter = RetryCounter()
+    start = time.monotonic()
+    try:
+        worker.requests += 1
+        os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+        retry.call(worker.client.fget_object, bucket_name, remote_path, local_path, on_retry=counter)
+        result = counter.result(remote_path, os.path.getsize(local_path), time.monotonic() - start)
+    except Exception as err:
+        result = counter.result(remote_path, 0, time.monotonic() - start, err)
+    return result, worker.stats()
+
+
+def prefetch(iterable: Iterable, maxsize: int = 1000) -> Iterator:
+    """
+    Iterates `iterable` in a background thread, keeping at most `maxsize` items ahead of the consumer.
+
+    Slow producers such as paginated object listings then overlap with the work done on their items,
+    while memory stays bounded by `maxsize`. Exceptions raised by the producer are re-raised to the consumer,
+    and the producer stops when the consumer stops iterating.
+
+    Parameters:
+    - iterable (Iterable): The items to produce.
+    - maxsize (int, optional): Size of the queue between producer and consumer. Defaults to 1000.
+
+    Yields:
+    - The items of `iterable`, in order.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    end = object()
+
+    def _put(entry):
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        try:
+            for item in iterable:
+                if not _put((item, None)):
+                    return
+        except BaseException as err:
+            _put((end, err))
+            return
+        _put((end, None))
+
+    threading.Thread(target=_produce, name="prefetch", daemon=True).start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def _run_batch(fn: Callable, batch: List[Tuple]) -> List:
+    """Applies `fn` to every argument tuple of a batch, in a worker."""
+    return [fn(args) for args in batch]
+
+
+class TransferScheduler:
+    """
+    Runs transfer tasks on threads or processes with a concurrency tuned to the observed throughput.
+
+    Tasks are ordered largest first so the slowest transfers do not form the tail of the run, and tiny
+    tasks are grouped into batches so a single dispatch to a worker covers many of them. While running,
+    the number of tasks in flight is adjusted by hill climbing: it keeps moving in the same direction
+    while throughput improves and turns around when it drops.
+
+    Attributes:
+    - max_workers (int): Upper bound of tasks in flight. Defaults to 8 per core for threads and 2 per core for processes.
+    - min_workers (int): Lower bound of tasks in flight.
+    - mode (str): "auto", "inline", "thread" or "process".
+    - workers (int): Current number of tasks kept in flight.
+    """
+    # Fixed cost of one task, in bytes, so that throughput of tiny files is not measured as zero
+    TASK_COST = 64 * 1024
+
+    def __init__(self, max_workers: Optional[int] = None, min_workers: int = 2, mode: str = "auto",
+                 process_min_files: int = 2000, small_file_size: int = 256 * 1024, batch_files: int = 32,
+                 tune_interval: float = 2.0):
+        """
+        Initialize the scheduler.
+
+        Parameters:
+        - max_workers (int, optional): Upper bound of tasks in flight.
+        - min_workers (int, optional): Lower bound of tasks in flight. Defaults to 2.
+        - mode (str, optional): "auto" picks from the number and sizes of the tasks. Defaults to "auto".
+        - process_min_files (int, optional): "auto" uses processes from this many tasks on. Defaults to 2000.
+        - small_file_size (int, optional): Tasks below this many bytes are batched. Defaults to 256 KiB.
+        - batch_files (int, optional): Maximum number of tasks in a batch. Defaults to 32.
+        - tune_interval (float, optional): Seconds between concurrency adjustments. Defaults to 2.0.
+        """
+        if mode not in ("auto", "inline", "thread", "process"):
+            raise ValueError(f"Unknown scheduler mode: {mode}")
+        self.max_workers = max_workers
+        self.min_workers = min_workers
+        self.mode = mode
+        self.process_min_files = process_min_files
+        self.small_file_size = small_file_size
+        self.batch_files = batch_files
+        self.tune_interval = tune_interval
+        self.workers = min_workers
+        self._last_throttle = None
+
+    def choose_mode(self, sizes: List[int]) -> str:
+        """
+        Picks how to run tasks of the given sizes.
+
+        A single task runs inline in the calling thread. Transfers are I/O-bound, so threads are used unless
+        there are so many tasks that per-file CPU work (request signing, hashing) would contend for the GIL.
+
+        Parameters:
+        - sizes (List[int]): Size in bytes of every task.
+
+        Returns:
+        - str: "inline", "thread" or "process".
+        """
+        if self.mode != "auto":
+            return self.mode
+        if len(sizes) <= 1:
+            return "inline"
+        if len(sizes) >= self.process_min_files and cpu_count() > 1:
+            return "process"
+        return "thread"
+
+    def worker_limit(self, mode: str) -> int:
+        """Returns the upper bound of tasks in flight for a mode."""
+        if self.max_workers:
+            return self.max_workers
+        return cpu_count() * (2 if mode == "process" else 8)
+
+    def _batches(self, tasks: List[Tuple[int, Tuple]]) -> List[Tuple[int, List[Tuple]]]:
+        """Orders tasks largest first and groups small ones into batches of (total size, argument tuples)."""
+        batches = []
+        current, current_size = [], 0
+        for size, args in sorted(tasks, key=lambda task: task[0], reverse=True):
+            if size >= self.small_file_size:
+                batches.append((size, [args]))
+                continue
+            current.append(args)
+            current_size += size
+            if len(current) == self.batch_files:
+                batches.append((current_size, current))
+                current, current_size = [], 0
+        if current:
+            batches.append((current_size, current))
+        return batches
+
+    def _observe(self, nbytes: int, ntasks: int, limit: int) -> None:
+        """Records completed work and adjusts `workers` once per `tune_interval`."""
+        self._window_bytes += nbytes + ntasks * self.TASK_COST
+        elapsed = time.monotonic() - self._window_start
+        if elapsed < self.tune_interval:
+            return
+        rate = self._window_bytes / elapsed
+        if self._last_rate is not None and rate < self._last_rate * 1.05:
+            self._direction = -self._direction
+        self._last_rate = rate
+        step = max(1, self.workers // 4)
+        self.workers = min(limit, max(self.min_workers, self.workers + self._direction * step))
+        logging.debug(f"Transfer throughput {rate / 1024 / 1024:.2f} MB/s, concurrency set to {self.workers}")
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+
+    def throttle(self) -> None:
+        """
+        Backs off after the server answered with a throttling error.
+
+        Halves `workers`, at most once per `tune_interval` so a burst of throttled tasks counts once, and
+        restarts hill climbing from there.
+        """
+        now = time.monotonic()
+        if self._last_throttle is not None and now - self._last_throttle < self.tune_interval:
+            return
+        self._last_throttle = now
+        self.workers = max(self.min_workers, self.workers // 2)
+        self._direction = 1
+        self._last_rate = None
+        self._window_start = now
+        self._window_bytes = 0
+        logging.warning(f"Transfers throttled by the server, concurrency reduced to {self.workers}")
+
+    def _stream_batches(self, tasks: Iterable[Tuple[int, Tuple]]) -> Iterator[Tuple[int, List[Tuple]]]:
+        """Groups consecutive small tasks of a stream into batches, without reordering it."""
+        current, current_size = [], 0
+        for size, args in tasks:
+            if size >= self.small_file_size:
+                yield size, [args]
+                continue
+            current.append(args)
+            current_size += size
+            if len(current) == self.batch_files:
+                yield current_size, current
+                current, current_size = [], 0
+        if current:
+            yield current_size, current
+
+    def run(self, fn: Callable, tasks: Union[List[Tuple[int, Tuple]], Iterator[Tuple[int, Tuple]]],
+            mode: Optional[str] = None, initializer: Optional[Callable] = None, initargs: Tuple = ()) -> Iterator:
+        """
+        Runs `fn` on every task and yields the results as they complete.
+
+        A list of tasks is ordered largest first. Any other iterable is consumed lazily in its own order,
+        never holding more than the tasks in flight, and runs on threads unless a mode is given.
+
+        Parameters:
+        - fn (Callable): Module-level function applied to the arguments of every task, so it can run in a process.
+        - tasks (List[Tuple[int, Tuple]] | Iterator[Tuple[int, Tuple]]): (size in bytes, arguments of `fn`) of every task.
+        - mode (str, optional): Overrides `choose_mode`.
+        - initializer (Callable, optional): Called with `initargs` in every worker process when running on processes.
+        - initargs (Tuple, optional): Arguments of `initializer`.
+
+        Yields:
+        - The result of `fn` for every task, in completion order.
+        """
+        if isinstance(tasks, list):
+            mode = mode or self.choose_mode([size for size, _ in tasks])
+            batches = iter(self._batches(tasks))
+        else:
+            mode = mode or ("thread" if self.mode == "auto" else self.mode)
+            batches = self._stream_batches(tasks)
+        if mode == "inline":
+            for _, batch in batches:
+                yield from _run_batch(fn, batch)
+            return
+
+        limit = self.worker_limit(mode)
+        self.workers = min(limit, max(self.min_workers, limit // 2))
+        self._direction = 1
+        self._last_rate = None
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        if mode == "process":
+            executor = ProcessPoolExecutor(max_workers=limit, initializer=initializer, initargs=initargs)
+        else:
+            executor = ThreadPoolExecutor(max_workers=limit)
+        with executor:
+            pending = {}
+            while True:
+                while len(pending) < self.workers:
+                    next_batch = next(batches, None)
+                    if next_batch is None:
+                        break
+                    size, batch = next_batch
+                    pending[executor.submit(_run_batch, fn, batch)] = (size, len(batch))
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    size, count = pending.pop(future)
+                    self._observe(size, count, limit)
+                    yield from future.result()
+
+
+SYNC_MANIFEST_NAME = ".minio_sync.jsonl"
+
+
+class SyncManifest:
+    """
+    Append-only record of the files a sync has already transferred.
+
+    Every completed transfer is appended as one JSON line and flushed, so a run that is interrupted
+    can be restarted and skip everything recorded before the interruption. `prune` drops the entries
+    of files that are gone and rewrites the file with one line per entry.
+
+    Attributes:
+    - path (str): Path to the manifest file.
+    - entries (Dict[str, Dict]): The latest entry of every key, with its `size`, `mtime_ns` and `etag`.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by an interrupted run
+                        continue
+                    self.entries[entry["key"]] = entry
+
+    @staticmethod
+    def default_path(directory: str) -> str:
+        """
+        Returns the manifest path of a synced directory: a hidden file next to it, so that it is never
+        listed, uploaded or deleted as part of the directory itself.
+        """
+        directory = os.path.abspath(directory)
+        return os.path.join(os.path.dirname(directory), f".{os.path.basename(directory)}{SYNC_MANIFEST_NAME}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Returns the recorded entry of a key, or None if it has not been transferred."""
+        return self.entries.get(key)
+
+    def prune(self, seen: Iterable[str], scope: str = "") -> int:
+        """
+        Drops the entries under `scope` whose key was not seen, and rewrites the file with the latest entry of each key.
+
+        Parameters:
+        - seen (Iterable[str]): Keys found by the current scan.
+        - scope (str, optional): Key prefix covered by that scan; entries outside it are kept. Defaults to "".
+
+        Returns:
+        - int: The number of entries dropped.
+        """
+        seen = set(seen)
+        with self._lock:
+            stale = [key for key in self.entries if key.startswith(scope) and key not in seen]
+            for key in stale:
+                del self.entries[key]
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(tmp_path, self.path)
+        return len(stale)
+
+    def record(self, key: str, size: int, mtime_ns: int, etag: Optional[str] = None) -> None:
+        """
+        Records a completed transfer.
+
+        Parameters:
+        - key (str): The "bucket/object" key of the transfer.
+        - size (int): Size of the local file in bytes.
+        - mtime_ns (int): Modification time of the local file in nanoseconds, as its `st_mtime_ns` reads.
+        - etag (str, optional): ETag of the remote object, if known.
+        """
+        entry = {"key": key, "size": size, "mtime_ns": mtime_ns, "etag": etag}
+        with self._lock:
+            self.entries[key] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+def file_md5(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Computes the hex MD5 digest of a file without loading it into memory.
+
+    Parameters:
+    - path (str): Path to the file.
+    - chunk_size (int, optional): Number of bytes read at a time. Defaults to 1 MiB.
+
+    Returns:
+    - str: The hex digest.
+    """
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Computes the hex SHA-256 digest of a file without loading it into memory.
+
+    hashlib releases the GIL while hashing large chunks, so several files hash in parallel on threads.
+
+    Parameters:
+    - path (str): Path to the file.
+    - chunk_size (int, optional): Number of bytes read at a time. Defaults to 1 MiB.
+
+    Returns:
+    - str: The hex digest.
+    """
+    sha256 = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        for size in iter(lambda: f.readinto(buffer), 0):
+            sha256.update(view[:size])
+    return sha256.hexdigest()
+
+
+class ContentCache:
+    """
+    Persistent map from content hashes to the objects known to hold that content.
+
+    Used by `MinioWrapper.upload` with `dedup` to copy identical content server-side instead of sending it
+    again. The SHA-256 of every hashed file is remembered with its size and mtime, so unchanged files are
+    not read twice. Both tables are capped at `max_entries` rows, evicting the least recently used ones.
+
+    An entry can go stale when its object is deleted or overwritten, so every entry is checked with a
+    stat of the object before it is used: the size must match, and the ETag if known, or else the object
+    must not have been modified after the entry was recorded.
+
+    Attributes:
+    - path (str): Path to the cache database.
+    - max_entries (int): Maximum number of rows of each table.
+    """
+    def __init__(self, path: str, max_entries: int = 1000000):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, timeout=60.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS objects (bucket TEXT, object TEXT, hash TEXT, size INTEGER, etag TEXT,
+                                                stored REAL, used REAL, PRIMARY KEY (bucket, object));
+            CREATE INDEX IF NOT EXISTS objects_hash ON objects (hash);
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT,
+                                              used REAL);
+        """)
+
+    def __enter__(self) -> "ContentCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Evicts the entries over `max_entries` and closes the database connection."""
+        self.evict()
+        self._conn.close()
+
+    def hash_files(self, paths: Iterable[str], workers: int = 8) -> Dict[str, str]:
+        """
+        Returns the SHA-256 of every file, hashing on `workers` threads only those changed since last hashed.
+
+        Parameters:
+        - paths (Iterable[str]): Paths of the files.
+        - workers (int, optional): Number of files hashed at once. Defaults to 8.
+
+        Returns:
+        - Dict[str, str]: The hex digest of every path.
+        """
+        stats = {path: os.stat(path) for path in paths}
+        hashes = {}
+        for path, size, mtime_ns, content_hash in self._select("SELECT path, size, mtime_ns, hash FROM files WHERE path IN",
+                                                               list(stats)):
+            if (stats[path].st_size, stats[path].st_mtime_ns) == (size, mtime_ns):
+                hashes[path] = content_hash
+        missing = [path for path in stats if path not in hashes]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash") as executor:
+            hashes.update(zip(missing, executor.map(file_sha256, missing)))
+        now = time.time()
+        self._conn.execute("BEGIN")
+        self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                               [(path, stats[path].st_size, stats[path].st_mtime_ns, hashes[path], now) for path in stats])
+        self._conn.execute("COMMIT")
+        return hashes
+
+    def _select(self, sql: str, values: List, batch: int = 500) -> Iterator[Tuple]:
+        """Runs `sql` followed by an IN list, in batches of values to stay within the SQLite variable limit."""
+        for start in range(0, len(values), batch):
+            chunk = values[start:start + batch]
+            yield from self._conn.execute(f"{sql} ({','.join('?' * len(chunk))})", chunk)
+
+    def locations(self, content_hash: str, limit: int = -1) -> List[Dict]:
+        """Returns the entries of the objects holding this content, most recently used first, at most `limit` of them."""
+        rows = self._conn.execute("SELECT bucket, object, hash, size, etag, stored FROM objects WHERE hash = ? "
+                                  "ORDER BY used DESC LIMIT ?", (content_hash, limit))
+        return [self._entry(row) for row in rows]
+
+    def get(self, bucket_name: str, object_name: str) -> Optional[Dict]:
+        """Returns the entry of an object, or None if its content is unknown."""
+        row = self._conn.execute("SELECT bucket, object, hash, size, etag, stored FROM objects WHERE bucket = ? AND object = ?",
+                                 (bucket_name, object_name)).fetchone()
+        return self._entry(row) if row else None
+
+    @staticmethod
+    def _entry(row: Tuple) -> Dict:
+        return dict(zip(("bucket", "object", "hash", "size", "etag", "stored"), row))
+
+    def record(self, entries: Iterable[Tuple[str, str, str, int, Optional[str]]]) -> None:
+        """
+        Records objects that hold known content.
+
+        Parameters:
+        - entries (Iterable[Tuple[str, str, str, int, str]]): (bucket, object, hash, size, etag) of every object,
+          the ETag being None when unknown.
+        """
+        now = time.time()
+        self._conn.execute("BEGIN")
+        self._conn.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               [entry + (now, now) for entry in entries])
+        self._conn.execute("COMMIT")
+
+    def touch(self, bucket_name: str, object_name: str) -> None:
+        """Marks an entry as used, to keep it from eviction."""
+        self._conn.execute("UPDATE objects SET used = ? WHERE bucket = ? AND object = ?",
+                           (time.time(), bucket_name, object_name))
+
+    def forget(self, bucket_name: str, object_name: str) -> None:
+        """Removes the entry of an object that no longer holds its recorded content."""
+        self._conn.execute("DELETE FROM objects WHERE bucket = ? AND object = ?", (bucket_name, object_name))
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used rows of each table over `max_entries`.
+
+        Returns:
+        - int: The number of rows removed.
+        """
+        removed = 0
+        for table in ("objects", "files"):
+            excess = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - self.max_entries
+            if excess > 0:
+                removed += self._conn.execute(f"DELETE FROM {table} WHERE rowid IN "
+                                              f"(SELECT rowid FROM {table} ORDER BY used LIMIT ?)", (excess,)).rowcount
+        return removed
+
+    @staticmethod
+    def is_valid(entry: Dict, stat) -> bool:
+        """Whether the stat of an object shows it still holds the content recorded in `entry`."""
+        if stat.size != entry["size"]:
+            return False
+        if entry["etag"]:
+            return stat.etag.strip('"') == entry["etag"]
+        return stat.last_modified is not None and stat.last_modified.timestamp() <= entry["stored"]
+
+
+class _FileLock:
+    """Exclusive lock on a file, held across processes and across threads of one process."""
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Takes the lock, waiting for it if `blocking`, and returns whether it was taken."""
+        self._file = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                while True:
+                    try:
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        if not blocking:
+                            raise
+                        time.sleep(0.05)
+        except OSError:
+            self._file.close()
+            self._file = None
+            if blocking:
+                raise
+            return False
+        return True
+
+    def release(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> "_FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+def _link_or_copy(source: str, destination: str, link: bool = True) -> None:
+    """Places a file at `destination` atomically, as a hard link of `source` when possible, else as a copy."""
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    temporary = f"{destination}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if link:
+            try:
+                os.link(source, temporary)
+            except OSError:
+                # Another file system, or one without hard links
+                shutil.copyfile(source, temporary)
+        else:
+            shutil.copyfile(source, temporary)
+        os.replace(temporary, destination)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+class ObjectCache:
+    """
+    Local read-through disk cache of objects, keyed by bucket, object name and ETag, within a byte budget.
+
+    Objects are stored under `directory` and indexed in a SQLite database, with the time they were last used;
+    once the cached bytes exceed `max_bytes`, the least recently used objects are evicted. Every object is
+    fetched under a file lock, so workers of several processes asking for the same object wait for one
+    download instead of making their own.
+
+    A cached object is used as is when the caller knows its current ETag (e.g. from a listing) and it
+    matches, or when it was validated less than `revalidate_after` seconds ago. Otherwise it is revalidated
+    with a conditional GET (If-None-Match): the server answers 304 without a body if the object did not
+    change, or sends the new content.
+
+    Attributes:
+    - directory (str): Directory of the cached objects and of the index.
+    - max_bytes (int): Byte budget of the cached objects.
+    - revalidate_after (float | None): Seconds a validation is trusted for. 0 revalidates on every use, None never does.
+    - link (bool): Deliver objects as hard links of the cached files. Writing to a linked file modifies the
+      cached copy too, so set it to False to get copies when outputs are modified in place.
+    """
+    LOCK_STRIPES = 256
+
+    def __init__(self, directory: str, max_bytes: int, revalidate_after: Optional[float] = 0.0, link: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.link = link
+        for name in ("objects", "locks", "tmp"):
+            os.makedirs(os.path.join(directory, name), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.db"), timeout=60.0, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (bucket TEXT, object TEXT, etag TEXT, path TEXT, size INTEGER,
+                                                used REAL, validated REAL, PRIMARY KEY (bucket, object));
+            CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+        """)
+
+    def __enter__(self) -> "ObjectCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the index."""
+        self._conn.close()
+
+    @staticmethod
+    def _digest(bucket_name: str, object_name: str) -> str:
+        return hashlib.sha256(f"{bucket_name}\0{object_name}".encode("utf-8")).hexdigest()
+
+    def _key_lock(self, digest: str) -> _FileLock:
+        # Locks are striped over a fixed set of files, so the lock directory does not grow with the cache
+        return _FileLock(os.path.join(self.directory, "locks", f"{int(digest[:4], 16) % self.LOCK_STRIPES}.lock"))
+
+    def _execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _entry(self, bucket_name: str, object_name: str) -> Optional[Dict]:
+        rows = self._execute("SELECT etag, path, size, validated FROM entries WHERE bucket = ? AND object = ?",
+                             (bucket_name, object_name))
+        if not rows or not os.path.exists(rows[0][1]):
+            return None
+        return dict(zip(("etag", "path", "size", "validated"), rows[0]))
+
+    @property
+    def size(self) -> int:
+        """Number of bytes of the cached objects."""
+        return self._execute("SELECT COALESCE(SUM(size), 0) FROM entries")[0][0]
+
+    def get(self, bucket_name: str, object_name: str, fetch: Callable[[str, Optional[str]], Optional[Tuple[str, int]]],
+            etag: Optional[str] = None, output: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Returns the local copy of an object, fetching it on a miss.
+
+        Parameters:
+        - bucket_name (str): Bucket of the object.
+        - object_name (str): Name of the object.
+        - fetch (Callable[[str, str | None], Tuple[str, int] | None]): Called as `fetch(path, cached_etag)` to write
+          the object to `path`; returns its (ETag, size), or None when the object still has `cached_etag`.
+        - etag (str, optional): Current ETag of the object if the caller knows it, saving the revalidation.
+        - output (str, optional): Path to place the object at, as a hard link or a copy. Defaults to None.
+
+        Returns:
+        - Tuple[str, bool]: `output`, or the path of the cached file if None, and whether it was a cache hit.
+          A cached file must not be modified, and may be evicted once other objects are fetched.
+        """
+        digest = self._digest(bucket_name, object_name)
+        with self._key_lock(digest):
+            entry = self._entry(bucket_name, object_name)
+            now = time.time()
+            fresh = entry is not None and (entry["etag"] == etag if etag is not None else
+                                           self.revalidate_after is None or now - entry["validated"] < self.revalidate_after)
+            hit = fresh
+            if not fresh:
+                temporary = os.path.join(self.directory, "tmp", f"{digest}.{os.getpid()}.{threading.get_ident()}")
+                try:
+                    fetched = fetch(temporary, entry["etag"] if entry else None)
+                    if fetched is None:
+                        hit = True
+                    else:
+                        new_etag, size = fetched
+                        path = os.path.join(self.directory, "objects", digest[:2], f"{digest}-{new_etag}")
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        os.replace(temporary, path)
+                        if entry and entry["path"] != path:
+                            os.remove(entry["path"])
+                        entry = {"etag": new_etag, "path": path, "size": size}
+                finally:
+                    if os.path.exists(temporary):
+                        os.remove(temporary)
+            self._execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          (bucket_name, object_name, entry["etag"], entry["path"], entry["size"], now,
+                           now if not fresh else entry["validated"]))
+            if output is not None:
+                _link_or_copy(entry["path"], output, self.link)
+        if not hit:
+            self.evict()
+        return output if output is not None else entry["path"], hit
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used objects until the cache fits in `max_bytes`.
+
+        Objects whose lock is held, being fetched or delivered, are left for a later eviction.
+
+        Returns:
+        - int: The number of bytes freed.
+        """
+        excess = self.size - self.max_bytes
+        freed = 0
+        if excess <= 0:
+            return 0
+        for bucket_name, object_name, path, size in self._execute("SELECT bucket, object, path, size FROM entries ORDER BY used"):
+            if freed >= excess:
+                break
+            lock = self._key_lock(self._digest(bucket_name, object_name))
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                # Only if no other process replaced it in the meantime
+                if self._execute("SELECT path FROM entries WHERE bucket = ? AND object = ?", (bucket_name, object_name)) == [(path,)]:
+                    self._execute("DELETE FROM entries WHERE bucket = ? AND object = ?", (bucket_name, object_name))
+                    if os.path.exists(path):
+                        os.remove(path)
+                    freed += size
+            finally:
+                lock.release()
+        return freed
+
+
+def _part_ranges(size: int, part_size: int) -> List[Tuple[int, int]]:
+    """Splits `size` bytes into (offset, length) parts, growing the part size to stay within `MAX_PARTS`."""
+    part_size = max(part_size, -(-size // MAX_PARTS))
+    return [(offset, min(part_size, size - offset)) for offset in range(0, size, part_size)] or [(0, 0)]
+
+
+def _pread(fd: int, length: int, offset: int) -> bytes:
+    """Reads `length` bytes at `offset` without moving a shared file position where the OS allows it."""
+    if hasattr(os, "pread"):
+        chunks = []
+        while length > 0:
+            chunk = os.pread(fd, length, offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            length -= len(chunk)
+            offset += len(chunk)
+        return b"".join(chunks)
+    with _seek_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, length)
+
+
+def _pwrite(fd: int, data: bytes, offset: int) -> None:
+    """Writes all of `data` at `offset` without moving a shared file position where the OS allows it."""
+    view = memoryview(data)
+    while view:
+        if hasattr(os, "pwrite"):
+            written = os.pwrite(fd, view, offset)
+        else:
+            with _seek_lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                written = os.write(fd, view)
+        view = view[written:]
+        offset += written
+
+
+# Private Minio methods driving concurrent multipart uploads, with their parameters. They are not part of the
+# public API, which is why setup.py pins minio; `upload_object_multipart` falls back to `fput_object` without them.
+MULTIPART_API = {
+    "_create_multipart_upload": ("bucket_name", "object_name", "headers"),
+    "_upload_part": ("bucket_name", "object_name", "data", "headers", "upload_id", "part_number"),
+    "_complete_multipart_upload": ("bucket_name", "object_name", "upload_id", "parts"),
+    "_abort_multipart_upload": ("bucket_name", "object_name", "upload_id"),
+}
+
+
+def has_multipart_api(client_type: type) -> bool:
+    """Returns True if a Minio client class has every method of `MULTIPART_API` with the expected parameters."""
+    for name, parameters in MULTIPART_API.items():
+        method = getattr(client_type, name, None)
+        try:
+            if method is None or tuple(inspect.signature(method).parameters)[1:] != parameters:
+                return False
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
+MULTIPART_API_AVAILABLE = has_multipart_api(Minio)
+
+
+def upload_object_multipart(client: Minio, bucket_name: str, object_name: str, file_path: str,
+                            part_size: int = DEFAULT_PART_SIZE, concurrency: int = DEFAULT_PART_CONCURRENCY,
+                            retry: Optional[RetryPolicy] = None,
+                            on_retry: Optional[Callable[[BaseException], None]] = None) -> str:
+    """
+    Uploads one file as a multipart upload whose parts are sent concurrently.
+
+    Every part is read with a positional read, so the threads never share a file position. Once the
+    upload is completed, an ETag in the S3 multipart form (MD5 of the part MD5s, then the part count) is
+    checked against the MD5s of the parts sent; servers using other ETags, e.g. under SSE-KMS encryption,
+    only get a warning. Each part is retried on its own under `retry`; the upload is aborted if a part still fails.
+    With a minio release lacking the private methods of `MULTIPART_API`, the file is sent with `fput_object` instead.
+
+    Parameters:
+    - client (Minio): The Minio client used for every part.
+    - bucket_name (str): Target Minio bucket name.
+    - object_name (str): Name of the object in the bucket.
+    - file_path (str): Local path of the file to be uploaded.
+    - part_size (int, optional): Size of every part but the last one. Defaults to `DEFAULT_PART_SIZE`.
+    - concurrency (int, optional): Number of parts in flight at once. Defaults to `DEFAULT_PART_CONCURRENCY`.
+    - retry (RetryPolicy, optional): Retry policy of every request. Defaults to no retries.
+    - on_retry (Callable[[BaseException], None], optional): Called with the error before every retry.
+
+    Returns:
+    - str: The ETag of the uploaded object.
+
+    Raises:
+    - ValueError: If the ETag of the uploaded object does not match the parts sent.
+    """
+    retry = retry or RetryPolicy(max_attempts=1)
+    if not MULTIPART_API_AVAILABLE:
+        logging.warning(f"This minio version lacks the multipart methods pylabtools uses, {object_name} is "
+                        f"uploaded with fput_object, one part at a time")
+        written = retry.call(client.fput_object, bucket_name, object_name, file_path,
+                             part_size=max(part_size, MIN_PART_SIZE), on_retry=on_retry)
+        return written.etag
+    ranges = _part_ranges(os.path.getsize(file_path), max(part_size, MIN_PART_SIZE))
+    upload_id = retry.call(client._create_multipart_upload, bucket_name, object_name, {}, on_retry=on_retry)
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+
+    def _upload_part(part_number, offset, length):
+        data = _pread(fd, length, offset)
+        etag = retry.call(client._upload_part, bucket_name, object_name, data, None, upload_id, part_number,
+                          on_retry=on_retry)
+        return Part(part_number, etag), hashlib.md5(data).digest()
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(_upload_part, range(1, len(ranges) + 1), *zip(*ranges)))
+        result = retry.call(client._complete_multipart_upload, bucket_name, object_name, upload_id,
+                            [part for part, _ in results], on_retry=on_retry)
+    except BaseException:
+        client._abort_multipart_upload(bucket_name, object_name, upload_id)
+        raise
+    finally:
+        os.close(fd)
+
+    expected = f"{hashlib.md5(b''.join(digest for _, digest in results)).hexdigest()}-{len(results)}"
+    etag = _unquote_etag(result.etag)
+    if etag and MULTIPART_ETAG.fullmatch(etag) and etag.endswith(f"-{len(results)}"):
+        if etag != expected:
+            raise ValueError(f"Integrity check failed for {object_name}: ETag {etag}, expected {expected}")
+    elif etag:
+        logging.warning(f"Integrity of {object_name} not checked: ETag {etag} is not an MD5 of {len(results)} parts")
+    return result.etag
+
+
+def download_object_ranged(client: Minio, bucket_name: str, object_name: str, file_path: str,
+                           part_size: int = DEFAULT_PART_SIZE, concurrency: int = DEFAULT_PART_CONCURRENCY,
+                           retry: Optional[RetryPolicy] = None,
+                           on_retry: Optional[Callable[[BaseException], None]] = None, stat=None) -> None:
+    """
+    Downloads one object with concurrent ranged GETs into a preallocated file.
+
+    Every GET is pinned to the object's ETag with If-Match, and parts are written with positional writes
+    into a temporary file next to `file_path`; a part that fails is fetched again on its own under `retry`.
+    The temporary file replaces `file_path` only after its size, and its MD5 when the ETag is a plain MD5,
+    have been checked.
+
+    Parameters:
+    - client (Minio): The Minio client used for every part.
+    - bucket_name (str): The name of the bucket.
+    - object_name (str): The name of the object to download.
+    - file_path (str): Local path of the downloaded file.
+    - part_size (int, optional): Size of every ranged GET but the last one. Defaults to `DEFAULT_PART_SIZE`.
+    - concurrency (int, optional): Number of ranged GETs in flight at once. Defaults to `DEFAULT_PART_CONCURRENCY`.
+    - retry (RetryPolicy, optional): Retry policy of every request. Defaults to no retries.
+    - on_retry (Callable[[BaseException], None], optional): Called with the error before every retry.
+    - stat (minio.datatypes.Object, optional): Stat of the object, if the caller already has one. Defaults to a new stat.
+
+    Raises:
+    - ValueError: If the downloaded file does not match the object's size or ETag.
+    """
+    retry = retry or RetryPolicy(max_attempts=1)
+    if stat is None:
+        stat = retry.call(client.stat_object, bucket_name, object_name, on_retry=on_retry)
+    ranges = _part_ranges(stat.size, part_size)
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = file_path + ".part"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+
+    def _download_part(offset, length):
+        response = client.get_object(bucket_name, object_name, offset=offset, length=length,
+                                     request_headers={"If-Match": stat.etag})
+        try:
+            position = offset
+            for chunk in response.stream(1024 * 1024):
+                _pwrite(fd, chunk, position)
+                position += len(chunk)
+        finally:
+            response.close()
+            response.release_conn()
+        if position - offset != length:
+            # A body cut short is a connection failure, the part can be fetched again
+            raise ConnectionError(f"Short read for {object_name} at offset {offset}: {position - offset} of {length} bytes")
+
+    try:
+        os.ftruncate(fd, stat.size)
+        if hasattr(os, "posix_fallocate") and stat.size:
+            try:
+                os.posix_fallocate(fd, 0, stat.size)
+            except OSError:
+                # Not every file system supports preallocation, the truncate above is enough
+                pass
+        if stat.size:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(lambda offset, length: retry.call(_download_part, offset, length, on_retry=on_retry),
+                                  *zip(*ranges)))
+        size = os.fstat(fd).st_size
+    except BaseException:
+        os.close(fd)
+        os.remove(tmp_path)
+        raise
+    os.close(fd)
+
+    etag = (stat.etag or "").strip('"')
+    problem = None
+    if size != stat.size:
+        problem = f"got {size} of {stat.size} bytes"
+    elif etag and "-" not in etag and file_md5(tmp_path) != etag:
+        # Multipart ETags depend on the uploader's part size, those objects are checked by size only
+        problem = f"MD5 does not match ETag {etag}"
+    if problem:
+        os.remove(tmp_path)
+        raise ValueError(f"Integrity check failed for {object_name}: {problem}")
+    os.replace(tmp_path, file_path)
+
+
+def is_unchanged(local_path: str, local_stat: os.stat_result, remote, entry: Optional[Dict],
+                 newer: Callable[[float, float], bool], checksum: bool = False) -> bool:
+    """
+    Decides whether a local file and a remote object already hold the same content.
+
+    Sizes are compared first, then the manifest entry of a previous run, then either the ETag
+    (when `checksum` is set and the ETag is a plain MD5) or the modification times.
+
+    Parameters:
+    - local_path (str): Path to the local file.
+    - local_stat (os.stat_result): Stat of the local file.
+    - remote (minio.datatypes.Object): Listing entry of the remote object, or None if it does not exist.
+    - entry (Dict, optional): Manifest entry of the previous transfer of this file.
+    - newer (Callable[[float, float], bool]): Called with (local_mtime, remote_mtime); returns True
+      if the source side is newer than the destination side.
+    - checksum (bool, optional): Compare content hashes against the ETag. Defaults to False.
+
+    Returns:
+    - bool: True if the file does not need to be transferred.
+    """
+    if remote is None or remote.size != local_stat.st_size:
+        return False
+    etag = (remote.etag or "").strip('"')
+    # Integer nanoseconds as read back from the file system, float seconds do not round-trip everywhere
+    if entry and entry["size"] == local_stat.st_size and entry.get("mtime_ns") == local_stat.st_mtime_ns \
+            and entry["etag"] in (None, etag):
+        return True
+    if checksum and etag and "-" not in etag:
+        # Multipart ETags are not content MD5s, those fall back to the modification times
+        return file_md5(local_path) == etag
+    return not newer(local_stat.st_mtime, remote.last_modified.timestamp())
+
+
+class ObjectReader(io.RawIOBase):
+    """
+    Seekable binary stream over a MinIO object, read over HTTP without touching the disk.
+
+    Without prefetching, one GET streams the object from the current position straight into the buffers
+    passed to `readinto`. With `prefetch` set, the object is fetched in ranges of `range_size` bytes and
+    up to `prefetch` ranges ahead of the reader are downloaded in background threads, so processing one
+    range overlaps with the transfer of the next ones. Every request is pinned to the ETag seen when the
+    stream was opened, and a dropped connection resumes from the current position under `retry`.
+
+    Wrap it in `io.BufferedReader` or `io.TextIOWrapper` (see `MinioWrapper.open_object`) for buffered
+    reads and line iteration.
+
+    Attributes:
+    - bucket_name (str): Name of the bucket.
+    - object_name (str): Name of the object.
+    - size (int): Size of the object in bytes.
+    - etag (str): ETag of the object when the stream was opened.
+    """
+    def __init__(self, client: Minio, bucket_name: str, object_name: str, range_size: int = DEFAULT_PART_SIZE,
+                 prefetch: int = 0, retry: Optional[RetryPolicy] = None):
+        """
+        Open the stream.
+
+        Parameters:
+        - client (Minio): The Minio client.
+        - bucket_name (str): Name of the bucket.
+        - object_name (str): Name of the object.
+        - range_size (int, optional): Bytes per ranged GET when prefetching. Defaults to `DEFAULT_PART_SIZE`.
+        - prefetch (int, optional): Number of ranges downloaded ahead in the background, 0 to stream one GET. Defaults to 0.
+        - retry (RetryPolicy, optional): Retry policy of every request. Defaults to no retries.
+        """
+        super().__init__()
+        self.client = client
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.range_size = range_size
+        self.prefetch = prefetch
+        self.retry = retry or RetryPolicy(max_attempts=1)
+        stat = self.retry.call(client.stat_object, bucket_name, object_name)
+        self.size = stat.size
+        self.etag = stat.etag
+        self._position = 0
+        self._response = None
+        self._ranges = deque()
+        self._current = memoryview(b"")
+        self._next_offset = 0
+        self._executor = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="minio-read") if prefetch else None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        position = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self.size}[whence] + offset
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        if position != self._position:
+            self._reset()
+            self._position = self._next_offset = position
+        return self._position
+
+    def _get(self, offset: int, length: int = 0):
+        return self.client.get_object(self.bucket_name, self.object_name, offset=offset, length=length,
+                                      request_headers={"If-Match": self.etag})
+
+    def _fetch_range(self, offset: int, length: int) -> bytes:
+        response = self._get(offset, length)
+        try:
+            data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+        if len(data) != length:
+            raise ConnectionError(f"Short read for {self.object_name} at offset {offset}: {len(data)} of {length} bytes")
+        return data
+
+    def _readinto_stream(self, buffer: memoryview) -> int:
+        if self._response is None:
+            self._response = self._get(self._position)
+        count = self._response.readinto(buffer)
+        if not count:
+            # The body ended before the object did, the connection dropped
+            self._close_response()
+            raise ConnectionError(f"Short read for {self.object_name} at offset {self._position}")
+        return count
+
+    def _readinto_ranges(self, buffer: memoryview) -> int:
+        while len(self._ranges) < self.prefetch and self._next_offset < self.size:
+            length = min(self.range_size, self.size - self._next_offset)
+            self._ranges.append(self._executor.submit(self.retry.call, self._fetch_range, self._next_offset, length))
+            self._next_offset += length
+        if not self._current:
+            self._current = memoryview(self._ranges.popleft().result())
+        count = min(len(buffer), len(self._current))
+        buffer[:count] = self._current[:count]
+        self._current = self._current[count:]
+        return count
+
+    def readinto(self, buffer) -> int:
+        buffer = memoryview(buffer).cast("B")
+        if self._position >= self.size or not len(buffer):
+            return 0
+        buffer = buffer[:self.size - self._position]
+        if self._executor:
+            count = self._readinto_ranges(buffer)
+        else:
+            count = self.retry.call(self._readinto_stream, buffer, on_retry=lambda err: self._close_response())
+        self._position += count
+        return count
+
+    def _close_response(self) -> None:
+        if self._response is not None:
+            self._response.close()
+            self._response.release_conn()
+            self._response = None
+
+    def _reset(self) -> None:
+        self._close_response()
+        for future in self._ranges:
+            future.cancel()
+        self._ranges.clear()
+        self._current = memoryview(b"")
+
+    def close(self) -> None:
+        if not self.closed:
+            self._reset()
+            if self._executor:
+                self._executor.shutdown(wait=False)
+        super().close()
+
 
 class MinioWrapper:
     """
@@ -15,21 +1604,83 @@ class MinioWrapper:
     - endpoint (str): Minio server endpoint.
     - access_key (str): Access key for Minio server.
     - secret_key (str): Secret key for Minio server.
+    - secure (bool): Whether to use HTTPS.
+    - region (str): Region of the Minio server.
+    - http_client (urllib3.PoolManager): Connection pool shared by the clients of this wrapper.
+    - worker_stats (Dict[str, Dict]): Connection reuse statistics of each worker of the last transfer.
+    - part_size (int): Part size of parallel multipart uploads and ranged downloads.
+    - part_concurrency (int): Number of parts of one object transferred at once.
+    - multipart_threshold (int): Objects of at least this many bytes are transferred in parallel parts.
+    - metrics_hooks (List[Callable[[TransferResult], None]]): Called with the result of every transfer of a batch call.
+    - retry (RetryPolicy): Retry policy of every transfer.
     """
-    def __init__(self, endpoint: str, access_key: str = None, secret_key: str = None, secure: bool = True):
-        self.minio_client = Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=secure)
+    def __init__(self, endpoint: str, access_key: str = None, secret_key: str = None, secure: bool = True,
+                 region: str = None, http_client: Optional[urllib3.PoolManager] = None,
+                 part_size: int = DEFAULT_PART_SIZE, part_concurrency: int = DEFAULT_PART_CONCURRENCY,
+                 multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD, retry: Optional[RetryPolicy] = None):
+        # The parts of one large object are in flight at once on this client
+        self.minio_client = Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=secure, region=region,
+                                  http_client=http_client or make_http_client(maxsize=max(10, part_concurrency)))
         logging.info(f"Minio client created for endpoint: {endpoint}")
         self.endpoint = endpoint
         self.access_key = access_key
         self.secret_key = secret_key
+        self.secure = secure
+        self.region = region
+        self.http_client = http_client
+        self.worker_stats = {}
+        self.part_size = part_size
+        self.part_concurrency = part_concurrency
+        self.multipart_threshold = multipart_threshold
+        self._thread_http_client = None
+        self._thread_pool_size = 0
+        self.metrics_hooks = []
+        self.retry = retry or RetryPolicy()
+
+    def add_metrics_hook(self, hook: Callable[[TransferResult], None]) -> None:
+        """
+        Registers a callback receiving the `TransferResult` of every transfer made by batch calls.
+
+        The callback runs in the calling process, so it can feed counters and histograms of a metrics client.
+
+        Parameters:
+        - hook (Callable[[TransferResult], None]): The callback.
+
+        Example:
+        >>> client.add_metrics_hook(lambda result: latency_histogram.observe(result.duration))
+        """
+        self.metrics_hooks.append(hook)
+
+    @property
+    def client_config(self) -> Dict:
+        """
+        The full configuration needed to build an equivalent Minio client in a worker.
+
+        The shared `http_client` is left out because a connection pool cannot be sent to another process;
+        every worker process builds its own pool instead.
+        """
+        return {
+            "endpoint": self.endpoint,
+            "access_key": self.access_key,
+            "secret_key": self.secret_key,
+            "secure": self.secure,
+            "region": self.region,
+        }
+
+    @staticmethod
+    def _legacy_config(args: Tuple) -> Dict:
+        """Builds a client configuration from the legacy (endpoint, access_key, secret_key, ...) upload arguments."""
+        return {"endpoint": args[0], "access_key": args[1], "secret_key": args[2]}
 
     @staticmethod
-    def get_all_file_paths(directory: str) -> Tuple[List[str], List[str]]:
+    def get_all_file_paths(directory: str, index: Optional[Union[str, DirectoryIndex]] = None) -> Tuple[List[str], List[str]]:
         """
         Retrieves the absolute paths and relative paths of all files in the given directory.
 
         Parameters:
         - directory (str): The directory whose files' paths are to be retrieved.
+        - index (str | DirectoryIndex, optional): Persistent directory index to answer from, listing only the
+          directories changed since the last call (see `path_wrapper.DirectoryIndex`). Defaults to a full walk.
 
         Returns:
         - Tuple[List[str], List[str]]: A tuple containing two lists:
@@ -37,119 +1688,671 @@ class MinioWrapper:
           2. A list of relative file paths from the input directory.
         """
         directory = os.path.abspath(directory)
-        abspath_files = [os.path.join(root, filename) 
-                        for root, _, files in os.walk(directory) for filename in files]
+        if index is not None:
+            abspath_files = [entry.path for entry in indexed_files(directory, index)]
+        else:
+            abspath_files = [os.path.join(root, filename)
+                             for root, _, files in os.walk(directory) for filename in files]
         relative_paths = [file[len(directory)+1:] for file in abspath_files]
         return abspath_files, relative_paths
 
     @staticmethod
-    def upload_file(args: Tuple[str, str, str, str, str, str]) -> str:
+    def upload_file(args: Tuple) -> TransferResult:
         """
         Uploads a single file to a MinIO bucket.
 
+        The upload goes through the calling worker's cached client (see `get_worker_client`),
+        so consecutive uploads in the same worker reuse its open connections. Throttling, server and
+        connection errors are retried with backoff.
+
         Parameters:
-        - args (Tuple[str, str, str, str, str, str]): A tuple containing the following:
-          1. Minio server endpoint.
-          2. Access key for Minio server.
-          3. Secret key for Minio server.
-          4. Target Minio bucket name.
-          5. Local path of the file to be uploaded.
-          6. Remote path (including filename) where the file will be stored in the bucket.
+        - args (Tuple[Dict, str, str, str, RetryPolicy]): A tuple containing the following:
+          1. Client configuration (see `MinioWrapper.client_config`).
+          2. Target Minio bucket name.
+          3. Local path of the file to be uploaded.
+          4. Remote path (including filename) where the file will be stored in the bucket.
+          5. Retry policy, optional. Defaults to `RetryPolicy()`.
+          The legacy form (endpoint, access_key, secret_key, bucket_name, local_path, remote_path) is also accepted.
 
         Returns:
-        - str: A string indicating the success status ("Success") or the error message.
+        - TransferResult: The bytes sent and time spent, or the type and message of the error.
         """
-        minio_endpoint, minio_access_key, minio_secret_key, bucket_name, local_path, remote_path = args
-        minio_client = Minio(minio_endpoint, minio_access_key, minio_secret_key)
+        if len(args) == 6:
+            client_config = MinioWrapper._legacy_config(args)
+            bucket_name, local_path, remote_path = args[3:]
+            retry = RetryPolicy()
+        else:
+            client_config, bucket_name, local_path, remote_path = args[:4]
+            retry = args[4] if len(args) == 5 else RetryPolicy()
+        worker = get_worker_client(client_config)
+        counter = RetryCounter()
+        start = time.monotonic()
         try:
-            minio_client.fput_object(bucket_name, remote_path, local_path)
-            return "Success"
+            worker.requests += 1
+            written = retry.call(worker.client.fput_object, bucket_name, remote_path, local_path, on_retry=counter)
+            return counter.result(remote_path, os.path.getsize(local_path), time.monotonic() - start,
+                                  etag=_unquote_etag(getattr(written, "etag", None)))
         except Exception as err:
-            return f"Upload Error for {local_path} : {err}"
+            return counter.result(remote_path, 0, time.monotonic() - start, err)
 
-    def upload(self, bucket_name: str, path_local_upload: str, prefix: str = "") -> None:
+    def upload(self, bucket_name: str, path_local_upload: str, prefix: str = "", max_workers: Optional[int] = None,
+               mode: str = "auto", index: Optional[Union[str, DirectoryIndex]] = None,
+               dedup: Optional[Union[str, ContentCache]] = None) -> TransferReport:
         """
         Uploads files or directories to a specified MinIO bucket.
 
         If the provided path represents a directory, all files within it are uploaded with their
         relative paths maintained in the bucket. If the path represents a single file, only that file 
-        is uploaded. The upload leverages multiprocessing for enhanced speed.
+        is uploaded. The files are spread over threads or processes by a `TransferScheduler`; every worker
+        keeps one Minio client and its connection pool for all the files it uploads.
 
         Parameters:
         - bucket_name (str): The target Minio bucket where the files/directories will be uploaded.
         - path_local_upload (str): The local path of the file or directory to be uploaded.
         - prefix (str, optional): The prefix or folder name within the bucket where the files will be uploaded. Defaults to "".
+        - max_workers (int, optional): Maximum number of concurrent uploads. Defaults to the scheduler's choice.
+        - mode (str, optional): Scheduler mode, "auto", "inline", "thread" or "process". Defaults to "auto".
+        - index (str | DirectoryIndex, optional): Persistent directory index used to list the directory and
+          the file sizes, instead of walking it. Defaults to None.
+        - dedup (str | ContentCache, optional): Content cache, or the path of its database, enabling the
+          content-addressed mode: files whose content is already in the bucket are copied server-side, or
+          skipped when their destination already holds it, instead of being sent. Defaults to None.
 
         Returns:
-        - None: Files are uploaded to the MinIO bucket and no explicit return value is provided.
+        - TransferReport: Throughput, per-file latencies and failed keys of the upload, with the number of
+          server-side copies in `copied` and of files already in place in `skipped`.
 
         Raises:
-        - Exceptions related to file upload will be logged.
+        - Exceptions related to file upload will be logged and reported.
 
         Example:
         >>> client = MinioWrapper(endpoint="localhost:9000", access_key="YOUR_ACCESS_KEY", secret_key="YOUR_SECRET_KEY")
         >>> client.upload(bucket_name="mybucket", path_local_upload="/path/to/local/data", prefix="remote/folder/")
+        >>> client.upload(bucket_name="mybucket", path_local_upload="/path/to/run-2", dedup="/var/cache/pylabtools.db")
+        """
+        transfers = MinioWrapper._upload_transfers(bucket_name, path_local_upload, prefix, index)
+        if dedup is None:
+            return self._run_transfers(transfers, upload=True, max_workers=max_workers, mode=mode)
+        cache = dedup if isinstance(dedup, ContentCache) else ContentCache(dedup)
+        try:
+            return self._upload_deduplicated(transfers, cache, max_workers, mode)
+        finally:
+            if cache is not dedup:
+                cache.close()
+
+    def _copy_object(self, bucket_name: str, object_name: str, source: Dict, retry: RetryPolicy) -> Tuple[TransferResult, Optional[str]]:
+        """Copies the object of a cache entry server-side and returns the result with the ETag of the copy."""
+        counter = RetryCounter()
+        start = time.monotonic()
+        try:
+            if source["size"] > MAX_COPY_SIZE:
+                # A single copy request is limited to 5 GiB, a composition copies in parts
+                written = retry.call(self.minio_client.compose_object, bucket_name, object_name,
+                                     [ComposeSource(source["bucket"], source["object"], match_etag=source["etag"])],
+                                     on_retry=counter)
+            else:
+                written = retry.call(self.minio_client.copy_object, bucket_name, object_name,
+                                     CopySource(source["bucket"], source["object"], match_etag=source["etag"]),
+                                     on_retry=counter)
+            return counter.result(object_name, 0, time.monotonic() - start), _unquote_etag(written.etag)
+        except Exception as err:
+            return counter.result(object_name, 0, time.monotonic() - start, err), None
+
+    def _valid_entries(self, entries: List[Dict], retry: RetryPolicy, workers: int) -> List[Dict]:
+        """Stats the objects of cache entries in parallel and returns the entries still holding their content."""
+        def _check(entry):
+            try:
+                return ContentCache.is_valid(entry, retry.call(self.minio_client.stat_object, entry["bucket"], entry["object"]))
+            except Exception as err:
+                # Whatever the failure, the content is only trusted once its object is seen
+                logging.warning(f"Could not check {entry['bucket']}/{entry['object']}: {err}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dedup") as executor:
+            return [entry for entry, valid in zip(entries, executor.map(_check, entries)) if valid]
+
+    def _upload_deduplicated(self, transfers: List[Tuple[int, str, str, str]], cache: ContentCache,
+                             max_workers: Optional[int], mode: str) -> TransferReport:
+        """
+        Uploads files in content-addressed mode, sending only the content no known object holds.
+
+        Every file is hashed, then its destination is classified: already holding the content (skipped),
+        content held by another valid object of the cache (copied server-side), content already planned in
+        this call (copied once that upload is done), or new content (uploaded). A failed copy from the cache
+        falls back to an upload.
         """
+        workers = max_workers or DEFAULT_PART_CONCURRENCY
+        retry = self.retry.start_batch()
+        hashes = cache.hash_files([transfer[2] for transfer in transfers], workers=workers)
+
+        # Check the destination of every file and the 3 most recently used holders of its content, once each
+        checks = {}
+        holders = {}
+        for size, bucket_name, local_path, remote_path in transfers:
+            content_hash = hashes[local_path]
+            if content_hash not in holders:
+                holders[content_hash] = cache.locations(content_hash, limit=3)
+            own = cache.get(bucket_name, remote_path)
+            for entry in holders[content_hash] + ([own] if own and own["hash"] == content_hash else []):
+                checks[entry["bucket"], entry["object"]] = entry
+        valid = {(entry["bucket"], entry["object"]): entry for entry in self._valid_entries(list(checks.values()), retry, workers)}
+        for key in checks.keys() - valid.keys():
+            cache.forget(*key)
+        holders = {content_hash: next((valid[entry["bucket"], entry["object"]] for entry in entries
+                                       if (entry["bucket"], entry["object"]) in valid), None)
+                   for content_hash, entries in holders.items()}
+
+        uploads, copies, duplicates = [], [], []
+        planned = {}
+        skipped = 0
+        for transfer in transfers:
+            size, bucket_name, local_path, remote_path = transfer
+            content_hash = hashes[local_path]
+            if valid.get((bucket_name, remote_path), {}).get("hash") == content_hash:
+                cache.touch(bucket_name, remote_path)
+                skipped += 1
+            elif holders[content_hash]:
+                copies.append((transfer, holders[content_hash]))
+            elif content_hash in planned:
+                duplicates.append(transfer)
+            else:
+                planned[content_hash] = transfer
+                uploads.append(transfer)
+
+        copied = []
+        copy_failures = []
+
+        def _copy_all(pairs):
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dedup") as executor:
+                futures = [executor.submit(self._copy_object, transfer[1], transfer[3], source, retry) for transfer, source in pairs]
+                for (transfer, source), future in zip(pairs, futures):
+                    result, etag = future.result()
+                    for hook in self.metrics_hooks:
+                        hook(result)
+                    if result.ok:
+                        copied.append((transfer[1], transfer[3], hashes[transfer[2]], transfer[0], etag))
+                        cache.touch(source["bucket"], source["object"])
+                    else:
+                        copy_failures.append((transfer, result))
+
+        _copy_all(copies)
+        uploads.extend(transfer for transfer, _ in copy_failures)
+        copy_failures.clear()
+
+        uploaded = {}
+        report = self._run_transfers(uploads, upload=True, max_workers=max_workers, mode=mode,
+                                     on_success=lambda result: uploaded.__setitem__(result.object_name, result.etag))
+        cache.record((transfer[1], transfer[3], hashes[transfer[2]], transfer[0], uploaded[transfer[3]])
+                     for transfer in uploads if transfer[3] in uploaded)
+
+        # Files repeating content first sent by this call are copied from that upload
+        duplicate_copies = []
+        for transfer in duplicates:
+            source = planned[hashes[transfer[2]]]
+            if source[3] in uploaded:
+                duplicate_copies.append((transfer, {"bucket": source[1], "object": source[3], "size": source[0],
+                                                    "etag": uploaded[source[3]]}))
+            else:
+                report.add(TransferResult(transfer[3], 0, 0.0, error="SourceUploadFailed",
+                                          message=f"the upload of identical {source[3]} failed"))
+        _copy_all(duplicate_copies)
+        for transfer, result in copy_failures:
+            logging.error(f"Copy Error for {result.object_name} : {result.error}: {result.message}")
+            report.add(result)
+
+        cache.record(copied)
+        report.copied = len(copied)
+        report.skipped = skipped
+        logging.info(f"Deduplicated upload: {len(uploads)} sent, {len(copied)} copied, {skipped} already in place")
+        return report.finish()
+
+    @staticmethod
+    def _upload_transfers(bucket_name: str, path_local_upload: str, prefix: str = "",
+                          index: Optional[Union[str, DirectoryIndex]] = None) -> List[Tuple[int, str, str, str]]:
+        """Returns the (size, bucket name, local path, remote path) of every file `upload` sends."""
         path_local_upload = os.path.abspath(path_local_upload)
-        upload_args = []
-        
-        if os.path.isdir(path_local_upload):
+        transfers = []
+
+        if os.path.isdir(path_local_upload) and index is not None:
+            # The index already holds the sizes, no stat per file
+            prefix = os.path.join(prefix, os.path.basename(path_local_upload))
+            transfers = [(entry.size or 0, bucket_name, entry.path,
+                          os.path.join(prefix, entry.path[len(path_local_upload) + 1:]).replace("\\", "/"))
+                         for entry in indexed_files(path_local_upload, index)]
+        elif os.path.isdir(path_local_upload):
             prefix = os.path.join(prefix, os.path.basename(path_local_upload))
             files = MinioWrapper.get_all_file_paths(path_local_upload)
-            upload_args = [(self.endpoint, self.access_key, self.secret_key, bucket_name, local_file, os.path.join(prefix, remote_file).replace("\\", "/")) 
-                           for local_file, remote_file in zip(files[0], files[1])]
+            transfers = [(os.path.getsize(local_file), bucket_name, local_file, os.path.join(prefix, remote_file).replace("\\", "/"))
+                         for local_file, remote_file in zip(files[0], files[1])]
         else:
             remote_path = os.path.join(prefix, os.path.basename(path_local_upload)).replace("\\", "/")
-            upload_args.append((self.endpoint, self.access_key, self.secret_key, bucket_name, path_local_upload, remote_path))
+            transfers.append((os.path.getsize(path_local_upload), bucket_name, path_local_upload, remote_path))
+        return transfers
+
+    def _client_config_for(self, mode: str, max_workers: int) -> Dict:
+        """
+        Returns the client configuration handed to the workers of a mode.
+
+        Threads share one keep-alive pool sized for `max_workers` connections plus the parts of one large
+        object; processes each build their own.
+        """
+        if mode == "process":
+            return self.client_config
+        pool_size = max_workers + self.part_concurrency
+        if self.http_client is None and self._thread_pool_size < pool_size:
+            self._thread_http_client = make_http_client(maxsize=pool_size)
+            self._thread_pool_size = pool_size
+        return dict(self.client_config, http_client=self.http_client or self._thread_http_client)
+
+    def _run_transfers(self, transfers: Union[List[Tuple[int, str, str, str]], Iterator[Tuple[int, str, str, str]]],
+                       upload: bool, on_success: Optional[Callable[[TransferResult], None]] = None,
+                       max_workers: Optional[int] = None, mode: str = "auto", queue_size: int = 1000) -> TransferReport:
+        """
+        Runs uploads or downloads through a `TransferScheduler` and logs the failures.
+
+        Every transfer is retried under `retry`, sharing one retry budget for the whole call, and the
+        scheduler halves its concurrency when the server throttles. Objects of at least `multipart_threshold` bytes are transferred one at a time with their parts in
+        parallel; the others are handed to the scheduler. A list of transfers is planned up front, largest
+        first. Any other iterable, such as a live object listing, is pipelined: it is consumed in a background
+        thread through a queue of `queue_size` entries, transfers start as soon as the first entries arrive,
+        the progress bar total grows as entries are listed, and large objects are transferred at the end.
+
+        Parameters:
+        - transfers (List | Iterator): (size, bucket name, local path, remote path) of every file.
+        - upload (bool): True to upload the local files, False to download the remote objects.
+        - on_success (Callable[[TransferResult], None], optional): Called in this process with the result of every transferred file.
+        - max_workers (int, optional): Maximum number of concurrent transfers. Defaults to the scheduler's choice.
+        - mode (str, optional): Scheduler mode, "auto", "inline", "thread" or "process". Defaults to "auto".
+        - queue_size (int, optional): Number of listed entries buffered ahead of the transfers. Defaults to 1000.
+
+        Returns:
+        - TransferReport: The aggregate of the results of every transfer.
+        """
+        scheduler = TransferScheduler(max_workers=max_workers, mode=mode)
+        streaming = not isinstance(transfers, list)
+        if streaming:
+            # Sizes are unknown until listed, so streams run on threads unless told otherwise
+            run_mode = "thread" if mode == "auto" else mode
+            large = []
+        else:
+            if not transfers:
+                return TransferReport().finish()
+            large = sorted((transfer for transfer in transfers if transfer[0] >= self.multipart_threshold), reverse=True)
+            run_mode = scheduler.choose_mode([transfer[0] for transfer in transfers if transfer[0] < self.multipart_threshold])
+        client_config = self._client_config_for(run_mode, scheduler.worker_limit(run_mode))
+        fn = _upload_with_stats if upload else _download_with_stats
+        retry = self.retry.start_batch()
+
+        # Only the latest stats of each worker and the aggregate report are kept, so memory stays small
+        self.worker_stats = {}
+        report = TransferReport()
+        with tqdm(total=None if streaming else len(transfers), desc="Files Uploaded" if upload else "Downloading files",
+                  unit="file") as pbar:
+            def _done(result, stats):
+                if stats:
+                    self.worker_stats[stats["worker"]] = stats
+                report.add(result)
+                for hook in self.metrics_hooks:
+                    hook(result)
+                if result.throttles:
+                    scheduler.throttle()
+                if not result.ok:
+                    logging.error(f"{'Upload' if upload else 'Download'} Error for {result.object_name} : "
+                                  f"{result.error}: {result.message}")
+                pbar.update(1)
+                if result.ok and on_success:
+                    on_success(result)
+
+            if streaming:
+                def _small_tasks():
+                    for transfer in transfers:
+                        pbar.total = (pbar.total or 0) + 1
+                        if transfer[0] >= self.multipart_threshold:
+                            large.append(transfer)
+                        else:
+                            yield transfer[0], (client_config,) + tuple(transfer[1:]) + (retry,)
+                tasks = prefetch(_small_tasks(), maxsize=queue_size)
+            else:
+                tasks = [(transfer[0], (client_config,) + tuple(transfer[1:]) + (retry,))
+                         for transfer in transfers if transfer[0] < self.multipart_threshold]
+                for transfer in large:
+                    _done(self._transfer_large(transfer, upload, retry), None)
+
+            for result in scheduler.run(fn, tasks, mode=run_mode, initializer=_set_retry_budget,
+                                        initargs=(retry._budget,)):
+                _done(*result)
+
+            if streaming:
+                for transfer in sorted(large, reverse=True):
+                    _done(self._transfer_large(transfer, upload, retry), None)
+
+        report.finish()
+        pools = {stats["pool"]: stats["connections"] for stats in self.worker_stats.values()}
+        logging.info(f"Transfer used {len(self.worker_stats)} worker clients ({run_mode}), "
+                     f"{sum(pools.values())} connections "
+                     f"for {sum(stats['requests'] for stats in self.worker_stats.values())} requests: {report}")
+        return report
+
+    def _transfer_large(self, transfer: Tuple[int, str, str, str], upload: bool, retry: RetryPolicy) -> TransferResult:
+        """Transfers one large file with its parts in parallel, retrying parts one by one, and returns its result."""
+        size, bucket_name, local_path, remote_path = transfer
+        counter = RetryCounter()
+        start = time.monotonic()
+        try:
+            transfer_object = upload_object_multipart if upload else download_object_ranged
+            etag = transfer_object(self.minio_client, bucket_name, remote_path, local_path, part_size=self.part_size,
+                                   concurrency=self.part_concurrency, retry=retry, on_retry=counter)
+            return counter.result(remote_path, size, time.monotonic() - start, etag=_unquote_etag(etag) if upload else None)
+        except Exception as err:
+            return counter.result(remote_path, 0, time.monotonic() - start, err)
+
+    def upload_large_file(self, bucket_name: str, local_path: str, remote_path: str) -> str:
+        """
+        Uploads a single file as a multipart upload with `part_concurrency` parts in flight.
+
+        Parameters:
+        - bucket_name (str): The target Minio bucket.
+        - local_path (str): Local path of the file to be uploaded.
+        - remote_path (str): Remote path (including filename) where the file will be stored in the bucket.
+
+        Returns:
+        - str: The ETag of the uploaded object.
+
+        Raises:
+        - ValueError: If the uploaded object fails the integrity check.
+        """
+        return upload_object_multipart(self.minio_client, bucket_name, remote_path, local_path,
+                                       part_size=self.part_size, concurrency=self.part_concurrency, retry=self.retry)
+
+    def _download_object(self, bucket_name: str, object_name: str, file_path: str, stat,
+                         retry: Optional[RetryPolicy] = None, on_retry: Optional[Callable] = None) -> None:
+        """Downloads one object from its stat, in parallel ranges when it is at least `multipart_threshold` bytes."""
+        retry = retry or self.retry
+        if stat.size >= self.multipart_threshold:
+            download_object_ranged(self.minio_client, bucket_name, object_name, file_path, part_size=self.part_size,
+                                   concurrency=self.part_concurrency, retry=retry, on_retry=on_retry, stat=stat)
+        else:
+            retry.call(self.minio_client.fget_object, bucket_name, object_name, file_path, on_retry=on_retry)
+
+    def _fetch_object(self, bucket_name: str, object_name: str, file_path: str, cached_etag: Optional[str],
+                      retry: RetryPolicy, on_retry: Optional[Callable] = None) -> Optional[Tuple[str, int]]:
+        """
+        Writes an object to `file_path` for the `ObjectCache`, unless it still has `cached_etag`.
+
+        One GET, conditional on `cached_etag` when there is one, both revalidates and fetches: the ETag and
+        size come from its headers, so no stat is sent first. It is retried as a whole, body included, under
+        `retry`. Objects of at least `multipart_threshold` bytes are not read from it but fetched with
+        parallel ranged GETs pinned to that ETag.
+
+        Returns:
+        - Tuple[str, int] | None: The ETag and size of the object written, or None if it did not change.
+        """
+        headers = {"If-None-Match": f'"{cached_etag}"'} if cached_etag else None
+
+        def _get():
+            response = self.minio_client.get_object(bucket_name, object_name, request_headers=headers)
+            try:
+                etag = response.headers["ETag"].strip('"')
+                expected = response.headers.get("Content-Length")
+                if expected is not None and int(expected) >= self.multipart_threshold:
+                    return etag, int(expected), False
+                size = 0
+                with open(file_path, "wb") as f:
+                    for chunk in response.stream(DEFAULT_READ_BUFFER_SIZE):
+                        f.write(chunk)
+                        size += len(chunk)
+            finally:
+                response.close()
+                response.release_conn()
+            if expected is not None and size != int(expected):
+                # A body cut short is a connection failure, the GET can be sent again
+                raise ConnectionError(f"Short read for {object_name}: {size} of {expected} bytes")
+            return etag, size, True
+
+        try:
+            etag, size, written = retry.call(_get, on_retry=on_retry)
+        except ServerError as err:
+            if err.status_code == 304:
+                return None
+            raise
+        if not written:
+            download_object_ranged(self.minio_client, bucket_name, object_name, file_path, part_size=self.part_size,
+                                   concurrency=self.part_concurrency, retry=retry, on_retry=on_retry,
+                                   stat=Object(bucket_name, object_name, etag=etag, size=size))
+        return etag, size
+
+    def _download_cached(self, bucket_name: str, object_name: str, file_path: str, cache: ObjectCache,
+                         etag: Optional[str] = None, retry: Optional[RetryPolicy] = None,
+                         catch: bool = False) -> Tuple[TransferResult, bool]:
+        """Delivers one object through the cache and returns its result and whether it was a cache hit."""
+        retry = retry or self.retry
+        counter = RetryCounter()
+        start = time.monotonic()
+        received = []
+
+        def _fetch(path, cached_etag):
+            fetched = self._fetch_object(bucket_name, object_name, path, cached_etag, retry, counter)
+            received.append(fetched[1] if fetched else 0)
+            return fetched
+
+        try:
+            _, hit = cache.get(bucket_name, object_name, _fetch, etag=etag, output=file_path)
+        except Exception as err:
+            if not catch:
+                raise
+            return counter.result(object_name, 0, time.monotonic() - start, err), False
+        return counter.result(object_name, sum(received), time.monotonic() - start), hit
+
+    def sync_up(self, bucket_name: str, path_local_upload: str, prefix: str = "", checksum: bool = False,
+                manifest_path: Optional[str] = None, max_workers: Optional[int] = None) -> TransferReport:
+        """
+        Uploads only the files of a local directory that differ from the objects already in the bucket.
+
+        Files are laid out in the bucket exactly like `upload` does. A file is skipped when an object of the
+        same size exists and the file was not modified after the object was written, or, with `checksum`,
+        when its MD5 matches the object's ETag. Completed uploads are recorded in a manifest kept outside the
+        directory, so an interrupted run can be restarted without checking those files again; the entries
+        of files deleted since the last run are dropped from it.
+
+        Parameters:
+        - bucket_name (str): The target Minio bucket.
+        - path_local_upload (str): The local directory to synchronize.
+        - prefix (str, optional): The prefix or folder name within the bucket. Defaults to "".
+        - checksum (bool, optional): Compare file MD5s against object ETags. Defaults to False.
+        - manifest_path (str, optional): Path to the manifest file. Defaults to `SyncManifest.default_path` of the directory.
+        - max_workers (int, optional): Maximum number of concurrent uploads. Defaults to the scheduler's choice.
+
+        Returns:
+        - TransferReport: The report of the uploads, with the number of unchanged files in `skipped`.
+
+        Example:
+        >>> client = MinioWrapper(endpoint="localhost:9000", access_key="YOUR_ACCESS_KEY", secret_key="YOUR_SECRET_KEY")
+        >>> client.sync_up(bucket_name="mybucket", path_local_upload="/path/to/local/data", prefix="remote/folder/")
+        """
+        path_local_upload = os.path.abspath(path_local_upload)
+        manifest_path = os.path.abspath(manifest_path or SyncManifest.default_path(path_local_upload))
+        manifest = SyncManifest(manifest_path)
+        # Neither the manifest nor one left inside the directory by earlier versions is synced
+        excluded = {manifest_path, os.path.join(path_local_upload, SYNC_MANIFEST_NAME)}
+        prefix = os.path.join(prefix, os.path.basename(path_local_upload)).replace("\\", "/")
+        remote_objects = {obj.object_name: obj for obj in
+                          self.minio_client.list_objects(bucket_name, prefix=prefix + "/", recursive=True)}
+
+        transfers = []
+        local_stats = {}
+        seen = []
+        skipped = 0
+        for local_file, relative_path in zip(*MinioWrapper.get_all_file_paths(path_local_upload)):
+            if os.path.abspath(local_file) in excluded:
+                continue
+            remote_path = os.path.join(prefix, relative_path).replace("\\", "/")
+            local_stat = os.stat(local_file)
+            key = f"{bucket_name}/{remote_path}"
+            seen.append(key)
+            if is_unchanged(local_file, local_stat, remote_objects.get(remote_path), manifest.get(key),
+                            newer=lambda local_mtime, remote_mtime: local_mtime > remote_mtime, checksum=checksum):
+                skipped += 1
+                continue
+            local_stats[remote_path] = local_stat
+            transfers.append((local_stat.st_size, bucket_name, local_file, remote_path))
+        manifest.prune(seen, scope=f"{bucket_name}/{prefix}/")
+
+        def _record(result):
+            local_stat = local_stats[result.object_name]
+            manifest.record(f"{bucket_name}/{result.object_name}", local_stat.st_size, local_stat.st_mtime_ns,
+                            result.etag)
+
+        report = self._run_transfers(transfers, upload=True, on_success=_record, max_workers=max_workers)
+        report.skipped = skipped
+        return report
+
+    def sync_down(self, bucket_name: str, prefix: str = "", destination_path: str = "", checksum: bool = False,
+                  manifest_path: Optional[str] = None, max_workers: Optional[int] = None) -> TransferReport:
+        """
+        Downloads only the objects under a prefix that differ from the local copies.
+
+        Objects are laid out locally exactly like `download_files` does with `recursive=True`. An object is
+        skipped when a local file of the same size exists and the object was not modified after it, or, with
+        `checksum`, when the file's MD5 matches the object's ETag. Downloaded files get the object's
+        modification time and are recorded in a manifest so an interrupted run can be restarted.
+
+        Parameters:
+        - bucket_name (str): Name of the bucket in minio.
+        - prefix (str, optional): Prefix or folder name within the bucket. Defaults to "".
+        - destination_path (str, optional): Local directory to synchronize into. Defaults to the current directory.
+        - checksum (bool, optional): Compare file MD5s against object ETags. Defaults to False.
+        - manifest_path (str, optional): Path to the manifest file. Defaults to `SyncManifest.default_path` of the destination.
+        - max_workers (int, optional): Maximum number of concurrent downloads. Defaults to the scheduler's choice.
+
+        Returns:
+        - TransferReport: The report of the downloads, with the number of unchanged objects in `skipped`.
+        """
+        destination_path = os.path.abspath(destination_path)
+        os.makedirs(destination_path, exist_ok=True)
+        manifest = SyncManifest(manifest_path or SyncManifest.default_path(destination_path))
+
+        to_download = {}
+        seen = []
+        skipped = 0
+
+        def _changed_objects():
+            nonlocal skipped
+            for obj in self.minio_client.list_objects(bucket_name, prefix=prefix, recursive=True):
+                if obj.is_dir:
+                    continue
+                seen.append(f"{bucket_name}/{obj.object_name}")
+                local_file = os.path.join(destination_path, obj.object_name)
+                if os.path.isfile(local_file) and is_unchanged(
+                        local_file, os.stat(local_file), obj, manifest.get(f"{bucket_name}/{obj.object_name}"),
+                        newer=lambda local_mtime, remote_mtime: remote_mtime > local_mtime, checksum=checksum):
+                    skipped += 1
+                    continue
+                to_download[obj.object_name] = (obj, local_file)
+                yield obj.size, bucket_name, local_file, obj.object_name
 
-        # Use multiprocessing for the uploads
-        with Pool(processes=cpu_count()) as pool:
-            results = list(tqdm(pool.imap_unordered(MinioWrapper.upload_file, upload_args), total=len(upload_args), desc="Files Uploaded", unit="file"))
-        
-        # Handle and display errors
-        errors = [result for result in results if result != "Success"]
-        for error in errors:
-            logging.error(error)
-            
+        def _record(result):
+            object_name = result.object_name
+            obj, local_file = to_download.pop(object_name)
+            mtime = obj.last_modified.timestamp()
+            os.utime(local_file, (mtime, mtime))
+            # The time the file system actually kept, which may be rounded
+            manifest.record(f"{bucket_name}/{object_name}", obj.size, os.stat(local_file).st_mtime_ns,
+                            (obj.etag or "").strip('"'))
 
-    def download_files(self, bucket_name, prefix="", recursive=False, destination_path="", max_workers=10):
+        report = self._run_transfers(_changed_objects(), upload=False, on_success=_record, max_workers=max_workers)
+        # The listing ran to its end, so objects it did not return were deleted
+        manifest.prune(seen, scope=f"{bucket_name}/{prefix}")
+        report.skipped = skipped
+        return report
+
+    def download_files(self, bucket_name, prefix="", recursive=False, destination_path="", max_workers=None, mode="auto",
+                       queue_size=1000, cache: Optional[ObjectCache] = None):
         """
         Download all files from the specified bucket with optional prefix and recursion.
 
+        Listing and downloading are pipelined: downloads start with the first listed objects and at most
+        `queue_size` listed objects wait in memory, however many objects the prefix holds.
+
         Args:
         - bucket_name (str): Name of the bucket in minio.
         - prefix (str, optional): Prefix or folder name within the bucket. Defaults to "".
         - recursive (bool, optional): Whether or not to download files recursively. Defaults to False.
         - destination_path (str, optional): Local directory where the files will be downloaded to. Defaults to the current directory.
-        - max_workers (int, optional): Maximum number of threads to use for concurrent downloads. Defaults to 10.
+        - max_workers (int, optional): Maximum number of concurrent downloads. Defaults to the scheduler's choice.
+        - mode (str, optional): Scheduler mode, "inline", "thread" or "process". Defaults to "auto", which uses threads.
+        - queue_size (int, optional): Maximum number of listed objects waiting to be downloaded. Defaults to 1000.
+        - cache (ObjectCache, optional): Local object cache to read through. Objects whose listed ETag matches
+          the cached copy are delivered from it without a request. Downloads then run on threads, so `mode`
+          must be "auto" or "thread". Defaults to None.
+
+        Returns:
+        - TransferReport: Throughput, per-file latencies and failed keys of the download, with the number of
+          cache hits in `skipped`.
         """
 
-        os.makedirs(destination_path, exist_ok=True)
-        objects_to_download = [obj.object_name for obj in self.minio_client.list_objects(bucket_name, prefix=prefix, recursive=recursive)]
-        
-        def _download_to_dest(bucket_name, object_name, destination, pbar=None):
-            dest_file_path = os.path.join(destination, object_name)
-            os.makedirs(os.path.dirname(dest_file_path), exist_ok=True)
-            self.minio_client.fget_object(bucket_name, object_name, dest_file_path)
-            if pbar:
+        if cache is not None and mode not in ("auto", "thread"):
+            raise ValueError(f"Unsupported mode with a cache: {mode}, cached downloads run on threads")
+        os.makedirs(destination_path or ".", exist_ok=True)
+        objects = (obj for obj in self.minio_client.list_objects(bucket_name, prefix=prefix, recursive=recursive)
+                   if not obj.is_dir)
+        if cache is not None:
+            return self._download_cached_batch(bucket_name, objects, destination_path, cache, max_workers, queue_size)
+        transfers = ((obj.size, bucket_name, os.path.join(destination_path, obj.object_name), obj.object_name)
+                     for obj in objects)
+        return self._run_transfers(transfers, upload=False, max_workers=max_workers, mode=mode, queue_size=queue_size)
+
+    def _download_cached_batch(self, bucket_name: str, objects: Iterable, destination_path: str, cache: ObjectCache,
+                               max_workers: Optional[int], queue_size: int) -> TransferReport:
+        """Delivers listed objects through the cache on a thread pool, with at most `queue_size` in flight."""
+        retry = self.retry.start_batch()
+        report = TransferReport()
+        with tqdm(total=None, desc="Downloading files", unit="file") as pbar, \
+                ThreadPoolExecutor(max_workers=max_workers or DEFAULT_PART_CONCURRENCY, thread_name_prefix="cache") as executor:
+            def _done(future):
+                result, hit = future.result()
+                if hit:
+                    report.skipped += 1
+                else:
+                    report.add(result)
+                    for hook in self.metrics_hooks:
+                        hook(result)
+                    if not result.ok:
+                        logging.error(f"Download Error for {result.object_name} : {result.error}: {result.message}")
                 pbar.update(1)
 
-        with tqdm(total=len(objects_to_download), desc="Downloading files", unit="file") as pbar:
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                executor.map(_download_to_dest, [bucket_name]*len(objects_to_download), objects_to_download, [destination_path]*len(objects_to_download), [pbar]*len(objects_to_download))
-    
-    def download_file(self, bucket_name: str, file_name: str, file_output: str = None) -> None:
+            pending = set()
+            for obj in objects:
+                pbar.total = (pbar.total or 0) + 1
+                if len(pending) >= queue_size:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _done(future)
+                output = os.path.join(destination_path, obj.object_name)
+                pending.add(executor.submit(self._download_cached, bucket_name, obj.object_name, output, cache,
+                                            obj.etag.strip('"') if obj.etag else None, retry, True))
+            for future in wait(pending).done:
+                _done(future)
+        return report.finish()
+
+    def download_file(self, bucket_name: str, file_name: str, file_output: str = None,
+                      cache: Optional[ObjectCache] = None) -> TransferResult:
         """
         Downloads a specific file from the given MinIO bucket.
 
+        Files of at least `multipart_threshold` bytes are downloaded with `part_concurrency` ranged GETs in parallel.
+        Throttling, server and connection errors are retried under `retry`.
+
         Args:
         - bucket_name (str): The name of the bucket in MinIO from which the file needs to be downloaded.
         - file_name (str): The name (or path) of the file within the bucket to download.
         - file_output (str, optional): The desired local name (or path) for the downloaded file. 
             If not provided, the file will be saved with its original name from the bucket.
+        - cache (ObjectCache, optional): Local object cache to read through. A cached copy is revalidated with a
+            conditional GET, per the cache's `revalidate_after`, and delivered as a hard link. Defaults to None.
 
         Returns:
-        - None: The function saves the downloaded file to the local filesystem and does not return any value.
+        - TransferResult: The bytes received and time spent; the file is saved to the local filesystem.
+            On a cache hit, no bytes are received.
 
         Raises:
         - S3Error: If there is an issue related to the S3 operation, e.g., a file or bucket does not exist.
@@ -164,4 +2367,375 @@ class MinioWrapper:
         file_output_name = file_name
         if file_output is not None:
             file_output_name = file_output
-        self.minio_client.fget_object(bucket_name, file_name, file_output_name)
\ No newline at end of file
+        if cache is not None:
+            return self._download_cached(bucket_name, file_name, file_output_name, cache)[0]
+        counter = RetryCounter()
+        start = time.monotonic()
+        stat = self.retry.call(self.minio_client.stat_object, bucket_name, file_name, on_retry=counter)
+        self._download_object(bucket_name, file_name, file_output_name, stat, on_retry=counter)
+        return counter.result(file_name, stat.size, time.monotonic() - start)
+
+    def open_object(self, bucket_name: str, object_name: str, mode: str = "rb",
+                    buffer_size: int = DEFAULT_READ_BUFFER_SIZE, prefetch: int = 0, range_size: Optional[int] = None,
+                    encoding: str = "utf-8", errors: Optional[str] = None, newline: Optional[str] = None) -> io.IOBase:
+        """
+        Opens an object as a read-only file-like stream, without downloading it to disk.
+
+        The stream reads ahead `buffer_size` bytes at a time and can prefetch ranges in the background
+        (see `ObjectReader`). It can be passed to the `file_wrapper` helpers that accept streams.
+
+        Parameters:
+        - bucket_name (str): Name of the bucket in minio.
+        - object_name (str): Name of the object.
+        - mode (str, optional): "rb" for a binary stream or "r" for a text stream. Defaults to "rb".
+        - buffer_size (int, optional): Bytes read ahead per request to the underlying stream. Defaults to 1 MiB.
+        - prefetch (int, optional): Number of ranges downloaded ahead in background threads, 0 to stream one GET. Defaults to 0.
+        - range_size (int, optional): Bytes per prefetched range. Defaults to `part_size`.
+        - encoding (str, optional): Encoding of a text stream. Defaults to "utf-8".
+        - errors (str, optional): Decoding error handling of a text stream, as for `open`.
+        - newline (str, optional): Newline handling of a text stream, as for `open`.
+
+        Returns:
+        - io.BufferedReader | io.TextIOWrapper: The stream, to be closed by the caller.
+
+        Example:
+        >>> with client.open_object("mybucket", "logs/app.jsonl", mode="r", prefetch=4) as f:
+        ...     for line in f:
+        ...         process(line)
+        """
+        if mode not in ("rb", "r"):
+            raise ValueError(f"Unsupported mode: {mode}")
+        reader = ObjectReader(self.minio_client, bucket_name, object_name, range_size=range_size or self.part_size,
+                              prefetch=prefetch, retry=self.retry)
+        stream = io.BufferedReader(reader, buffer_size=buffer_size)
+        if mode == "r":
+            return io.TextIOWrapper(stream, encoding=encoding, errors=errors, newline=newline)
+        return stream
+
+    def iter_object_chunks(self, bucket_name: str, object_name: str, chunk_size: int = DEFAULT_READ_BUFFER_SIZE,
+                           **kwargs) -> Iterator[bytes]:
+        """
+        Streams the content of an object in chunks of `chunk_size` bytes.
+
+        Parameters:
+        - bucket_name (str): Name of the bucket in minio.
+        - object_name (str): Name of the object.
+        - chunk_size (int, optional): Number of bytes per chunk. Defaults to 1 MiB.
+        - **kwargs: Stream options of `open_object`.
+
+        Yields:
+        - bytes: Consecutive chunks of the object.
+        """
+        with self.open_object(bucket_name, object_name, **kwargs) as stream:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def iter_object_lines(self, bucket_name: str, object_name: str, encoding: str = "utf-8",
+                          **kwargs) -> Iterator[str]:
+        """
+        Streams the lines of a text object without their line endings, like `file_wrapper.stream_file_by_line`.
+
+        Parameters:
+        - bucket_name (str): Name of the bucket in minio.
+        - object_name (str): Name of the object.
+        - encoding (str, optional): Encoding of the object. Defaults to "utf-8".
+        - **kwargs: Stream options of `open_object`.
+
+        Yields:
+        - str: Each line of the object.
+
+        Example:
+        >>> for line in client.iter_object_lines("mybucket", "logs/app.jsonl", prefetch=4):
+        ...     record = json.loads(line)
+        """
+        with self.open_object(bucket_name, object_name, mode="r", encoding=encoding, **kwargs) as stream:
+            for line in stream:
+                yield line.rstrip('\r\n')
+
+
+class AsyncMinioWrapper:
+    """
+    Asyncio interface to MinIO transfers.
+
+    Every transfer is a coroutine. At most `max_concurrency` transfers are in flight at once, each running
+    its blocking Minio call on one shared executor whose threads all use a single keep-alive connection
+    pool, so thousands of transfers can be awaited together without a thread each. Cancelling a transfer
+    that is still waiting for a slot skips it; a call already on the wire completes in the background and
+    its result is discarded. Failed calls are retried under the wrapper's `retry` policy with an
+    `asyncio.sleep` backoff that holds no slot, except after throttling, when the backoff keeps one slot
+    taken so that fewer transfers are sent while the server recovers.
+
+    Attributes:
+    - wrapper (MinioWrapper): The synchronous wrapper performing the calls.
+    - max_concurrency (int): Maximum number of transfers in flight.
+
+    Example:
+    >>> async with AsyncMinioWrapper(endpoint="localhost:9000", access_key="YOUR_ACCESS_KEY", secret_key="YOUR_SECRET_KEY") as client:
+    ...     await client.upload(bucket_name="mybucket", path_local_upload="/path/to/local/data", prefix="remote/folder/")
+    """
+    def __init__(self, endpoint: str, access_key: str = None, secret_key: str = None, secure: bool = True,
+                 region: str = None, http_client: Optional[urllib3.PoolManager] = None, max_concurrency: int = 32,
+                 **kwargs):
+        self.max_concurrency = max_concurrency
+        # Every transfer in flight may be a large object with its parts in flight on the same pool
+        pool_size = max_concurrency * kwargs.get("part_concurrency", DEFAULT_PART_CONCURRENCY)
+        self.wrapper = MinioWrapper(endpoint, access_key=access_key, secret_key=secret_key, secure=secure,
+                                    region=region, http_client=http_client or make_http_client(maxsize=pool_size),
+                                    **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="minio-async")
+        self._semaphore = None
+
+    async def __aenter__(self) -> "AsyncMinioWrapper":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Waits for the calls still running on the executor and shuts it down."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def _call(self, fn: Callable, *args, **kwargs):
+        """Runs a blocking call on the shared executor without taking a transfer slot."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        """Runs a blocking call on the shared executor once a transfer slot is free."""
+        if self._semaphore is None:
+            # Created lazily so that it belongs to the running event loop
+            self._semaphore = asyncio.BoundedSemaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await self._call(fn, *args, **kwargs)
+
+    async def _run_with_retry(self, retry: RetryPolicy, counter: RetryCounter, fn: Callable, *args, **kwargs):
+        """Runs a blocking call like `_run`, retrying it under `retry` with an asynchronous backoff."""
+        attempt = 0
+        while True:
+            try:
+                return await self._run(fn, *args, **kwargs)
+            except Exception as err:
+                attempt += 1
+                if not retry.allow_retry(err, attempt):
+                    raise
+                counter(err)
+                delay = retry.delay(attempt - 1)
+                if is_throttle_error(err):
+                    async with self._semaphore:
+                        await asyncio.sleep(delay)
+                else:
+                    await asyncio.sleep(delay)
+
+    async def upload_file(self, bucket_name: str, local_path: str, remote_path: str,
+                          retry: Optional[RetryPolicy] = None) -> TransferResult:
+        """
+        Uploads a single file, in parallel parts when it is at least `multipart_threshold` bytes.
+
+        Parameters:
+        - bucket_name (str): The target Minio bucket.
+        - local_path (str): Local path of the file to be uploaded.
+        - remote_path (str): Remote path (including filename) where the file will be stored in the bucket.
+        - retry (RetryPolicy, optional): Retry policy of the upload. Defaults to the wrapper's `retry`.
+
+        Returns:
+        - TransferResult: The bytes sent, time spent and retries made, or the type and message of the error.
+        """
+        retry = retry or self.wrapper.retry
+        counter = RetryCounter()
+        start = time.monotonic()
+        try:
+            size = os.path.getsize(local_path)
+            if size >= self.wrapper.multipart_threshold:
+                # Parts are retried one by one inside the multipart upload
+                etag = await self._run(upload_object_multipart, self.wrapper.minio_client, bucket_name, remote_path,
+                                       local_path, part_size=self.wrapper.part_size,
+                                       concurrency=self.wrapper.part_concurrency, retry=retry, on_retry=counter)
+            else:
+                written = await self._run_with_retry(retry, counter, self.wrapper.minio_client.fput_object,
+                                                     bucket_name, remote_path, local_path)
+                etag = getattr(written, "etag", None)
+        except asyncio.CancelledError:
+            # An Exception before Python 3.8, it must not become a failed result
+            raise
+        except Exception as err:
+            return counter.result(remote_path, 0, time.monotonic() - start, err)
+        return counter.result(remote_path, size, time.monotonic() - start, etag=_unquote_etag(etag))
+
+    async def download_file(self, bucket_name: str, file_name: str, file_output: str = None,
+                            retry: Optional[RetryPolicy] = None) -> TransferResult:
+        """
+        Downloads a specific file, with parallel ranged GETs when it is at least `multipart_threshold` bytes.
+
+        Parameters:
+        - bucket_name (str): The name of the bucket in MinIO.
+        - file_name (str): The name (or path) of the file within the bucket to download.
+        - file_output (str, optional): The desired local name (or path) for the downloaded file. Defaults to `file_name`.
+        - retry (RetryPolicy, optional): Retry policy of the download. Defaults to the wrapper's `retry`.
+
+        Returns:
+        - TransferResult: The bytes received, time spent and retries made, or the type and message of the error.
+        """
+        retry = retry or self.wrapper.retry
+        file_output = file_output if file_output is not None else file_name
+        counter = RetryCounter()
+        start = time.monotonic()
+        try:
+            stat = await self._run_with_retry(retry, counter, self.wrapper.minio_client.stat_object, bucket_name,
+                                              file_name)
+            if stat.size >= self.wrapper.multipart_threshold:
+                # The stat is handed down, the ranged download does not make its own
+                await self._run(self.wrapper._download_object, bucket_name, file_name, file_output, stat,
+                                retry=retry, on_retry=counter)
+            else:
+                await self._run_with_retry(retry, counter, self.wrapper.minio_client.fget_object, bucket_name,
+                                           file_name, file_output)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            return counter.result(file_name, 0, time.monotonic() - start, err)
+        return counter.result(file_name, stat.size, time.monotonic() - start)
+
+    async def _transfer_all(self, transfers: AsyncIterator[Tuple[int, str, str, str]], upload: bool) -> TransferReport:
+        """
+        Transfers every (size, bucket name, local path, remote path) with `max_concurrency` consumer coroutines.
+
+        The queue between the producer and the consumers is bounded, so a long listing is never held in memory,
+        and every transfer draws its retries from one budget for the whole call.
+
+        Returns:
+        - TransferReport: The aggregate of the results of every transfer.
+        """
+        pending = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        report = TransferReport()
+        retry = self.wrapper.retry.start_batch()
+
+        async def _consume():
+            while True:
+                transfer = await pending.get()
+                if transfer is None:
+                    return
+                _, bucket_name, local_path, remote_path = transfer
+                start = time.monotonic()
+                try:
+                    if upload:
+                        result = await self.upload_file(bucket_name, local_path, remote_path, retry=retry)
+                    else:
+                        os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+                        result = await self.download_file(bucket_name, remote_path, local_path, retry=retry)
+                except Exception as err:
+                    # Transfers report their own failures, this is only reached by local errors such as makedirs
+                    result = TransferResult(remote_path, 0, time.monotonic() - start, error=type(err).__name__,
+                                            message=str(err), throttles=int(is_throttle_error(err)))
+                if not result.ok:
+                    logging.error(f"{'Upload' if upload else 'Download'} Error for {remote_path} : "
+                                  f"{result.error}: {result.message}")
+                report.add(result)
+                for hook in self.wrapper.metrics_hooks:
+                    hook(result)
+
+        consumers = [asyncio.ensure_future(_consume()) for _ in range(self.max_concurrency)]
+        try:
+            async for transfer in transfers:
+                await pending.put(transfer)
+            for _ in consumers:
+                await pending.put(None)
+            await asyncio.gather(*consumers)
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+
+        return report.finish()
+
+    async def upload(self, bucket_name: str, path_local_upload: str, prefix: str = "") -> TransferReport:
+        """
+        Uploads files or directories to a specified MinIO bucket, laid out exactly like `MinioWrapper.upload`.
+
+        Parameters:
+        - bucket_name (str): The target Minio bucket where the files/directories will be uploaded.
+        - path_local_upload (str): The local path of the file or directory to be uploaded.
+        - prefix (str, optional): The prefix or folder name within the bucket where the files will be uploaded. Defaults to "".
+
+        Returns:
+        - TransferReport: Throughput, per-file latencies and failed keys of the upload.
+        """
+        transfers = await self._call(MinioWrapper._upload_transfers, bucket_name, path_local_upload, prefix)
+
+        async def _iterate():
+            for transfer in transfers:
+                yield transfer
+
+        return await self._transfer_all(_iterate(), upload=True)
+
+    async def list_objects(self, bucket_name: str, prefix: str = "", recursive: bool = False,
+                           page_size: int = 1000) -> AsyncIterator:
+        """
+        Lists objects without blocking the event loop, fetching `page_size` entries per executor call.
+
+        Parameters:
+        - bucket_name (str): Name of the bucket in minio.
+        - prefix (str, optional): Prefix or folder name within the bucket. Defaults to "".
+        - recursive (bool, optional): Whether or not to list recursively. Defaults to False.
+        - page_size (int, optional): Number of entries fetched per executor call. Defaults to 1000.
+
+        Yields:
+        - minio.datatypes.Object: Every listed object.
+        """
+        objects = self.wrapper.minio_client.list_objects(bucket_name, prefix=prefix, recursive=recursive)
+        while True:
+            page = await self._call(lambda: list(itertools.islice(objects, page_size)))
+            if not page:
+                return
+            for obj in page:
+                yield obj
+
+    async def download_files(self, bucket_name: str, prefix: str = "", recursive: bool = False,
+                             destination_path: str = "") -> TransferReport:
+        """
+        Download all files from the specified bucket with optional prefix and recursion.
+
+        Downloads start while the listing is still running, as in `MinioWrapper.download_files`.
+
+        Parameters:
+        - bucket_name (str): Name of the bucket in minio.
+        - prefix (str, optional): Prefix or folder name within the bucket. Defaults to "".
+        - recursive (bool, optional): Whether or not to download files recursively. Defaults to False.
+        - destination_path (str, optional): Local directory where the files will be downloaded to. Defaults to the current directory.
+
+        Returns:
+        - TransferReport: Throughput, per-file latencies and failed keys of the download.
+        """
+        async def _iterate():
+            async for obj in self.list_objects(bucket_name, prefix=prefix, recursive=recursive):
+                if not obj.is_dir:
+                    yield obj.size, bucket_name, os.path.join(destination_path, obj.object_name), obj.object_name
+
+        return await self._transfer_all(_iterate(), upload=False)
+
+    async def stream_object(self, bucket_name: str, object_name: str, chunk_size: int = 1024 * 1024,
+                            offset: int = 0, length: int = 0) -> AsyncIterator[bytes]:
+        """
+        Streams the content of an object in chunks without writing it to disk.
+
+        Parameters:
+        - bucket_name (str): Name of the bucket in minio.
+        - object_name (str): Name of the object.
+        - chunk_size (int, optional): Number of bytes per chunk. Defaults to 1 MiB.
+        - offset (int, optional): Start of the byte range to read. Defaults to 0.
+        - length (int, optional): Length of the byte range to read, 0 for the rest of the object. Defaults to 0.
+
+        Yields:
+        - bytes: Consecutive chunks of the object.
+        """
+        response = await self._run(self.wrapper.minio_client.get_object, bucket_name, object_name,
+                                   offset=offset, length=length)
+        try:
+            while True:
+                chunk = await self._call(response.read, chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            response.close()
+            response.release_conn()
@@ -1,36 +1,318 @@
 import os
-from typing import List
+import re
+import sqlite3
+import stat
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from fnmatch import translate
+from typing import Dict, Generator, Iterable, List, NamedTuple, Optional, Tuple, Union
 
-def get_all_files(path_input: str, endswith: str = None, recursive: bool = True) -> List[str]:
+def _name_matcher(patterns: Optional[Union[str, Iterable[str]]]):
+    """Compile glob patterns matched against entry names into one regex match function."""
+    if patterns is None:
+        return None
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return re.compile("|".join(f"(?:{translate(pattern)})" for pattern in patterns)).match
+
+def _scan_directory(path: str, endswith: Optional[Tuple[str, ...]], match_name, prune_name,
+                    follow_symlinks: bool) -> Tuple[List[str], List[str]]:
+    """
+    List one directory with a single scandir, using the file types it returns instead of a stat per entry.
+
+    Returns:
+    - Tuple[List[str], List[str]]: The matching file paths, and the subdirectories to descend into.
+    """
+    files, directories = [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if (prune_name is None or not prune_name(entry.name)) and (follow_symlinks or not entry.is_symlink()):
+                        directories.append(entry.path)
+                elif (endswith is None or entry.name.endswith(endswith)) and (match_name is None or match_name(entry.name)):
+                    files.append(entry.path)
+    except OSError:
+        # Unreadable or vanished directories are skipped, as os.walk does
+        pass
+    return files, directories
+
+def scan_files(path_input: str, endswith: Optional[Union[str, Iterable[str]]] = None,
+               pattern: Optional[Union[str, Iterable[str]]] = None, recursive: bool = True,
+               exclude_dirs: Optional[Union[str, Iterable[str]]] = None, workers: int = 1,
+               follow_symlinks: bool = False) -> Generator[str, None, None]:
+    """
+    Yield the files under the specified path, as they are found.
+
+    Every directory is listed with one `os.scandir` call and entries are classified from the types it
+    returns, without a stat per file. With `workers` above 1, subtrees are listed in parallel on a thread
+    pool, which hides the latency of network file systems; files are then yielded in no particular order.
+
+    Args:
+    - path_input (str): Path to start the search from.
+    - endswith (str | Iterable[str], optional): File name suffix, or suffixes, to keep. If None, keeps all files.
+    - pattern (str | Iterable[str], optional): Glob pattern, or patterns, the file name must match (e.g. "*.json*").
+    - recursive (bool, optional): If True, search for files recursively. Defaults to True.
+    - exclude_dirs (str | Iterable[str], optional): Glob patterns of directory names not to descend into (e.g. ".git").
+    - workers (int, optional): Number of threads listing directories. Defaults to 1.
+    - follow_symlinks (bool, optional): Descend into symbolic links to directories. Defaults to False.
+
+    Yields:
+    - str: The path of every matching file.
+
+    Example:
+    >>> for path in scan_files("/data", endswith=(".jsonl", ".jsonl.gz"), exclude_dirs=[".*", "tmp"], workers=16):
+    ...     process(path)
+    """
+    if os.path.isfile(path_input):
+        yield path_input
+        return
+    if endswith is not None and not isinstance(endswith, str):
+        endswith = tuple(endswith)
+    scan_args = (endswith, _name_matcher(pattern), _name_matcher(exclude_dirs), follow_symlinks)
+
+    if workers <= 1:
+        stack = [path_input]
+        while stack:
+            files, directories = _scan_directory(stack.pop(), *scan_args)
+            yield from files
+            if recursive:
+                stack.extend(reversed(directories))
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan") as executor:
+        pending = {executor.submit(_scan_directory, path_input, *scan_args)}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, directories = future.result()
+                    if recursive:
+                        pending.update(executor.submit(_scan_directory, directory, *scan_args)
+                                       for directory in directories)
+                    yield from files
+        finally:
+            for future in pending:
+                future.cancel()
+
+def _prefix_range(prefix: str) -> Tuple[str, str]:
+    """Returns the bounds of the strings starting with `prefix`, for a `>= ? AND < ?` range query."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+class IndexedFile(NamedTuple):
+    """A file recorded in a `DirectoryIndex`."""
+    path: str
+    size: Optional[int]
+    mtime: Optional[float]
+
+class DirectoryIndex:
+    """
+    Persistent SQLite index of the files under one or more directory trees, with their sizes and mtimes.
+
+    `refresh` compares the mtime of every indexed directory with the one recorded at the last scan and
+    only lists the directories that changed, so a mostly static tree costs one stat per directory instead
+    of a full walk. A directory mtime changes when entries are added, removed or renamed, not when a file
+    is rewritten in place; use `refresh(full=True)` after in-place edits to pick up new sizes and mtimes.
+
+    The index can be shared by several processes, SQLite serializes the refreshes. Keep the index file on
+    a local disk, SQLite locking is unreliable on network file systems.
+
+    Args:
+    - path (str): Path to the index database. Created if missing.
+    - timeout (float, optional): Seconds to wait for another process holding the write lock. Defaults to 60.
+
+    Example:
+    >>> with DirectoryIndex("/var/cache/dataset.idx") as index:
+    ...     index.refresh("/data")
+    ...     paths = [f.path for f in index.query("/data", endswith=(".jsonl", ".jsonl.gz"))]
+    """
+    def __init__(self, path: str, timeout: float = 60.0):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER);
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, dir TEXT, name TEXT, size INTEGER, mtime REAL);
+            CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+        """)
+
+    def __enter__(self) -> "DirectoryIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._conn.close()
+
+    def _subtree(self, root: str) -> Dict[str, Tuple[Optional[str], int]]:
+        """Returns the (parent, mtime_ns) of every indexed directory under `root`, itself included."""
+        rows = self._conn.execute("SELECT path, parent, mtime_ns FROM dirs WHERE path = ? OR (path >= ? AND path < ?)",
+                                  (root, *_prefix_range(os.path.join(root, ""))))
+        return {path: (parent, mtime_ns) for path, parent, mtime_ns in rows}
+
+    def _rescan(self, directory: str, mtime_ns: int, follow_symlinks: bool) -> List[Tuple[str, int]]:
+        """Replaces the indexed files of one directory and returns its subdirectories with their mtimes."""
+        files, directories = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            # Links to directories are neither files nor descended into, as in scan_files
+                            if follow_symlinks or not entry.is_symlink():
+                                directories.append((entry.path, entry.stat().st_mtime_ns))
+                            continue
+                    except OSError:
+                        continue
+                    try:
+                        entry_stat = entry.stat()
+                        files.append((entry.path, directory, entry.name, entry_stat.st_size, entry_stat.st_mtime))
+                    except OSError:
+                        # Broken symbolic links are listed like scan_files does, without size
+                        files.append((entry.path, directory, entry.name, None, None))
+        except OSError:
+            pass
+        self._conn.execute("DELETE FROM files WHERE dir = ?", (directory,))
+        self._conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?)", files)
+        self._conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", (directory, os.path.dirname(directory), mtime_ns))
+        return directories
+
+    def refresh(self, path_input: str, full: bool = False, follow_symlinks: bool = False) -> int:
+        """
+        Brings the index of a directory tree up to date, listing only the directories whose mtime changed.
+
+        Args:
+        - path_input (str): Root of the tree to index.
+        - full (bool, optional): List every directory, even those whose mtime did not change. Defaults to False.
+        - follow_symlinks (bool, optional): Descend into symbolic links to directories. Defaults to False.
+          Refresh with `full` when changing it for an indexed tree.
+
+        Returns:
+        - int: The number of directories that were listed.
+        """
+        root = os.path.abspath(path_input)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            known = self._subtree(root)
+            children = {}
+            for path, (parent, _) in known.items():
+                children.setdefault(parent, []).append(path)
+
+            seen, rescanned = set(), 0
+            # The mtime is taken before listing, so a change made during the scan is caught by the next refresh
+            stack = [(root, os.stat(root).st_mtime_ns)]
+            while stack:
+                directory, mtime_ns = stack.pop()
+                seen.add(directory)
+                if not full and directory in known and known[directory][1] == mtime_ns:
+                    for child in children.get(directory, ()):
+                        try:
+                            child_stat = os.stat(child, follow_symlinks=follow_symlinks)
+                        except OSError:
+                            continue
+                        if stat.S_ISDIR(child_stat.st_mode):
+                            stack.append((child, child_stat.st_mtime_ns))
+                    continue
+                rescanned += 1
+                stack.extend(self._rescan(directory, mtime_ns, follow_symlinks))
+
+            removed = [(path,) for path in known if path not in seen]
+            self._conn.executemany("DELETE FROM files WHERE dir = ?", removed)
+            self._conn.executemany("DELETE FROM dirs WHERE path = ?", removed)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return rescanned
+
+    def query(self, path_input: str, endswith: Optional[Union[str, Iterable[str]]] = None,
+              prefix: Optional[str] = None, pattern: Optional[Union[str, Iterable[str]]] = None,
+              recursive: bool = True) -> Generator[IndexedFile, None, None]:
+        """
+        Yield the indexed files under a directory, sorted by path, without touching the file system.
+
+        Args:
+        - path_input (str): Directory to list. Must be inside a tree passed to `refresh`.
+        - endswith (str | Iterable[str], optional): File name suffix, or suffixes, to keep. If None, keeps all files.
+        - prefix (str, optional): Keep only the paths starting with this prefix, relative to `path_input` (e.g. "2023/01-").
+        - pattern (str | Iterable[str], optional): Glob pattern, or patterns, the file name must match.
+        - recursive (bool, optional): If True, include the files of subdirectories. Defaults to True.
+
+        Yields:
+        - IndexedFile: The path, size and mtime of every matching file.
+        """
+        root = os.path.abspath(path_input)
+        if recursive:
+            sql, params = "SELECT path, size, mtime, name FROM files WHERE path >= ? AND path < ?", \
+                list(_prefix_range(os.path.join(root, prefix or "")))
+        else:
+            sql, params = "SELECT path, size, mtime, name FROM files WHERE dir = ?", [root]
+            if prefix:
+                sql += " AND path >= ? AND path < ?"
+                params.extend(_prefix_range(os.path.join(root, prefix)))
+        if endswith is not None:
+            suffixes = [endswith] if isinstance(endswith, str) else list(endswith)
+            sql += " AND (" + " OR ".join("substr(name, -?) = ?" for _ in suffixes) + ")"
+            for suffix in suffixes:
+                params.extend((len(suffix), suffix))
+        match_name = _name_matcher(pattern)
+        for path, size, mtime, name in self._conn.execute(sql + " ORDER BY path", params):
+            if match_name is None or match_name(name):
+                yield IndexedFile(path, size, mtime)
+
+def _open_index(index: Union[str, DirectoryIndex]) -> Tuple[DirectoryIndex, bool]:
+    """Returns the index to use and whether it was opened here and must be closed by the caller."""
+    if isinstance(index, DirectoryIndex):
+        return index, False
+    return DirectoryIndex(index), True
+
+def indexed_files(path_input: str, index: Union[str, DirectoryIndex], **kwargs) -> List[IndexedFile]:
+    """
+    Refresh the index of a directory tree and return its files.
+
+    Args:
+    - path_input (str): Root of the tree to list.
+    - index (str | DirectoryIndex): The index, or the path of its database.
+    - **kwargs: Filters passed to `DirectoryIndex.query`.
+
+    Returns:
+    - List[IndexedFile]: The matching files, sorted by path.
+    """
+    index, owned = _open_index(index)
+    try:
+        index.refresh(path_input)
+        return list(index.query(path_input, **kwargs))
+    finally:
+        if owned:
+            index.close()
+
+def get_all_files(path_input: str, endswith: str = None, recursive: bool = True,
+                  index: Optional[Union[str, DirectoryIndex]] = None) -> List[str]:
     """
     Get all files from the specified path.
 
     Args:
     - path_input (str): Path to start the search from.
-    - endswith (str, optional): File extension filter. If None, returns all files.
+    - endswith (str | Iterable[str], optional): File extension filter. If None, returns all files.
     - recursive (bool, optional): If True, search for files recursively. Defaults to True.
+    - index (str | DirectoryIndex, optional): Persistent index to answer from, refreshing only the changed
+      directories (see `DirectoryIndex`). Files are then sorted by path. If None, walks the whole tree.
 
     Returns:
     - List[str]: List of file paths.
     """
-    if os.path.isfile(path_input):
-        return [path_input]
-
-    if recursive:
-        files = [
-            os.path.join(root, file)
-            for root, _, files in os.walk(path_input)
-            for file in files
-            if endswith is None or file.endswith(endswith)
-        ]
-    else:
-        files = [
-            os.path.join(path_input, file)
-            for file in os.listdir(path_input)
-            if os.path.isfile(os.path.join(path_input, file)) and (endswith is None or file.endswith(endswith))
-        ]
-
-    return files
+    if index is None or os.path.isfile(path_input):
+        return list(scan_files(path_input, endswith=endswith, recursive=recursive))
+    root = os.path.abspath(path_input)
+    # Keep paths relative to path_input, as the walk returns them
+    return [os.path.join(path_input, entry.path[len(root) + 1:])
+            for entry in indexed_files(path_input, index, endswith=endswith, recursive=recursive)]
 
 def get_current_folder_name(path: str) -> str:
     """
@@ -71,8 +353,5 @@ def get_all_directories(path_input: str) -> List[str]:
     - List[str]: List of directory paths.
     """
     path_input = os.path.abspath(path_input)
-    return [
-        os.path.join(path_input, name)
-        for name in os.listdir(path_input)
-        if os.path.isdir(os.path.join(path_input, name))
-    ]
+    with os.scandir(path_input) as entries:
+        return [entry.path for entry in entries if entry.is_dir()]
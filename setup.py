@@ -39,7 +39,12 @@ setuptools.setup(
         "Operating System :: OS Independent",
     ],
     install_requires= [
+        # Exact pin: minio_wrapper drives multipart uploads through private Minio methods (MULTIPART_API),
+        # checked by tests/test_minio_wrapper.py; it falls back to fput_object on releases without them
         "minio==7.1.15",
         "tqdm==4.64.1"
     ],
+    extras_require={
+        "fast": ["orjson"],
+    },
 )
\ No newline at end of file
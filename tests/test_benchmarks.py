@@ -0,0 +1,27 @@
+import unittest
+from benchmarks import harness
+
+class TestHarness(unittest.TestCase):
+
+    def test_measure(self):
+        calls = []
+        case = harness.Case("noop", lambda: calls.append(1), 100, "records", {"n": 1}, lambda: calls.append(0))
+        result = harness.measure(case, repeat=3)
+        self.assertEqual(calls, [1, 0] * 4)
+        self.assertEqual(result["repeat"], 3)
+        self.assertLessEqual(result["min"], result["median"])
+        self.assertEqual(result["params"], {"n": 1})
+
+    def test_run_filters_cases(self):
+        cases = [harness.Case("file.a", lambda: None, 1, "bytes"), harness.Case("path.b", lambda: None, 1, "files")]
+        self.assertEqual([result["name"] for result in harness.run(cases, 1, "path")], ["path.b"])
+
+    def test_compare(self):
+        def report(**medians):
+            return {"results": [{"name": name, "median": median} for name, median in medians.items()]}
+        changes = harness.compare(report(a=1.0, b=1.0, c=1.0), report(a=1.5, b=0.5, c=1.05, d=1.0))
+        self.assertEqual({change["name"]: change["status"] for change in changes},
+                         {"a": "regression", "b": "improvement", "c": "same"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,8 @@
+import gc
+import io
+import operator
+import os
+import tempfile
 import unittest
 from unittest.mock import mock_open, patch
 from pylabtools import file_wrapper as fw
@@ -16,6 +21,22 @@ class TestFileFunctions(unittest.TestCase):
             lines = list(fw.stream_file_by_line("fakepath.txt"))
         self.assertEqual(lines, ["line1", "line2", "line3"])
 
+    def test_stream_file_by_line_from_stream(self):
+        stream = io.BytesIO("line1\r\nlíne2\n".encode("utf-8"))
+        self.assertEqual(list(fw.stream_file_by_line(stream)), ["line1", "líne2"])
+        self.assertFalse(stream.closed)
+        self.assertEqual(fw.read_json_config(io.StringIO('{"key": "value"}')), {"key": "value"})
+
+    def test_stream_file_by_line_from_raw_stream(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lines.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("line1\nline2\n")
+            with io.FileIO(path) as stream:
+                self.assertEqual(list(fw.stream_file_by_line(stream)), ["line1", "line2"])
+                gc.collect()
+                self.assertFalse(stream.closed)
+
     def test_write_text_to_file(self):
         m = mock_open()
         with patch("builtins.open", m):
@@ -46,5 +67,137 @@ class TestFileFunctions(unittest.TestCase):
         result_original_ext = fw.get_file_name("directory/filename.extension", tail="_tail")
         self.assertEqual(result_original_ext, "filename_tail.extension")
 
+def _record_ids(records):
+    return [record["id"] for record in records]
+
+
+def _line_length(line):
+    return len(line)
+
+
+def _batch_size(batch):
+    return len(batch)
+
+
+class TestLargeFileReaders(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.test_dir.cleanup)
+        self.path = os.path.join(self.test_dir.name, "corpus.txt")
+        self.lines = [f"line {i} {'x' * (i % 13)}" for i in range(500)]
+        with open(self.path, "w", newline="") as f:
+            f.write("\r\n".join(self.lines[:10]) + "\r\n" + "\n".join(self.lines[10:]))
+
+    def test_read_file_chunks(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self.assertEqual(b"".join(fw.read_file_chunks(self.path, chunk_size=100)), data)
+        chunks = [bytes(chunk) for chunk in fw.read_file_chunks(self.path, chunk_size=7, start=3, end=50, reuse_buffer=True)]
+        self.assertEqual(b"".join(chunks), data[3:50])
+
+    def test_iter_line_batches(self):
+        batches = list(fw.iter_line_batches(self.path, batch_bytes=100))
+        self.assertGreater(len(batches), 1)
+        self.assertEqual([line for batch in batches for line in batch], self.lines)
+        as_bytes = [line for batch in fw.iter_line_batches(self.path, encoding=None) for line in batch]
+        self.assertEqual(as_bytes, [line.encode() for line in self.lines])
+
+    def test_ranges_read_every_line_once(self):
+        ranges = fw.split_file_ranges(self.path, 4)
+        self.assertEqual(len(ranges), 4)
+        self.assertEqual([line for start, end in ranges for batch in fw.iter_line_batches(self.path, start=start, end=end)
+                          for line in batch], self.lines)
+        # Arbitrary offsets split lines, each is still read by the range it starts in
+        cuts = [0, 5, 1234, 1235, os.path.getsize(self.path)]
+        views = [bytes(view).decode() for start, end in zip(cuts, cuts[1:])
+                 for view in fw.iter_line_views(self.path, start, end)]
+        self.assertEqual(views, self.lines)
+
+    def test_empty_file(self):
+        empty = os.path.join(self.test_dir.name, "empty.txt")
+        open(empty, "w").close()
+        self.assertEqual(list(fw.iter_line_batches(empty)), [])
+        self.assertEqual(fw.split_file_ranges(empty, 3), [])
+
+    def test_map_lines(self):
+        other = os.path.join(self.test_dir.name, "other.txt")
+        fw.write_text_to_file(other, "a\nbb\n")
+        expected = [len(line) for line in self.lines] + [1, 2]
+        for workers in (0, 2):
+            results = list(fw.map_lines(_line_length, [self.path, other], workers=workers, shard_bytes=500, batch_bytes=50))
+            self.assertEqual(results, expected)
+        unordered = fw.map_lines(_line_length, [self.path, other], workers=2, shard_bytes=500, ordered=False, max_pending=1)
+        self.assertEqual(sorted(unordered), sorted(expected))
+
+    def test_reduce_lines(self):
+        self.assertEqual(fw.reduce_lines(_batch_size, operator.add, self.path, workers=2, shard_bytes=700), 500)
+        self.assertEqual(fw.reduce_lines(_batch_size, operator.add, self.path, workers=0, initial=10), 510)
+        empty = os.path.join(self.test_dir.name, "empty.txt")
+        open(empty, "w").close()
+        self.assertIsNone(fw.reduce_lines(_batch_size, operator.add, empty, workers=0))
+
+class TestJSONL(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.test_dir.cleanup)
+        self.path = os.path.join(self.test_dir.name, "data.jsonl")
+        self.records = [{"id": i, "text": "é" * (i % 5), "tags": ["a"] * (i % 3)} for i in range(300)]
+
+    def test_write_and_read(self):
+        with fw.JSONLWriter(self.path, buffer_records=7) as writer:
+            writer.write_many(self.records[:100])
+            self.assertEqual(writer.count, 98)
+        self.assertEqual(fw.write_jsonl(self.path, self.records[100:], mode="a"), 200)
+        with open(self.path, "ab") as f:
+            f.write(b"\n  \n")
+        self.assertEqual(list(fw.iter_jsonl(self.path, batch_bytes=256)), self.records)
+        batches = list(fw.iter_jsonl_batches(self.path, batch_bytes=256))
+        self.assertGreater(len(batches), 1)
+
+    def test_process_jsonl(self):
+        fw.write_jsonl(self.path, self.records)
+        for workers in (0, 2):
+            ids = [i for batch in fw.process_jsonl(_record_ids, self.path, workers=workers, shard_bytes=1000, batch_bytes=300)
+                   for i in batch]
+            self.assertEqual(ids, list(range(300)))
+        parsed = [record for batch in fw.process_jsonl(None, self.path, workers=2, shard_bytes=1000) for record in batch]
+        self.assertEqual(parsed, self.records)
+
+    def test_json(self):
+        path = os.path.join(self.test_dir.name, "data.json")
+        fw.write_json(path, {"records": self.records})
+        self.assertEqual(fw.read_json(path), {"records": self.records})
+        self.assertEqual(fw.read_json_config(path), {"records": self.records})
+
+class TestWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.test_dir.cleanup)
+        self.path = os.path.join(self.test_dir.name, "out.txt")
+
+    def test_atomic_write(self):
+        fw.write_text_to_file(self.path, "old", atomic=True, fsync="full")
+
+        def _failing_chunks():
+            yield "new "
+            raise RuntimeError("crash")
+
+        with self.assertRaises(RuntimeError):
+            fw.write_text_to_file(self.path, _failing_chunks(), atomic=True)
+        self.assertEqual(fw.read_file_all_text(self.path), "old")
+        self.assertEqual(os.listdir(self.test_dir.name), ["out.txt"])
+        fw.write_text_to_file(self.path, ("line %d\n" % i for i in range(3)), atomic=True, fsync="file")
+        self.assertEqual(fw.read_file_all_text(self.path), "line 0\nline 1\nline 2\n")
+        with self.assertRaises(ValueError):
+            fw.write_text_to_file(self.path, "text", fsync="always")
+
+    def test_write_many_files(self):
+        items = ((os.path.join(self.test_dir.name, f"dir{i % 3}", f"{i}.txt"), f"content {i}") for i in range(50))
+        self.assertEqual(fw.write_many_files(items, atomic=True, makedirs=True, workers=3), 50)
+        self.assertEqual(fw.read_file_all_text(os.path.join(self.test_dir.name, "dir1", "7.txt")), "content 7")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+import unittest
+import pylabtools
+
+HEAVY_MODULES = ("minio", "tqdm", "urllib3", "multiprocessing")
+
+def import_in_subprocess(statement):
+    """Runs an import in a fresh interpreter and returns its -X importtime timings and loaded modules."""
+    code = f"{statement}\nimport sys\nprint(' '.join(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    timings = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                timings[name.strip()] = int(cumulative)
+    return timings, set(result.stdout.split())
+
+class TestLazyImport(unittest.TestCase):
+
+    def test_package_import_is_cheap(self):
+        timings, modules = import_in_subprocess("import pylabtools")
+        self.assertFalse(modules & set(HEAVY_MODULES))
+        self.assertFalse({name for name in modules if name.startswith("pylabtools.")})
+        # Generous bound, the package itself only defines a table: catches a return to eager imports
+        self.assertLess(timings["pylabtools"], 50000)
+
+    def test_light_wrappers_skip_heavy_dependencies(self):
+        for module in ("path_wrapper", "file_wrapper"):
+            _, modules = import_in_subprocess(f"import pylabtools.{module}")
+            self.assertFalse(modules & set(HEAVY_MODULES), module)
+            self.assertNotIn("pylabtools.minio_wrapper", modules)
+
+    def test_log_wrapper_skips_multiprocessing(self):
+        _, modules = import_in_subprocess("import pylabtools.log_wrapper")
+        self.assertNotIn("multiprocessing", modules)
+        self.assertNotIn("pylabtools.minio_wrapper", modules)
+
+    def test_lazy_attributes(self):
+        from pylabtools import path_wrapper
+        self.assertIs(pylabtools.path_wrapper, path_wrapper)
+        self.assertIs(pylabtools.scan_files, path_wrapper.scan_files)
+        self.assertIn("MinioWrapper", dir(pylabtools))
+        with self.assertRaises(AttributeError):
+            pylabtools.missing
+
+    def test_exports_exist(self):
+        for name, module in pylabtools._EXPORTS.items():
+            self.assertTrue(hasattr(getattr(pylabtools, module), name), name)
+
+if __name__ == "__main__":
+    unittest.main()
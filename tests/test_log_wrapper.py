@@ -1,6 +1,16 @@
 import unittest
 from unittest.mock import patch, mock_open
+import gzip
+import json
 import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import sys
+import tempfile
+import threading
+import time
 from pylabtools import log_wrapper as lw
 
 class TestLoggerSetup(unittest.TestCase):
@@ -45,5 +55,276 @@ class TestLoggerSetup(unittest.TestCase):
         logger = self.logger_setup.get_logger()
         self.assertEqual(logger, self.logger_setup.logger)
 
+class TestJSONFormatter(unittest.TestCase):
+
+    def _record(self, **kwargs):
+        record = logging.LogRecord("test", logging.ERROR, "/path/module.py", 10, "hello %s", ("world",), None, func="run")
+        record.__dict__.update(kwargs)
+        return record
+
+    def test_default_fields(self):
+        for backend in ("json", "auto"):
+            data = json.loads(lw.JSONFormatter(backend=backend).format(self._record()))
+            self.assertEqual(list(data), list(lw.DEFAULT_FIELDS))
+            self.assertEqual(data["message"], "hello world")
+            self.assertEqual(data["line"], 10)
+
+    def test_fields_and_extra(self):
+        formatter = lw.JSONFormatter(fields=["levelname", "message"])
+        data = json.loads(formatter.format(self._record(request_id="abc", payload={1: object})))
+        self.assertEqual(data["levelname"], "ERROR")
+        self.assertEqual(data["request_id"], "abc")
+        self.assertIn("1", data["payload"])
+        self.assertNotIn("pathname", data)
+        self.assertNotIn("request_id", json.loads(lw.JSONFormatter(extra=False).format(self._record(request_id="abc"))))
+
+    def test_exc_info(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("test", logging.ERROR, "module.py", 1, "failed", None, sys.exc_info())
+        data = json.loads(lw.JSONFormatter().format(record))
+        self.assertIn("ValueError: boom", data["exc_info"])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            lw.JSONFormatter(backend="yaml")
+
+
+class TestBatchingFileHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.test_dir.cleanup)
+        self.path = os.path.join(self.test_dir.name, "app.log")
+        self.logger = logging.getLogger("test_batching")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.addCleanup(setattr, self.logger, "handlers", [])
+
+    def _handler(self, **kwargs):
+        handler = lw.BatchingFileHandler(self.path, flush_interval=0, **kwargs)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self.logger.handlers = [handler]
+        return handler
+
+    def test_batches_writes(self):
+        handler = self._handler(buffer_size=30)
+        self.logger.info("first")
+        self.assertEqual(os.path.getsize(self.path), 0)
+        self.logger.error("second")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "first\nsecond\n")
+        self.logger.info("x" * 40)
+        self.logger.info("third")
+        handler.close()
+        with open(self.path) as f:
+            self.assertEqual(f.read().splitlines()[-1], "third")
+
+    def test_rotation_and_compression(self):
+        handler = self._handler(buffer_size=0, max_bytes=100, backup_count=2, compress=True)
+        for i in range(30):
+            self.logger.info("message %02d", i)
+        handler.close()
+
+        segments = handler.rotated_segments()
+        self.assertEqual(len(segments), 2)
+        self.assertTrue(all(segment.endswith(".gz") for segment in segments))
+        with gzip.open(segments[-1], "rt") as f:
+            rotated = f.read().splitlines()
+        with open(self.path) as f:
+            current = f.read().splitlines()
+        self.assertEqual(rotated, [f"message {i}" for i in range(18, 27)])
+        self.assertEqual(current, [f"message {i}" for i in range(27, 30)])
+
+
+class TestFilters(unittest.TestCase):
+
+    def setUp(self):
+        logging.getLogger().handlers = []
+        self.logger_setup = lw.LoggerSetup()
+        self.logger = logging.getLogger("test_filters")
+        self.handler = _ListHandler()
+        self.handler.setFormatter(logging.Formatter('%(message)s'))
+        self.logger.handlers = [self.handler]
+        self.logger.propagate = False
+        self.addCleanup(setattr, self.logger, "handlers", [])
+        self.addCleanup(setattr, self.logger, "filters", [])
+
+    def test_sampling_rate(self):
+        sampling_filter = self.logger_setup.add_sampling("test_filters", rate=10)
+        calls = []
+        for i in range(100):
+            self.logger.debug("loop %s", lw.LazyArg(lambda: calls.append(1) or "state"))
+            self.logger.info("other")
+        self.logger.error("failed")
+        self.assertEqual(len(calls), 10)
+        self.assertEqual(self.handler.messages.count("other"), 10)
+        self.assertEqual(self.handler.messages[-1], "failed")
+        self.assertEqual(sampling_filter.dropped, 180)
+
+    def test_sampling_per_second(self):
+        self.logger_setup.add_sampling("test_filters", per_second=5)
+        for i in range(100):
+            self.logger.info("tick %d", i)
+        self.assertEqual(len(self.handler.messages), 5)
+
+    def test_deduplication(self):
+        deduplicate_filter = self.logger_setup.add_deduplication("test_filters", window=60)
+        for _ in range(5):
+            self.logger.warning("disk %s full", "/data")
+        self.logger.warning("other")
+        deduplicate_filter.flush()
+        self.assertEqual(self.handler.messages, ["disk /data full", "other", "disk /data full (repeated 4 times)"])
+
+        deduplicate_filter.window = 0
+        self.logger.warning("again")
+        self.logger.warning("again")
+        self.assertEqual(self.handler.messages[-2:], ["again", "again"])
+
+    def test_deduplication_is_bounded(self):
+        deduplicate_filter = self.logger_setup.add_deduplication("test_filters", window=60, max_keys=100)
+        for i in range(1000):
+            self.logger.warning("request %d failed", i)
+            self.logger.warning("request %d failed", i)
+        self.assertEqual(len(deduplicate_filter._bursts), 100)
+        # Bursts pushed out early still get their summary
+        self.assertEqual(self.handler.messages.count("request 0 failed (repeated 1 times)"), 1)
+
+        # A burst older than the window is summarized by the next record, whatever its message
+        deduplicate_filter.window = 0.01
+        self.logger.warning("last")
+        self.logger.warning("last")
+        time.sleep(0.02)
+        self.logger.warning("unrelated")
+        self.assertEqual(self.handler.messages[-2:], ["last (repeated 1 times)", "unrelated"])
+        self.assertEqual(len(deduplicate_filter._bursts), 1)
+
+
+def _log_from_worker(log_queue):
+    logger = lw.LoggerSetup.configure_worker(log_queue)
+    logger.info("from worker %s", os.getpid())
+
+
+class TestScopedLoggerSetup(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.test_dir.cleanup)
+        self.path = os.path.join(self.test_dir.name, "app.log")
+        self.logger = logging.getLogger("test_scoped")
+        self.addCleanup(self._reset)
+
+    def _reset(self):
+        for handler in self.logger.handlers:
+            handler.close()
+        self.logger.handlers = []
+
+    def test_idempotent(self):
+        for _ in range(3):
+            logger_setup = lw.LoggerSetup(name="test_scoped")
+            logger_setup.add_file_handler(self.path)
+            logger_setup.add_console_handler()
+        self.assertIs(logger_setup.get_logger(), self.logger)
+        self.assertEqual(len(self.logger.handlers), 2)
+        self.assertNotIn(self.logger.handlers[0], logging.getLogger().handlers)
+
+    def test_async_setup_is_reused(self):
+        first = lw.LoggerSetup(name="test_scoped", async_mode=True)
+        first.add_file_handler(self.path)
+        second = lw.LoggerSetup(name="test_scoped", async_mode=True)
+        second.add_file_handler(self.path)
+        self.assertIs(second.listener, first.listener)
+        self.assertEqual(len(self.logger.handlers), 1)
+        self.assertEqual(len(first.listener.handlers), 1)
+        first.shutdown()
+        second.shutdown()
+        self.assertEqual(len(self.logger.handlers), 1)
+
+    def test_process_queue_handler(self):
+        handler = lw.ProcessQueueHandler(queue.Queue())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("test", logging.ERROR, "module.py", 1, "failed %s", ("x",), sys.exc_info())
+        prepared = pickle.loads(pickle.dumps(handler.prepare(record)))
+        self.assertEqual(prepared.getMessage(), "failed x")
+        self.assertIsNone(prepared.exc_info)
+        self.assertIn("ValueError: boom", prepared.exc_text)
+
+    def test_multiprocess_writer(self):
+        logger_setup = lw.LoggerSetup(name="test_scoped", multiprocess=True)
+        logger_setup.add_file_handler(self.path)
+        process = multiprocessing.Process(target=_log_from_worker, args=(logger_setup.queue,))
+        process.start()
+        process.join()
+        logger_setup.shutdown()
+        with open(self.path) as f:
+            messages = [json.loads(line)["message"] for line in f]
+        self.assertEqual(messages, [f"from worker {process.pid}"])
+
+
+class _ListHandler(logging.Handler):
+
+    def __init__(self, gate=None):
+        super().__init__()
+        self.messages = []
+        self.threads = set()
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate:
+            self.gate.wait()
+        self.threads.add(threading.current_thread())
+        self.messages.append(self.format(record))
+
+
+class TestAsyncLoggerSetup(unittest.TestCase):
+
+    def setUp(self):
+        logging.getLogger().handlers = []
+
+    def tearDown(self):
+        logging.getLogger().handlers = []
+
+    def test_listener_writes_records(self):
+        logger_setup = lw.LoggerSetup(async_mode=True)
+        handler = _ListHandler()
+        logger_setup._add_handler(handler)
+        logger_setup.set_custom_format(logging.Formatter('%(message)s'))
+        items = ["a"]
+        logger_setup.get_logger().info("value %s", items)
+        items.append("b")
+        logger_setup.shutdown()
+
+        self.assertEqual(handler.messages, ["value ['a']"])
+        self.assertNotIn(threading.current_thread(), handler.threads)
+        self.assertEqual(logging.getLogger().handlers, [handler])
+
+    def test_drop_overflow(self):
+        for overflow, expected in (("drop", ["0", "1"]), ("drop_oldest", ["0", "9"])):
+            logging.getLogger().handlers = []
+            gate = threading.Event()
+            logger_setup = lw.LoggerSetup(async_mode=True, queue_size=1, overflow=overflow)
+            handler = _ListHandler(gate)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger_setup._add_handler(handler)
+            logger = logger_setup.get_logger()
+            logger.info("0")
+            # Wait until the listener holds the first record, so the queue has room for exactly one more
+            while not logger_setup.queue_handler.queue.empty():
+                time.sleep(0.001)
+            for i in range(1, 10):
+                logger.info(str(i))
+            gate.set()
+            logger_setup.shutdown()
+            self.assertEqual(logger_setup.dropped, 8)
+            self.assertEqual(handler.messages[:2], expected)
+            self.assertIn("8 log records were dropped", handler.messages[2])
+
+    def test_unknown_overflow(self):
+        with self.assertRaises(ValueError):
+            lw.BoundedQueueHandler(queue.Queue(), overflow="spill")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,677 @@
+import asyncio
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from minio import Minio
+from minio.error import S3Error, ServerError
+from pylabtools import minio_wrapper as mw
+
+class TestMinioWrapper(unittest.TestCase):
+
+    def setUp(self):
+        # Every test starts without cached worker clients
+        mw._worker_local.clients = {}
+        patcher = patch("pylabtools.minio_wrapper.Minio")
+        self.mock_minio = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.wrapper = mw.MinioWrapper("localhost:9000", "key", "secret", secure=False, region="us-east-1")
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.test_dir.cleanup)
+        self.local_path = os.path.join(self.test_dir.name, "local.txt")
+        with open(self.local_path, "w") as f:
+            f.write("test content")
+
+    def test_upload_file_reuses_worker_client(self):
+        config = self.wrapper.client_config
+        self.mock_minio.reset_mock()
+        for i in range(3):
+            result = mw.MinioWrapper.upload_file((config, "bucket", self.local_path, f"remote_{i}.txt"))
+            self.assertTrue(result.ok)
+            self.assertEqual(result.nbytes, 12)
+
+        self.mock_minio.assert_called_once()
+        kwargs = self.mock_minio.call_args[1]
+        self.assertFalse(kwargs["secure"])
+        self.assertEqual(kwargs["region"], "us-east-1")
+        self.assertEqual(mw.get_worker_client(config).stats()["requests"], 3)
+
+    def test_upload_file_legacy_args(self):
+        result = mw.MinioWrapper.upload_file(("localhost:9000", "key", "secret", "bucket", self.local_path, "remote.txt"))
+        self.assertTrue(result.ok)
+        worker = mw.get_worker_client(mw.MinioWrapper._legacy_config(("localhost:9000", "key", "secret")))
+        worker.client.fput_object.assert_called_once_with("bucket", "remote.txt", self.local_path)
+
+    def test_upload_file_error(self):
+        config = self.wrapper.client_config
+        mw.get_worker_client(config).client.fput_object.side_effect = ValueError("boom")
+        result = mw.MinioWrapper.upload_file((config, "bucket", self.local_path, "remote.txt"))
+        self.assertFalse(result.ok)
+        self.assertEqual(result.error, "ValueError")
+        self.assertIn("boom", result.message)
+
+    def test_upload_file_retries_throttling(self):
+        config = self.wrapper.client_config
+        slow_down = S3Error("SlowDown", "Please reduce your request rate.", "remote.txt", "1", "host", None)
+        mw.get_worker_client(config).client.fput_object.side_effect = [slow_down, slow_down, None]
+        result = mw.MinioWrapper.upload_file((config, "bucket", self.local_path, "remote.txt", mw.RetryPolicy(base_delay=0)))
+        self.assertTrue(result.ok)
+        self.assertEqual((result.retries, result.throttles), (2, 2))
+
+    def test_upload_transfers_from_index(self):
+        os.makedirs(os.path.join(self.test_dir.name, "sub"))
+        with open(os.path.join(self.test_dir.name, "sub", "b.txt"), "w") as f:
+            f.write("b")
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        index_path = os.path.join(index_dir.name, "index.db")
+        walked = mw.MinioWrapper.get_all_file_paths(self.test_dir.name)
+        self.assertEqual(mw.MinioWrapper.get_all_file_paths(self.test_dir.name, index=index_path),
+                         tuple(sorted(paths) for paths in walked))
+
+        name = os.path.basename(self.test_dir.name)
+        transfers = mw.MinioWrapper._upload_transfers("bucket", self.test_dir.name, "pre", index=index_path)
+        self.assertIn((1, "bucket", os.path.join(self.test_dir.name, "sub", "b.txt"), f"pre/{name}/sub/b.txt"), transfers)
+        self.assertEqual(sorted(transfers), sorted(mw.MinioWrapper._upload_transfers("bucket", self.test_dir.name, "pre")))
+
+    def test_upload_dedup(self):
+        source = os.path.join(self.test_dir.name, "run")
+        os.makedirs(source)
+        for name, content in [("a.bin", b"same"), ("b.bin", b"same"), ("c.cfg", b"known")]:
+            with open(os.path.join(source, name), "wb") as f:
+                f.write(content)
+        cache = mw.ContentCache(os.path.join(self.test_dir.name, "cache.db"))
+        self.addCleanup(cache.close)
+        cache.record([("bucket", "old/c.cfg", hashlib.sha256(b"known").hexdigest(), 5, "e1")])
+
+        client = self.mock_minio.return_value
+        client.stat_object.return_value = MagicMock(size=5, etag='"e1"')
+        client.copy_object.return_value = MagicMock(etag='"e2"')
+        client.fput_object.return_value = MagicMock(etag='"e0"')
+        report = self.wrapper.upload("bucket", source, prefix="new", mode="inline", dedup=cache)
+
+        client.fput_object.assert_called_once_with("bucket", "new/run/a.bin", os.path.join(source, "a.bin"))
+        copies = {(call[0][1], call[0][2].object_name, call[0][2].match_etag)
+                  for call in client.copy_object.call_args_list}
+        self.assertEqual(copies, {("new/run/c.cfg", "old/c.cfg", "e1"), ("new/run/b.bin", "new/run/a.bin", "e0")})
+        self.assertEqual((report.succeeded, report.copied, report.skipped, report.nbytes), (1, 2, 0, 4))
+        self.assertEqual(cache.get("bucket", "new/run/a.bin")["etag"], "e0")
+        self.assertEqual(cache.get("bucket", "new/run/b.bin")["etag"], "e2")
+
+        # Every destination now holds its content
+        entries = {name: cache.get("bucket", f"new/run/{name}") for name in ("a.bin", "b.bin", "c.cfg")}
+        client.stat_object.side_effect = lambda bucket, name: MagicMock(
+            size=entries[os.path.basename(name)]["size"], etag=f'"{entries[os.path.basename(name)]["etag"]}"',
+            last_modified=datetime.fromtimestamp(0, timezone.utc))
+        report = self.wrapper.upload("bucket", source, prefix="new", mode="inline", dedup=cache)
+        self.assertEqual((report.succeeded, report.copied, report.skipped), (0, 0, 3))
+
+        # An object that cannot be checked is not trusted, and the file is sent again
+        client.stat_object.side_effect = ConnectionError("reset")
+        self.wrapper.retry = mw.RetryPolicy(max_attempts=1)
+        report = self.wrapper.upload("bucket", source, prefix="new", mode="inline", dedup=cache)
+        self.assertEqual((report.succeeded, report.copied, report.skipped), (2, 1, 0))
+
+    def test_download_file_cached(self):
+        cache = mw.ObjectCache(os.path.join(self.test_dir.name, "cache"), max_bytes=1 << 20)
+        self.addCleanup(cache.close)
+        client = self.mock_minio.return_value
+        response = client.get_object.return_value
+        response.stream.return_value = [b"hello"]
+        response.headers = {"ETag": '"e1"', "Content-Length": "5"}
+        output = os.path.join(self.test_dir.name, "out.txt")
+
+        self.assertEqual(self.wrapper.download_file("bucket", "k", output, cache=cache).nbytes, 5)
+        # A cold fetch is a single unconditional GET
+        client.stat_object.assert_not_called()
+        self.assertIsNone(client.get_object.call_args[1]["request_headers"])
+        client.get_object.side_effect = ServerError("not modified", 304)
+        os.remove(output)
+        self.assertEqual(self.wrapper.download_file("bucket", "k", output, cache=cache).nbytes, 0)
+        self.assertEqual(client.get_object.call_args[1]["request_headers"], {"If-None-Match": '"e1"'})
+        with open(output, "rb") as f:
+            self.assertEqual(f.read(), b"hello")
+
+    def test_download_file_cached_retries_body(self):
+        cache = mw.ObjectCache(os.path.join(self.test_dir.name, "cache"), max_bytes=1 << 20)
+        self.addCleanup(cache.close)
+        client = self.mock_minio.return_value
+        response = client.get_object.return_value
+        response.headers = {"ETag": '"e1"', "Content-Length": "5"}
+        # The first body is reset after 2 bytes, the second one is whole
+        response.stream.side_effect = [[b"he"], [b"hello"]]
+        self.wrapper.retry = mw.RetryPolicy(base_delay=0)
+        output = os.path.join(self.test_dir.name, "out.txt")
+
+        result = self.wrapper.download_file("bucket", "k", output, cache=cache)
+        self.assertEqual((result.nbytes, result.retries), (5, 1))
+        with open(output, "rb") as f:
+            self.assertEqual(f.read(), b"hello")
+
+    def test_download_file_cached_large_is_ranged(self):
+        cache = mw.ObjectCache(os.path.join(self.test_dir.name, "cache"), max_bytes=1 << 40)
+        self.addCleanup(cache.close)
+        client = self.mock_minio.return_value
+        size = self.wrapper.multipart_threshold
+        client.get_object.return_value.headers = {"ETag": '"e1"', "Content-Length": str(size)}
+
+        def _ranged(client, bucket_name, object_name, file_path, **kwargs):
+            with open(file_path, "wb") as f:
+                f.truncate(kwargs["stat"].size)
+
+        with patch("pylabtools.minio_wrapper.download_object_ranged", side_effect=_ranged) as ranged:
+            result = self.wrapper.download_file("bucket", "k", os.path.join(self.test_dir.name, "out.bin"), cache=cache)
+        self.assertEqual(result.nbytes, size)
+        stat = ranged.call_args[1]["stat"]
+        self.assertEqual((stat.etag, stat.size), ("e1", size))
+        client.get_object.return_value.stream.assert_not_called()
+        client.stat_object.assert_not_called()
+
+    def test_download_files_cached_rejects_mode(self):
+        cache = mw.ObjectCache(os.path.join(self.test_dir.name, "cache"), max_bytes=1 << 20)
+        self.addCleanup(cache.close)
+        with self.assertRaises(ValueError):
+            self.wrapper.download_files("bucket", cache=cache, mode="process")
+
+    def test_download_files_streams_listing(self):
+        client = self.mock_minio.return_value
+        listed = []
+
+        def _list_objects(bucket_name, prefix="", recursive=False):
+            for i in range(100):
+                listed.append(i)
+                yield MagicMock(object_name=f"data/{i}.txt", size=10, is_dir=False)
+
+        client.list_objects.side_effect = _list_objects
+        client.fget_object.side_effect = lambda bucket_name, object_name, file_path: open(file_path, "w").close()
+        hooked = []
+        self.wrapper.add_metrics_hook(hooked.append)
+        with tempfile.TemporaryDirectory() as destination:
+            report = self.wrapper.download_files("bucket", prefix="data", recursive=True, destination_path=destination,
+                                                 max_workers=4, queue_size=5)
+        self.assertEqual(len(listed), 100)
+        self.assertEqual(client.fget_object.call_count, 100)
+        self.assertEqual(report.succeeded, 100)
+        self.assertEqual(len(hooked), 100)
+
+
+class TestTransferReport(unittest.TestCase):
+
+    def test_report(self):
+        report = mw.TransferReport()
+        for i in range(1, 101):
+            report.add(mw.TransferResult(f"{i}.txt", 1024 * 1024, i / 100, retries=i % 2))
+        report.add(mw.TransferResult("bad.txt", 0, 5.0, error="S3Error", message="SlowDown"))
+        report.finish()
+        report.duration = 2.0
+
+        self.assertEqual(report.succeeded, 100)
+        self.assertEqual(report.failed_keys, ["bad.txt"])
+        self.assertEqual(report.retries, 50)
+        self.assertEqual(report.mb_per_s, 50.0)
+        self.assertEqual(report.latency(0.5), 0.51)
+        self.assertEqual(report.latency(0.99), 1.0)
+        self.assertEqual(report.as_dict()["error_types"], {"S3Error": 1})
+        prometheus = report.to_prometheus(labels={"direction": "upload"})
+        self.assertIn('pylabtools_transfer_objects_total{direction="upload",status="failed"} 1', prometheus)
+        self.assertIn('pylabtools_transfer_errors_total{direction="upload",type="S3Error"} 1', prometheus)
+
+
+class TestAsyncMinioWrapper(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch("pylabtools.minio_wrapper.Minio")
+        self.mock_minio = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.test_dir.cleanup)
+        for i in range(20):
+            with open(os.path.join(self.test_dir.name, f"{i}.txt"), "w") as f:
+                f.write("test content")
+
+    def test_upload(self):
+        async def _upload():
+            async with mw.AsyncMinioWrapper("localhost:9000", "key", "secret", max_concurrency=4) as client:
+                await client.upload("bucket", self.test_dir.name, prefix="remote")
+
+        asyncio.run(_upload())
+        uploaded = sorted(call[0][1] for call in self.mock_minio.return_value.fput_object.call_args_list)
+        name = os.path.basename(self.test_dir.name)
+        self.assertEqual(uploaded, sorted(f"remote/{name}/{i}.txt" for i in range(20)))
+
+    def test_upload_shares_retry_budget(self):
+        self.mock_minio.return_value.fput_object.side_effect = ConnectionError("reset")
+
+        async def _upload():
+            async with mw.AsyncMinioWrapper("localhost:9000", "key", "secret", max_concurrency=4,
+                                            retry=mw.RetryPolicy(base_delay=0, budget=3)) as client:
+                return await client.upload("bucket", self.test_dir.name)
+
+        report = asyncio.run(_upload())
+        # 3 retries for the whole call, not 3 per file, and all of them reported
+        self.assertEqual((report.failed, report.retries), (20, 3))
+        self.assertEqual(self.mock_minio.return_value.fput_object.call_count, 23)
+
+    def test_download_large_file_stats_once(self):
+        client = self.mock_minio.return_value
+        client.stat_object.return_value = MagicMock(size=10, etag='"e"')
+        output = os.path.join(self.test_dir.name, "large.bin")
+
+        async def _download():
+            async with mw.AsyncMinioWrapper("localhost:9000", "key", "secret", multipart_threshold=4) as client:
+                return await client.download_file("bucket", "large.bin", output)
+
+        with patch("pylabtools.minio_wrapper.download_object_ranged") as ranged:
+            self.assertTrue(asyncio.run(_download()).ok)
+        client.stat_object.assert_called_once()
+        self.assertIs(ranged.call_args[1]["stat"], client.stat_object.return_value)
+
+    def test_stream_object(self):
+        response = self.mock_minio.return_value.get_object.return_value
+        response.read.side_effect = [b"ab", b"cd", b""]
+
+        async def _stream():
+            async with mw.AsyncMinioWrapper("localhost:9000", "key", "secret") as client:
+                return [chunk async for chunk in client.stream_object("bucket", "object", chunk_size=2)]
+
+        self.assertEqual(asyncio.run(_stream()), [b"ab", b"cd"])
+        response.release_conn.assert_called_once()
+
+
+class TestSync(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.test_dir.name, "data.txt")
+        with open(self.file_path, "w") as f:
+            f.write("test content")
+        self.stat = os.stat(self.file_path)
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def _remote(self, size, mtime, etag="abc"):
+        return MagicMock(size=size, etag=f'"{etag}"', last_modified=datetime.fromtimestamp(mtime, timezone.utc))
+
+    def test_manifest_resume(self):
+        manifest_path = os.path.join(self.test_dir.name, mw.SYNC_MANIFEST_NAME)
+        manifest = mw.SyncManifest(manifest_path)
+        manifest.record("bucket/a", 1, 2000000000, "etag")
+        with open(manifest_path, "a") as f:
+            f.write('{"key": "bucket/b", "si')
+
+        reloaded = mw.SyncManifest(manifest_path)
+        self.assertEqual(reloaded.get("bucket/a")["etag"], "etag")
+        self.assertIsNone(reloaded.get("bucket/b"))
+
+    def test_manifest_prune(self):
+        manifest_path = os.path.join(self.test_dir.name, mw.SYNC_MANIFEST_NAME)
+        manifest = mw.SyncManifest(manifest_path)
+        for key in ("bucket/run/a", "bucket/run/b", "bucket/run/a", "bucket/other/c"):
+            manifest.record(key, 1, 2000000000)
+        self.assertEqual(manifest.prune(["bucket/run/a"], scope="bucket/run/"), 1)
+
+        with open(manifest_path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+        self.assertEqual(sorted(mw.SyncManifest(manifest_path).entries), ["bucket/other/c", "bucket/run/a"])
+
+    def test_sync_up_manifest_outside_directory(self):
+        source = os.path.join(self.test_dir.name, "run")
+        os.makedirs(source)
+        for name in ("a.txt", "b.txt"):
+            with open(os.path.join(source, name), "w") as f:
+                f.write(name)
+        with patch("pylabtools.minio_wrapper.Minio") as mock_minio:
+            client = mock_minio.return_value
+            client.list_objects.return_value = []
+            client.fput_object.return_value = MagicMock(etag='"e"')
+            wrapper = mw.MinioWrapper("localhost:9000", "key", "secret")
+            wrapper.sync_up("bucket", source)
+            os.remove(os.path.join(source, "b.txt"))
+            wrapper.sync_up("bucket", source)
+
+            uploaded = [call[0][1] for call in client.fput_object.call_args_list]
+        self.assertEqual(sorted(uploaded), ["run/a.txt", "run/a.txt", "run/b.txt"])
+        self.assertEqual(os.listdir(source), ["a.txt"])
+        manifest = mw.SyncManifest(mw.SyncManifest.default_path(source))
+        self.assertEqual(list(manifest.entries), ["bucket/run/a.txt"])
+        self.assertEqual(manifest.get("bucket/run/a.txt")["etag"], "e")
+
+    def test_is_unchanged(self):
+        local_newer = lambda local_mtime, remote_mtime: local_mtime > remote_mtime
+        self.assertFalse(mw.is_unchanged(self.file_path, self.stat, None, None, local_newer))
+        self.assertFalse(mw.is_unchanged(self.file_path, self.stat, self._remote(1, self.stat.st_mtime + 10), None, local_newer))
+        self.assertTrue(mw.is_unchanged(self.file_path, self.stat, self._remote(self.stat.st_size, self.stat.st_mtime + 10),
+                                        None, local_newer))
+        self.assertFalse(mw.is_unchanged(self.file_path, self.stat, self._remote(self.stat.st_size, self.stat.st_mtime - 10),
+                                         None, local_newer))
+
+        # The manifest and the checksum both override an older remote modification time
+        entry = {"size": self.stat.st_size, "mtime_ns": self.stat.st_mtime_ns, "etag": None}
+        self.assertTrue(mw.is_unchanged(self.file_path, self.stat, self._remote(self.stat.st_size, 0), entry, local_newer))
+        entry["mtime_ns"] += 1
+        self.assertFalse(mw.is_unchanged(self.file_path, self.stat, self._remote(self.stat.st_size, 0), entry, local_newer))
+        remote = self._remote(self.stat.st_size, 0, etag=mw.file_md5(self.file_path))
+        self.assertTrue(mw.is_unchanged(self.file_path, self.stat, remote, None, local_newer, checksum=True))
+
+
+class TestContentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.test_dir.cleanup)
+        self.cache = mw.ContentCache(os.path.join(self.test_dir.name, "cache.db"), max_entries=2)
+        self.addCleanup(self.cache.close)
+
+    def test_hash_files_reuses_unchanged(self):
+        paths = []
+        for i in range(3):
+            paths.append(os.path.join(self.test_dir.name, f"{i}.bin"))
+            with open(paths[-1], "wb") as f:
+                f.write(bytes([i]) * (3 << 20))
+        hashes = self.cache.hash_files(paths, workers=2)
+        self.assertEqual(hashes[paths[1]], hashlib.sha256(b"\x01" * (3 << 20)).hexdigest())
+        with patch("pylabtools.minio_wrapper.file_sha256", side_effect=mw.file_sha256) as file_sha256:
+            self.assertEqual(self.cache.hash_files(paths), hashes)
+            file_sha256.assert_not_called()
+            with open(paths[0], "ab") as f:
+                f.write(b"x")
+            self.cache.hash_files(paths)
+            file_sha256.assert_called_once_with(paths[0])
+
+    def test_locations_and_eviction(self):
+        self.cache.record([("bucket", "a", "h1", 1, None), ("bucket", "b", "h1", 1, "e")])
+        self.cache.record([("bucket", "c", "h2", 1, None)])
+        self.cache.touch("bucket", "a")
+        self.assertEqual([entry["object"] for entry in self.cache.locations("h1")], ["a", "b"])
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNone(self.cache.get("bucket", "b"))
+        self.cache.forget("bucket", "a")
+        self.assertEqual(self.cache.locations("h1"), [])
+
+    def test_is_valid(self):
+        entry = {"size": 4, "etag": None, "stored": 1000.0}
+        stat = MagicMock(size=4, etag='"x"', last_modified=datetime.fromtimestamp(999, timezone.utc))
+        self.assertTrue(mw.ContentCache.is_valid(entry, stat))
+        stat.last_modified = datetime.fromtimestamp(1001, timezone.utc)
+        self.assertFalse(mw.ContentCache.is_valid(entry, stat))
+        self.assertTrue(mw.ContentCache.is_valid(dict(entry, etag="x"), stat))
+        self.assertFalse(mw.ContentCache.is_valid(dict(entry, size=5), stat))
+
+
+class TestObjectCache(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.test_dir.cleanup)
+        self.cache = mw.ObjectCache(os.path.join(self.test_dir.name, "cache"), max_bytes=10)
+        self.addCleanup(self.cache.close)
+        self.objects = {"a": (b"aaaa", "e1"), "b": (b"bbbb", "e2"), "c": (b"cccc", "e3")}
+        self.fetches = []
+
+    def fetch(self, name):
+        def _fetch(path, cached_etag):
+            self.fetches.append((name, cached_etag))
+            content, etag = self.objects[name]
+            if etag == cached_etag:
+                return None
+            with open(path, "wb") as f:
+                f.write(content)
+            return etag, len(content)
+        return _fetch
+
+    def test_read_through(self):
+        output = os.path.join(self.test_dir.name, "out", "a")
+        self.assertEqual(self.cache.get("bucket", "a", self.fetch("a"), output=output), (output, False))
+        with open(output, "rb") as f:
+            self.assertEqual(f.read(), b"aaaa")
+
+        # Revalidated by the conditional fetch, unless the ETag is known
+        self.assertTrue(self.cache.get("bucket", "a", self.fetch("a"))[1])
+        self.assertTrue(self.cache.get("bucket", "a", self.fetch("a"), etag="e1")[1])
+        self.assertEqual(self.fetches, [("a", None), ("a", "e1")])
+
+        self.objects["a"] = (b"new", "e4")
+        path, hit = self.cache.get("bucket", "a", self.fetch("a"), output=output)
+        self.assertFalse(hit)
+        with open(output, "rb") as f:
+            self.assertEqual(f.read(), b"new")
+        self.assertEqual(len(os.listdir(os.path.join(self.cache.directory, "tmp"))), 0)
+
+    def test_revalidate_after(self):
+        self.cache.revalidate_after = 60
+        self.cache.get("bucket", "a", self.fetch("a"))
+        self.cache.get("bucket", "a", self.fetch("a"))
+        self.assertEqual(self.fetches, [("a", None)])
+
+    def test_lru_eviction(self):
+        self.cache.get("bucket", "a", self.fetch("a"))
+        path_b, _ = self.cache.get("bucket", "b", self.fetch("b"))
+        self.cache.get("bucket", "a", self.fetch("a"), etag="e1")
+        self.cache.get("bucket", "c", self.fetch("c"))
+        self.assertEqual(self.cache.size, 8)
+        self.assertFalse(os.path.exists(path_b))
+        self.assertFalse(self.cache.get("bucket", "b", self.fetch("b"))[1])
+
+
+class TestMultipart(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.test_dir.name, "data.bin")
+        self.data = os.urandom(mw.MIN_PART_SIZE * 2 + 10)
+        with open(self.file_path, "wb") as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def test_part_ranges(self):
+        self.assertEqual(mw._part_ranges(10, 4), [(0, 4), (4, 4), (8, 2)])
+        self.assertEqual(mw._part_ranges(0, 4), [(0, 0)])
+        self.assertEqual(len(mw._part_ranges(mw.MAX_PARTS * 3, 1)), mw.MAX_PARTS)
+
+    def test_upload_object_multipart(self):
+        client = MagicMock()
+        client._upload_part.side_effect = lambda bucket, name, data, headers, upload_id, number: hashlib.md5(data).hexdigest()
+        digests = b"".join(hashlib.md5(self.data[offset:offset + mw.MIN_PART_SIZE]).digest()
+                           for offset in range(0, len(self.data), mw.MIN_PART_SIZE))
+        client._complete_multipart_upload.return_value = MagicMock(etag=f"{hashlib.md5(digests).hexdigest()}-3")
+
+        mw.upload_object_multipart(client, "bucket", "data.bin", self.file_path, part_size=1)
+        parts = client._complete_multipart_upload.call_args[0][3]
+        self.assertEqual([part.part_number for part in parts], [1, 2, 3])
+
+        client._complete_multipart_upload.return_value = MagicMock(etag=f"{'0' * 32}-3")
+        with self.assertRaises(ValueError):
+            mw.upload_object_multipart(client, "bucket", "data.bin", self.file_path, part_size=1)
+
+    def test_multipart_api_of_installed_minio(self):
+        # Fails when a minio upgrade renames or changes the private methods upload_object_multipart calls
+        self.assertTrue(mw.has_multipart_api(Minio), "minio's private multipart API changed, see setup.py")
+        self.assertTrue(mw.MULTIPART_API_AVAILABLE)
+        self.assertFalse(mw.has_multipart_api(object))
+
+    def test_upload_object_multipart_fallback(self):
+        client = MagicMock()
+        client.fput_object.return_value = MagicMock(etag="e")
+        with patch("pylabtools.minio_wrapper.MULTIPART_API_AVAILABLE", False), self.assertLogs(level="WARNING"):
+            self.assertEqual(mw.upload_object_multipart(client, "bucket", "data.bin", self.file_path), "e")
+        client.fput_object.assert_called_once_with("bucket", "data.bin", self.file_path, part_size=mw.DEFAULT_PART_SIZE)
+        client._create_multipart_upload.assert_not_called()
+
+    def test_upload_object_multipart_other_etag(self):
+        client = MagicMock()
+        client._upload_part.return_value = "part"
+        # Encrypted or non-S3 servers return ETags that are not MD5s of the parts
+        for etag in ("opaque-etag", f"{'0' * 32}-3", "0" * 32):
+            client._complete_multipart_upload.return_value = MagicMock(etag=etag)
+            with self.assertLogs(level="WARNING") as logs:
+                self.assertEqual(mw.upload_object_multipart(client, "bucket", "data.bin", self.file_path), etag)
+            self.assertIn("not checked", logs.output[0])
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def _s3_error(self, code):
+        return S3Error(code, "message", "object", "1", "host", None)
+
+    def test_classify(self):
+        self.assertTrue(mw.is_throttle_error(self._s3_error("SlowDown")))
+        self.assertTrue(mw.is_retryable_error(self._s3_error("InternalError")))
+        self.assertFalse(mw.is_throttle_error(self._s3_error("InternalError")))
+        self.assertFalse(mw.is_retryable_error(self._s3_error("NoSuchKey")))
+        self.assertTrue(mw.is_retryable_error(ConnectionResetError()))
+        self.assertFalse(mw.is_retryable_error(ValueError()))
+
+    def test_call(self):
+        policy = mw.RetryPolicy(max_attempts=3, base_delay=0)
+        fn = MagicMock(side_effect=[ConnectionError(), "done"])
+        retried = []
+        self.assertEqual(policy.call(fn, 1, on_retry=retried.append), "done")
+        self.assertEqual(len(retried), 1)
+
+        fn = MagicMock(side_effect=ConnectionError())
+        with self.assertRaises(ConnectionError):
+            policy.call(fn)
+        self.assertEqual(fn.call_count, 3)
+
+        fn = MagicMock(side_effect=self._s3_error("NoSuchKey"))
+        with self.assertRaises(S3Error):
+            policy.call(fn)
+        fn.assert_called_once()
+
+    def test_delay_is_capped(self):
+        policy = mw.RetryPolicy(base_delay=1, max_delay=4)
+        self.assertTrue(all(0 <= policy.delay(10) <= 4 for _ in range(100)))
+
+    def test_http_client_leaves_statuses_to_policy(self):
+        retries = mw.make_http_client().connection_pool_kw["retries"]
+        self.assertFalse(retries.is_retry("GET", 503, has_retry_after=True))
+        self.assertEqual((retries.read, retries.status), (0, 0))
+
+    def test_budget(self):
+        policy = mw.RetryPolicy(max_attempts=10, base_delay=0, budget=2).start_batch()
+        fn = MagicMock(side_effect=ConnectionError())
+        with self.assertRaises(ConnectionError):
+            policy.call(fn)
+        self.assertEqual(fn.call_count, 3)
+        self.assertEqual(policy._budget.left, 0)
+        # The budget stays behind when the policy is sent to a worker process
+        self.assertIsNone(pickle.loads(pickle.dumps(policy))._budget)
+
+
+class _Response(io.BytesIO):
+    """Stands in for the urllib3 response of `Minio.get_object`."""
+
+    def release_conn(self):
+        pass
+
+
+class TestObjectReader(unittest.TestCase):
+
+    def setUp(self):
+        self.data = b"".join(b"line %d\n" % i for i in range(1000))
+        self.client = MagicMock()
+        self.client.stat_object.return_value = MagicMock(size=len(self.data), etag="etag")
+        self.client.get_object.side_effect = self._get_object
+
+    def _get_object(self, bucket_name, object_name, offset=0, length=0, request_headers=None):
+        self.assertEqual(request_headers, {"If-Match": "etag"})
+        return _Response(self.data[offset:offset + length] if length else self.data[offset:])
+
+    def test_stream_resumes_after_drop(self):
+        dropped = _Response(self.data[:100])
+        self.client.get_object.side_effect = [dropped, self._get_object("bucket", "object", 100, 0, {"If-Match": "etag"})]
+        reader = mw.ObjectReader(self.client, "bucket", "object", retry=mw.RetryPolicy(base_delay=0))
+        self.assertEqual(io.BufferedReader(reader, buffer_size=64).read(), self.data)
+        self.assertEqual(self.client.get_object.call_args[1]["offset"], 100)
+
+    def test_prefetch_ranges(self):
+        reader = mw.ObjectReader(self.client, "bucket", "object", range_size=1000, prefetch=3)
+        with io.BufferedReader(reader, buffer_size=333) as stream:
+            self.assertEqual(stream.read(10), self.data[:10])
+            stream.seek(-5, io.SEEK_END)
+            self.assertEqual(stream.read(), self.data[-5:])
+            stream.seek(0)
+            self.assertEqual(stream.read(), self.data)
+
+    def test_iter_object_lines(self):
+        with patch("pylabtools.minio_wrapper.Minio", return_value=self.client):
+            wrapper = mw.MinioWrapper("localhost:9000", "key", "secret")
+        lines = list(wrapper.iter_object_lines("bucket", "object", prefetch=2, range_size=100))
+        self.assertEqual(lines, [f"line {i}" for i in range(1000)])
+
+
+def _square(args):
+    return args[0] ** 2
+
+
+class TestTransferScheduler(unittest.TestCase):
+
+    def test_choose_mode(self):
+        scheduler = mw.TransferScheduler(process_min_files=10)
+        self.assertEqual(scheduler.choose_mode([100]), "inline")
+        self.assertEqual(scheduler.choose_mode([100] * 5), "thread")
+        self.assertEqual(mw.TransferScheduler(mode="process").choose_mode([100]), "process")
+        with self.assertRaises(ValueError):
+            mw.TransferScheduler(mode="fork")
+
+    def test_batches_largest_first(self):
+        scheduler = mw.TransferScheduler(small_file_size=100, batch_files=2)
+        batches = scheduler._batches([(1, ("a",)), (500, ("big",)), (2, ("b",)), (3, ("c",)), (200, ("mid",))])
+        self.assertEqual(batches, [(500, [("big",)]), (200, [("mid",)]), (5, [("c",), ("b",)]), (1, [("a",)])])
+
+    def test_run(self):
+        tasks = [(i, (i,)) for i in range(50)]
+        for mode in ("inline", "thread"):
+            scheduler = mw.TransferScheduler(max_workers=4, mode=mode, small_file_size=10, batch_files=3)
+            self.assertEqual(sorted(scheduler.run(_square, tasks)), [i ** 2 for i in range(50)])
+
+    def test_run_stream(self):
+        consumed = []
+
+        def _tasks():
+            for i in range(20):
+                consumed.append(i)
+                yield 1, (i,)
+
+        scheduler = mw.TransferScheduler(max_workers=2, min_workers=2, batch_files=1)
+        results = scheduler.run(_square, _tasks())
+        next(results)
+        # Only the tasks in flight have been pulled from the stream
+        self.assertLessEqual(len(consumed), 4)
+        self.assertEqual(len(list(results)), 19)
+
+    def test_prefetch(self):
+        self.assertEqual(list(mw.prefetch(range(50), maxsize=3)), list(range(50)))
+
+        def _failing():
+            yield 1
+            raise ValueError("listing failed")
+
+        with self.assertRaises(ValueError):
+            list(mw.prefetch(_failing()))
+
+    def test_tuning_reverses_on_drop(self):
+        scheduler = mw.TransferScheduler(max_workers=16, mode="thread", tune_interval=0)
+        list(scheduler.run(_square, [(1, (1,))]))
+        scheduler.workers, scheduler._last_rate, scheduler._direction = 8, float("inf"), 1
+        scheduler._observe(0, 1, 16)
+        self.assertEqual(scheduler.workers, 6)
+
+    def test_throttle(self):
+        scheduler = mw.TransferScheduler(max_workers=16, min_workers=2, tune_interval=60)
+        scheduler.workers = 16
+        scheduler.throttle()
+        self.assertEqual(scheduler.workers, 8)
+        # A burst of throttled transfers backs off once
+        scheduler.throttle()
+        self.assertEqual(scheduler.workers, 8)
+
+if __name__ == "__main__":
+    unittest.main()
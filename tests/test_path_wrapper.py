@@ -1,4 +1,5 @@
 import os
+import shutil
 import tempfile
 import unittest
 from pylabtools import path_wrapper as pw
@@ -46,5 +47,149 @@ class TestFileOperations(unittest.TestCase):
         dirs = pw.get_all_directories(self.test_dir.name)
         self.assertIn(self.test_subdir, dirs)
 
+class TestScanFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        root = self.test_dir.name
+        self.paths = {}
+        for relative in ["a.jsonl", "b.json", "c.txt", "sub/d.jsonl", "sub/deep/e.jsonl.gz",
+                         ".git/objects/f.jsonl", "tmp/g.jsonl"]:
+            path = os.path.join(root, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("{}")
+            self.paths[relative] = path
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def expected(self, *relatives):
+        return sorted(self.paths[relative] for relative in relatives)
+
+    def test_matches_os_walk_order(self):
+        walked = []
+        for root, _, files in os.walk(self.test_dir.name):
+            walked.extend(os.path.join(root, name) for name in files)
+        self.assertEqual(list(pw.scan_files(self.test_dir.name)), walked)
+
+    def test_multiple_extensions(self):
+        files = pw.scan_files(self.test_dir.name, endswith=[".jsonl", ".jsonl.gz"])
+        self.assertEqual(sorted(files), self.expected("a.jsonl", "sub/d.jsonl", "sub/deep/e.jsonl.gz",
+                                                      ".git/objects/f.jsonl", "tmp/g.jsonl"))
+
+    def test_pattern_and_exclude_dirs(self):
+        files = pw.scan_files(self.test_dir.name, pattern="*.json*", exclude_dirs=[".*", "tmp"])
+        self.assertEqual(sorted(files), self.expected("a.jsonl", "b.json", "sub/d.jsonl", "sub/deep/e.jsonl.gz"))
+
+    def test_non_recursive(self):
+        files = pw.scan_files(self.test_dir.name, recursive=False)
+        self.assertEqual(sorted(files), self.expected("a.jsonl", "b.json", "c.txt"))
+
+    def test_parallel_matches_sequential(self):
+        sequential = sorted(pw.scan_files(self.test_dir.name, exclude_dirs=".git"))
+        parallel = sorted(pw.scan_files(self.test_dir.name, exclude_dirs=".git", workers=4))
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(len(parallel), 6)
+
+    def test_is_lazy_and_accepts_file(self):
+        files = pw.scan_files(self.test_dir.name, workers=4)
+        self.assertIsNotNone(next(files))
+        files.close()
+        self.assertEqual(list(pw.scan_files(self.paths["c.txt"])), [self.paths["c.txt"]])
+
+    def test_skips_symlinked_directories(self):
+        link = os.path.join(self.test_dir.name, "link")
+        try:
+            os.symlink(os.path.join(self.test_dir.name, "sub"), link)
+        except (OSError, NotImplementedError):
+            self.skipTest("symlinks are not supported")
+        self.assertNotIn(os.path.join(link, "d.jsonl"), list(pw.scan_files(self.test_dir.name)))
+        self.assertIn(os.path.join(link, "d.jsonl"), list(pw.scan_files(self.test_dir.name, follow_symlinks=True)))
+
+class TestDirectoryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.test_dir.name, "data")
+        for relative in ["a.jsonl", "b.txt", "2023/01-a.jsonl", "2023/02-b.jsonl.gz", "2023/deep/c.jsonl"]:
+            self.write(relative, "{}")
+        self.index = pw.DirectoryIndex(os.path.join(self.test_dir.name, "index.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self.test_dir.cleanup()
+
+    def write(self, relative, content):
+        path = os.path.join(self.root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def bump_mtime(self, relative):
+        path = os.path.join(self.root, relative)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+    def paths(self, **kwargs):
+        return [os.path.relpath(entry.path, self.root) for entry in self.index.query(self.root, **kwargs)]
+
+    def test_query_matches_walk(self):
+        self.assertEqual(self.index.refresh(self.root), 3)
+        self.assertEqual(self.paths(), sorted(os.path.relpath(path, self.root) for path in pw.scan_files(self.root)))
+        entry = next(self.index.query(self.root, endswith="b.txt"))
+        self.assertEqual((entry.size, entry.mtime), (2, os.path.getmtime(entry.path)))
+
+    def test_query_filters(self):
+        self.index.refresh(self.root)
+        self.assertEqual(self.paths(endswith=[".jsonl", ".gz"]),
+                         ["2023/01-a.jsonl", "2023/02-b.jsonl.gz", "2023/deep/c.jsonl", "a.jsonl"])
+        self.assertEqual(self.paths(prefix="2023/0"), ["2023/01-a.jsonl", "2023/02-b.jsonl.gz"])
+        self.assertEqual(self.paths(recursive=False), ["a.jsonl", "b.txt"])
+        self.assertEqual(self.paths(pattern="0?-*"), ["2023/01-a.jsonl", "2023/02-b.jsonl.gz"])
+
+    def test_refresh_rescans_only_changed_directories(self):
+        self.index.refresh(self.root)
+        self.assertEqual(self.index.refresh(self.root), 0)
+
+        self.write("2023/deep/d.jsonl", "{}")
+        self.bump_mtime("2023/deep")
+        self.assertEqual(self.index.refresh(self.root), 1)
+        self.assertIn("2023/deep/d.jsonl", self.paths())
+
+        shutil.rmtree(os.path.join(self.root, "2023", "deep"))
+        self.bump_mtime("2023")
+        self.assertEqual(self.index.refresh(self.root), 1)
+        self.assertEqual(self.paths(), ["2023/01-a.jsonl", "2023/02-b.jsonl.gz", "a.jsonl", "b.txt"])
+        self.assertEqual(self.index.refresh(self.root, full=True), 2)
+
+    def test_index_persists(self):
+        self.index.refresh(self.root)
+        self.index.close()
+        with pw.DirectoryIndex(os.path.join(self.test_dir.name, "index.db")) as index:
+            self.assertEqual(index.refresh(self.root), 0)
+            self.assertEqual(len(list(index.query(self.root))), 5)
+        self.index = pw.DirectoryIndex(os.path.join(self.test_dir.name, "index.db"))
+
+    def test_directory_symlink_matches_scan(self):
+        try:
+            os.symlink(os.path.join(self.root, "2023"), os.path.join(self.root, "link"))
+        except (OSError, NotImplementedError):
+            self.skipTest("symlinks are not supported")
+        indexed = pw.get_all_files(self.root, index=self.index)
+        self.assertEqual(indexed, sorted(pw.scan_files(self.root)))
+        self.assertNotIn(os.path.join(self.root, "link"), indexed)
+        self.index.refresh(self.root, full=True, follow_symlinks=True)
+        self.assertEqual(sorted(entry.path for entry in self.index.query(self.root)),
+                         sorted(pw.scan_files(self.root, follow_symlinks=True)))
+
+    def test_get_all_files_with_index(self):
+        index_path = os.path.join(self.test_dir.name, "index.db")
+        files = pw.get_all_files(self.root, endswith=".jsonl", index=index_path)
+        self.assertEqual(files, sorted(pw.get_all_files(self.root, endswith=".jsonl")))
+        self.assertEqual(pw.get_all_files(self.root, recursive=False, index=self.index),
+                         [os.path.join(self.root, "a.jsonl"), os.path.join(self.root, "b.txt")])
+
 if __name__ == "__main__":
     unittest.main()